@@ -0,0 +1,201 @@
+import math
+from functools import lru_cache
+
+from config.settings import API_SETTINGS
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Context window of each model in tokens
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-1106-preview": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-3.5-turbo": 16385
+}
+
+# USD per 1,000 input and output tokens
+MODEL_PRICES = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-32k": (0.06, 0.12),
+    "gpt-4-1106-preview": (0.01, 0.03),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-3.5-turbo": (0.0005, 0.0015)
+}
+
+# Rough request overhead in seconds and output speed in tokens per second, for latency estimates
+MODEL_SPEEDS = {
+    "gpt-4": (1.5, 20),
+    "gpt-4-32k": (2.0, 20),
+    "gpt-3.5-turbo": (0.5, 80)
+}
+DEFAULT_SPEED = (1.0, 40)
+
+# Tokens added by the chat format around each message
+TOKENS_PER_MESSAGE = 4
+
+class Tokenizer:
+    """
+    Token counter for one model
+
+    Uses tiktoken when installed, otherwise a conservative estimate that
+    counts non-ASCII characters such as emoji and non-Latin scripts as more
+    than one token.
+    """
+    def __init__(self, model):
+        """
+        Initialize the tokenizer
+
+        Args:
+            model (str): Model name
+        """
+        self.model = model
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text):
+        """
+        Count the tokens in a text
+
+        Args:
+            text (str): Text to measure
+
+        Returns:
+            int: Token count
+        """
+        if self.encoding is not None:
+            return len(self.encoding.encode_ordinary(text))
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) * 1.5)
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model=None):
+    """
+    Get the cached tokenizer for a model
+
+    Args:
+        model (str, optional): Model name, defaults to the configured GPT model
+
+    Returns:
+        Tokenizer: Tokenizer instance
+    """
+    return Tokenizer(model or API_SETTINGS["openai"]["gpt_model"])
+
+def count_tokens(text, model=None):
+    """
+    Count the tokens in a text
+
+    Args:
+        text (str): Text to measure
+        model (str, optional): Model name, defaults to the configured GPT model
+
+    Returns:
+        int: Token count
+    """
+    return get_tokenizer(model).count(text)
+
+def fits_budget(text, max_tokens, model=None):
+    """
+    Check whether a text fits a token budget without tokenizing all of it
+
+    The text is counted in slices and counting stops as soon as the budget is
+    exceeded. Cutting at slice edges can only overcount, so the check is safe.
+
+    Args:
+        text (str): Text to measure
+        max_tokens (int): Token budget
+        model (str, optional): Model name
+
+    Returns:
+        bool: True if the text fits
+    """
+    # An ASCII character never takes more than one token, emoji and CJK characters can take several
+    if len(text) <= max_tokens and text.isascii():
+        return True
+
+    tokenizer = get_tokenizer(model)
+    used = 0
+    for start in range(0, len(text), 64 * 1024):
+        used += tokenizer.count(text[start:start + 64 * 1024])
+        if used > max_tokens:
+            return False
+    return True
+
+def get_context_window(model=None):
+    """
+    Get the context window of a model
+
+    Args:
+        model (str, optional): Model name, defaults to the configured GPT model
+
+    Returns:
+        int: Context window in tokens
+    """
+    model = model or API_SETTINGS["openai"]["gpt_model"]
+    if model in MODEL_CONTEXT_WINDOWS:
+        return MODEL_CONTEXT_WINDOWS[model]
+
+    # Dated snapshots such as gpt-4-0613 share the window of their base model
+    for base_model in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(base_model):
+            return MODEL_CONTEXT_WINDOWS[base_model]
+    return MODEL_CONTEXT_WINDOWS["gpt-4"]
+
+def get_input_budget(system_prompt, instruction, model=None):
+    """
+    Get the tokens left for chat text in one request
+
+    This is the context window minus the reserved output tokens, the prompts,
+    and the message overhead.
+
+    Args:
+        system_prompt (str): System prompt
+        instruction (str): Text placed before the chat in the user message
+        model (str, optional): Model name, defaults to the configured GPT model
+
+    Returns:
+        int: Token budget for the chat text
+    """
+    reserved = API_SETTINGS["openai"]["reserved_output_tokens"]
+    used = count_tokens(system_prompt, model) + count_tokens(instruction, model) + 2 * TOKENS_PER_MESSAGE
+    return max(0, get_context_window(model) - reserved - used)
+
+def estimate_cost(input_tokens, output_tokens, requests=1, rounds=1, model=None):
+    """
+    Estimate the cost and wall-clock time of a job
+
+    Args:
+        input_tokens (int): Total input tokens across all requests
+        output_tokens (int): Total output tokens across all requests
+        requests (int): Number of requests
+        rounds (int): Number of sequential rounds, requests within a round run concurrently
+        model (str, optional): Model name, defaults to the configured GPT model
+
+    Returns:
+        dict: Token counts, request count, cost in USD, and latency in seconds
+    """
+    model = model or API_SETTINGS["openai"]["gpt_model"]
+    input_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES["gpt-4"])
+    overhead, tokens_per_second = MODEL_SPEEDS.get(model, DEFAULT_SPEED)
+
+    # Requests in a round run side by side, so latency follows the longest output in each round
+    output_per_request = output_tokens / max(1, requests)
+    latency = rounds * (overhead + output_per_request / tokens_per_second)
+
+    return {
+        "model": model,
+        "requests": requests,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost_usd": round(input_tokens / 1000 * input_price + output_tokens / 1000 * output_price, 4),
+        "latency_seconds": round(latency, 1)
+    }
@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from config.settings import DEFAULT_SETTINGS
+
+class ResponseCache:
+    """
+    Persistent content-addressed cache for API responses
+
+    Each entry is a small JSON file named after the hash of everything that
+    determines the response. Entries are evicted least recently used first
+    once the cache grows past its size limit, and expire after a maximum age.
+    """
+    def __init__(self, cache_dir, max_size_mb=500, max_age_days=90):
+        """
+        Initialize the response cache
+
+        Args:
+            cache_dir (str): Directory to store cache entries
+            max_size_mb (int): Size limit in megabytes
+            max_age_days (int): Age after which entries expire
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024
+        self.max_age = max_age_days * 24 * 60 * 60
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+
+    def get(self, key):
+        """
+        Look up a cached response
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        if time.time() - entry.get("created", 0) > self.max_age:
+            self._remove(path)
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        # The modification time doubles as the last access time for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.stats["hits"] += 1
+        return entry["value"]
+
+    def put(self, key, value):
+        """
+        Store a response
+
+        Args:
+            key (str): Cache key from make_key
+            value: JSON-serializable response
+
+        Returns:
+            bool: Success status
+        """
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = json.dumps({"created": time.time(), "value": value})
+
+            # Write to a temporary file first so readers never see a partial entry
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w") as f:
+                f.write(data)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error writing cache entry: {str(e)}")
+            return False
+
+        with self._lock:
+            self.stats["writes"] += 1
+            self._size += len(data) - old_size
+            over_limit = self._size > self.max_size
+
+        if over_limit:
+            self.evict()
+        return True
+
+    def get_or_compute(self, key, compute):
+        """
+        Return a cached response, computing and storing it on a miss
+
+        Args:
+            key (str): Cache key from make_key
+            compute (callable): Function producing the response
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def evict(self):
+        """
+        Remove expired entries, then least recently used ones until under the size limit
+        """
+        now = time.time()
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(entry_size for _, _, entry_size in entries)
+        target = self.max_size * 0.9
+
+        for path, accessed, entry_size in entries:
+            if size <= target and now - accessed <= self.max_age:
+                continue
+            if self._remove(path):
+                size -= entry_size
+
+        with self._lock:
+            self._size = size
+
+    def clear(self):
+        """
+        Remove every cache entry
+        """
+        for path, _, _ in list(self._entries()):
+            self._remove(path)
+        with self._lock:
+            self._size = 0
+
+    def get_stats(self):
+        """
+        Get cache counters for monitoring
+
+        Returns:
+            dict: Hits, misses, writes, evictions, hit rate, and size in bytes
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size_bytes"] = self._size
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _path(self, key):
+        """
+        Get the file path of a cache entry, sharded by key prefix to keep directories small
+        """
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _entries(self):
+        """
+        List cache entries
+
+        Yields:
+            tuple: (path, last access time, size in bytes)
+        """
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def _remove(self, path):
+        """
+        Delete a cache entry file, counting it as an eviction
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        with self._lock:
+            self.stats["evictions"] += 1
+        return True
+
+def make_key(*parts):
+    """
+    Build a cache key from everything that determines a response
+
+    Args:
+        *parts: JSON-serializable values such as model, prompts, and options
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def hash_file(file_path):
+    """
+    Hash the contents of a file without loading it all at once
+
+    Args:
+        file_path (str): Path to the file
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    with open(file_path, "rb") as f:
+        return hash_stream(f)
+
+def hash_stream(stream):
+    """
+    Hash a binary stream to its end, one block at a time
+
+    Args:
+        stream (file): Binary file object
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(1024 * 1024), b""):
+        digest.update(block)
+    return digest.hexdigest()
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Get the shared response cache, or None if caching is disabled
+
+    Returns:
+        ResponseCache: Shared cache instance
+    """
+    global _response_cache
+    settings = DEFAULT_SETTINGS["cache"]
+    if not settings["enabled"]:
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(settings["path"], settings["max_size_mb"], settings["max_age_days"])
+    return _response_cache
+
+def cached_call(namespace, key_parts, compute):
+    """
+    Run an API call through the shared response cache
+
+    Args:
+        namespace (str): Kind of call, e.g. 'chat' or 'transcription'
+        key_parts (tuple): Values that determine the response
+        compute (callable): Function making the actual call
+
+    Returns:
+        Cached or fresh response
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(make_key(namespace, *key_parts), compute)
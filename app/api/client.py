@@ -0,0 +1,244 @@
+import random
+import asyncio
+import threading
+
+import aiohttp
+import openai
+
+from config.settings import API_SETTINGS
+
+class OpenAIService:
+    """
+    Shared asynchronous client for every OpenAI API call
+
+    Requests run on one background event loop with a reused HTTP session.
+    A semaphore bounds how many are in flight, each attempt has a timeout,
+    and rate limits and server errors are retried with jittered exponential
+    backoff. Sync wrappers let blocking code use the same service.
+    """
+    def __init__(self, settings=None):
+        """
+        Initialize the service and start its event loop thread
+
+        Args:
+            settings (dict, optional): OpenAI settings, defaults to API_SETTINGS["openai"]
+        """
+        settings = settings or API_SETTINGS["openai"]
+        self.api_key = settings["api_key"]
+        self.api_base = settings.get("api_base") or None
+        self.gpt_model = settings["gpt_model"]
+        self.whisper_model = settings["whisper_model"]
+        self.max_concurrency = settings["max_concurrency"]
+        self.request_timeout = settings["request_timeout"]
+        self.max_retries = settings["max_retries"]
+        self.backoff_base = settings["backoff_base"]
+        self.backoff_max = settings["backoff_max"]
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+        self._semaphore = None
+        self._session = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="openai-service", daemon=True)
+        self._thread.start()
+
+    async def acomplete(self, system_prompt, user_content, model=None):
+        """
+        Send a chat completion request
+
+        Args:
+            system_prompt (str): System prompt
+            user_content (str): User message
+            model (str, optional): Model name, defaults to the configured GPT model
+
+        Returns:
+            str: Response text
+        """
+        async def request():
+            response = await openai.ChatCompletion.acreate(
+                model=model or self.gpt_model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                api_key=self.api_key,
+                api_base=self.api_base,
+                request_timeout=self.request_timeout
+            )
+            return response.choices[0].message.content
+
+        return await self._with_retries(request)
+
+    async def atranscribe(self, file_path, response_format="text", model=None):
+        """
+        Send an audio file to the transcription endpoint
+
+        Args:
+            file_path (str): Path to an audio file in a supported format
+            response_format (str): Whisper response format
+            model (str, optional): Model name, defaults to the configured Whisper model
+
+        Returns:
+            Transcription response, text or an object with segments
+        """
+        async def request():
+            # The file is reopened on every attempt so retries send it from the start
+            with open(file_path, "rb") as audio_file:
+                return await openai.Audio.atranscribe(
+                    model=model or self.whisper_model,
+                    file=audio_file,
+                    response_format=response_format,
+                    api_key=self.api_key,
+                    api_base=self.api_base,
+                    request_timeout=self.request_timeout
+                )
+
+        return await self._with_retries(request)
+
+    def complete(self, system_prompt, user_content, model=None):
+        """
+        Send a chat completion request and wait for the response
+
+        Args:
+            system_prompt (str): System prompt
+            user_content (str): User message
+            model (str, optional): Model name
+
+        Returns:
+            str: Response text
+        """
+        return self.run(self.acomplete(system_prompt, user_content, model))
+
+    def complete_many(self, requests, model=None):
+        """
+        Send many chat completion requests concurrently
+
+        Args:
+            requests (list): (system prompt, user content) tuples
+            model (str, optional): Model name
+
+        Returns:
+            list: Response texts in request order
+        """
+        async def gather():
+            return await asyncio.gather(*(self.acomplete(system, user, model) for system, user in requests))
+
+        return self.run(gather())
+
+    def transcribe(self, file_path, response_format="text", model=None):
+        """
+        Transcribe an audio file and wait for the response
+
+        Args:
+            file_path (str): Path to an audio file in a supported format
+            response_format (str): Whisper response format
+            model (str, optional): Model name
+
+        Returns:
+            Transcription response
+        """
+        return self.run(self.atranscribe(file_path, response_format, model))
+
+    def run(self, coroutine):
+        """
+        Run a coroutine on the service loop from synchronous code
+
+        Args:
+            coroutine: Coroutine to run
+
+        Returns:
+            Result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        """
+        Close the HTTP session and stop the event loop
+        """
+        if self._session is not None:
+            self.run(self._session.close())
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _with_retries(self, request):
+        """
+        Run a request under the concurrency limit, retrying transient failures
+
+        Args:
+            request (callable): Coroutine function making one attempt
+
+        Returns:
+            Result of the request
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_concurrency))
+
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                self.stats["requests"] += 1
+                try:
+                    # The openai SDK picks up the shared session from this context variable
+                    openai.aiosession.set(self._session)
+                    return await asyncio.wait_for(request(), self.request_timeout)
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        self.stats["failures"] += 1
+                        raise
+                    error_name = type(e).__name__
+                    delay = get_retry_after(e) or random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+            # Sleep outside the semaphore so other requests can use the slot
+            self.stats["retries"] += 1
+            print(f"OpenAI request failed ({error_name}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+def is_retryable(error):
+    """
+    Check whether a failed request is worth retrying
+
+    Args:
+        error (Exception): Error raised by the request
+
+    Returns:
+        bool: True for timeouts, connection errors, rate limits, and server errors
+    """
+    if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError)):
+        return True
+    if isinstance(error, (openai.error.Timeout, openai.error.APIConnectionError, openai.error.TryAgain,
+                          openai.error.RateLimitError, openai.error.ServiceUnavailableError)):
+        return True
+    status = getattr(error, "http_status", None)
+    return status is not None and (status == 429 or status >= 500)
+
+def get_retry_after(error):
+    """
+    Read the delay the server asked for from a failed request
+
+    Args:
+        error (Exception): Error raised by the request
+
+    Returns:
+        float: Delay in seconds, or None if the server gave none
+    """
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_openai_service():
+    """
+    Get the shared OpenAI service, starting it on first use
+
+    Returns:
+        OpenAIService: Shared service instance
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = OpenAIService()
+    return _service
@@ -4,6 +4,10 @@ from pydub import AudioSegment
 import openai
 from dotenv import load_dotenv
 
+from app.api.cache import cached_call, hash_file
+from app.api.client import get_openai_service
+from app.search.index import index_transcribed_audio
+
 # Load environment variables
 load_dotenv()
 
@@ -16,7 +20,7 @@ openai.api_key = api_key
 
 # Do not create a client instance with OpenAI() constructor as it's not compatible with v0.28.1
 
-def transcribe_audio(file_path, transcription_type="cleaned", proofreading=True):
+def transcribe_audio(file_path, transcription_type="cleaned", proofreading=True, source=None):
     """
     Transcribe audio file using OpenAI's Whisper API
     
@@ -24,6 +28,7 @@ def transcribe_audio(file_path, transcription_type="cleaned", proofreading=True)
         file_path (str): Path to the audio file
         transcription_type (str): 'verbatim' or 'cleaned'
         proofreading (bool): Whether to proofread the transcription
+        source (str, optional): Lasting location of the audio for search results, defaults to the file path
         
     Returns:
         str: Transcribed text
@@ -35,41 +40,60 @@ def transcribe_audio(file_path, transcription_type="cleaned", proofreading=True)
     # Convert audio to supported format if needed
     file_extension = os.path.splitext(file_path)[1].lower()
     
-    # If file is not in a supported format, convert it
-    if file_extension not in [".mp3", ".mp4", ".mpeg", ".mpga", ".m4a", ".wav", ".webm"]:
-        temp_file = convert_audio_format(file_path)
-        file_path = temp_file.name
+    # Set transcription parameters based on type
+    response_format = "verbose_json" if transcription_type == "verbatim" else "text"
     
     # Transcribe audio using Whisper API
     try:
-        with open(file_path, "rb") as audio_file:
-            # Set transcription parameters based on type
-            response_format = "verbose_json" if transcription_type == "verbatim" else "text"
-            
-            # Call Whisper API using OpenAI SDK v0.28.1
-            response = openai.Audio.transcribe(
-                model="whisper-1",
-                file=audio_file,
-                response_format=response_format
-            )
-            
-            # Process the response based on transcription type
-            if transcription_type == "verbatim":
-                # Extract segments with timestamps
-                segments = response.segments
-                transcription = format_segments_with_timestamps(segments)
-            else:
-                # Simple text response
-                transcription = response
-            
-            # Apply proofreading if enabled
-            if proofreading:
-                transcription = proofread_transcription(transcription)
-            
-            return transcription
+        # Identical audio is only transcribed once, whatever its file name
+        content_hash = hash_file(file_path)
+        transcription = cached_call(
+            "transcription",
+            (get_openai_service().whisper_model, response_format, content_hash),
+            lambda: request_transcription(file_path, file_extension, transcription_type, response_format)
+        )
+        
+        # Apply proofreading if enabled
+        if proofreading:
+            transcription = proofread_transcription(transcription)
+        
+        # Make the transcript searchable from the dashboard
+        index_transcribed_audio(transcription, file_path, content_hash, source)
+        
+        return transcription
     except Exception as e:
         raise Exception(f"Transcription failed: {str(e)}")
 
+def request_transcription(file_path, file_extension, transcription_type, response_format):
+    """
+    Send an audio file to the Whisper API
+    
+    Args:
+        file_path (str): Path to the audio file
+        file_extension (str): Lowercase file extension including the dot
+        transcription_type (str): 'verbatim' or 'cleaned'
+        response_format (str): Whisper response format
+        
+    Returns:
+        str: Transcribed text
+    """
+    # If file is not in a supported format, convert it
+    if file_extension not in [".mp3", ".mp4", ".mpeg", ".mpga", ".m4a", ".wav", ".webm"]:
+        temp_file = convert_audio_format(file_path)
+        file_path = temp_file.name
+    
+    # Call Whisper API through the shared OpenAI service
+    response = get_openai_service().transcribe(file_path, response_format)
+    
+    # Process the response based on transcription type
+    if transcription_type == "verbatim":
+        # Extract segments with timestamps
+        segments = response.segments
+        return format_segments_with_timestamps(segments)
+    
+    # Simple text response
+    return response
+
 def convert_audio_format(file_path):
     """
     Convert audio to MP3 format for Whisper API compatibility
@@ -139,20 +163,18 @@ def proofread_transcription(text):
     Returns:
         str: Proofread transcription
     """
+    system_prompt = "You are a professional transcription proofreader. Your task is to correct any errors in the transcription while preserving the original meaning. Fix spelling, grammar, and punctuation errors. Do not add or remove content."
+    user_content = f"Please proofread this transcription:\n\n{text}"
+    
+    service = get_openai_service()
+    
     try:
         # Call GPT-4 to proofread the transcription
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a professional transcription proofreader. Your task is to correct any errors in the transcription while preserving the original meaning. Fix spelling, grammar, and punctuation errors. Do not add or remove content."},
-                {"role": "user", "content": f"Please proofread this transcription:\n\n{text}"}
-            ]
+        return cached_call(
+            "chat",
+            (service.gpt_model, system_prompt, user_content),
+            lambda: service.complete(system_prompt, user_content)
         )
-        
-        # Extract the proofread text
-        proofread_text = response.choices[0].message.content
-        
-        return proofread_text
     except Exception as e:
         # If proofreading fails, return the original text
         print(f"Proofreading failed: {str(e)}")
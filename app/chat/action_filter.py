@@ -0,0 +1,90 @@
+import re
+
+from app.chat.formats import SYSTEM_SENDER
+from config.settings import DEFAULT_SETTINGS
+
+_WEEKDAY = r"(mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun)(day|nesday|rsday|urday)?"
+
+# (pattern, weight) pairs, a message scores the weights of every pattern it matches
+ACTION_PATTERNS = [
+    # Imperative opening, e.g. "send me the contract", "pls confirm the viewing"
+    (re.compile(r"^\W*(please |pls |plz |kindly )?(send|call|check|book|confirm|pay|share|review|prepare|schedule|arrange|"
+                r"fix|update|bring|remind|finish|submit|sign|email|text|forward|organi[sz]e|order|collect|drop|pick|"
+                r"follow|reply|let me know|make sure|get|buy|sort|ask|tell|find|print|upload|draft)\b", re.IGNORECASE), 3),
+    # Requests
+    (re.compile(r"\b(please|pls|plz|kindly)\b", re.IGNORECASE), 2),
+    (re.compile(r"\b(can|could|would) (you|u|someone|somebody)\b", re.IGNORECASE), 2),
+    # Commitments, e.g. "I'll send it", "will send"
+    (re.compile(r"\b(i'll|i will|ill|we'll|we will|i'm going to|im going to|i am going to|gonna|let me|on it|"
+                r"will (send|do|call|check|share|get|bring|book|confirm|pay|sort|handle|follow|drop|update))\b", re.IGNORECASE), 3),
+    # Obligations
+    (re.compile(r"\b(need to|needs to|have to|has to|must|should|remember to|don't forget|dont forget|make sure)\b", re.IGNORECASE), 2),
+    # Deadlines, e.g. "by Friday", "before the 12th"
+    (re.compile(r"\b(by|before|until|till|due|no later than)\s+(" + _WEEKDAY + r"|tomorrow|tonight|today|end of|eod|eow|cob|"
+                r"next|this|the \d|\d)", re.IGNORECASE), 3),
+    (re.compile(r"\b(deadline|asap|urgent|eod|eow|cob|tomorrow|tonight|next (week|month)|" + _WEEKDAY + r")\b", re.IGNORECASE), 1),
+    # Dates and times, e.g. 12/06, 3pm, 14:30
+    (re.compile(r"\b\d{1,2}[/.-]\d{1,2}\b|\b\d{1,2}(:\d{2})?\s?(am|pm)\b|\b\d{1,2}:\d{2}\b", re.IGNORECASE), 1),
+    # Mentions, e.g. @Ann or @447700900123
+    (re.compile(r"@\w+"), 2),
+    # Task vocabulary
+    (re.compile(r"\b(todo|to-do|to do|action|task|follow[ -]?up|assign|assigned|responsible|owner)\b", re.IGNORECASE), 2)
+]
+
+def score_message(text):
+    """
+    Score how likely a message is to state an action item
+
+    Args:
+        text (str): Message content
+
+    Returns:
+        int: Sum of the weights of the matching action patterns
+    """
+    return sum(weight for pattern, weight in ACTION_PATTERNS if pattern.search(text))
+
+def select_action_candidates(chat_store, min_score=None, context=None):
+    """
+    Pick the messages worth sending to action point extraction
+
+    Messages scoring at least min_score are kept together with the messages
+    around them, so replies such as "ok, will do" keep the request they
+    answer.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        min_score (int, optional): Lowest score of a candidate, defaults to the setting
+        context (int, optional): Messages kept before and after each candidate, defaults to the setting
+
+    Returns:
+        list: Sorted indices of the candidates and their context
+    """
+    settings = DEFAULT_SETTINGS["chat"]
+    min_score = settings["action_min_score"] if min_score is None else min_score
+    context = settings["action_context_messages"] if context is None else context
+
+    selected = set()
+    for index in range(len(chat_store)):
+        if chat_store.sender(index) == SYSTEM_SENDER:
+            continue
+        if score_message(chat_store.content(index)) >= min_score:
+            selected.update(range(max(0, index - context), min(len(chat_store), index + context + 1)))
+
+    return sorted(selected)
+
+def filter_action_candidates(chat_store):
+    """
+    Get a store with only the action candidates of a chat and their context
+
+    The result is built once per store and reused by the estimate and the
+    extraction.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+
+    Returns:
+        MessageStore: Candidate messages in chronological order
+    """
+    if "action_candidates" not in chat_store.derived:
+        chat_store.derived["action_candidates"] = chat_store.subset(select_action_candidates(chat_store))
+    return chat_store.derived["action_candidates"]
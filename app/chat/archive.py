@@ -0,0 +1,168 @@
+import io
+import os
+import shutil
+import zipfile
+
+from app.chat.reader import detect_encoding
+
+# Name of the chat text inside iOS exports, Android names it "WhatsApp Chat with <name>.txt"
+IOS_CHAT_MEMBER = "_chat.txt"
+
+class ChatArchive:
+    """
+    Read-only view of a WhatsApp "Export chat → Attach media" zip
+
+    The chat text is streamed out of the archive without extracting it, and
+    media members are indexed by file name on first use, so attachments are
+    only decompressed when something asks for them.
+    """
+    def __init__(self, zip_path, sample_size=256 * 1024):
+        """
+        Open a chat export archive
+
+        Args:
+            zip_path (str): Path to the zip file
+            sample_size (int): Bytes of chat text used for encoding detection
+        """
+        self.zip_path = zip_path
+        self.sample_size = sample_size
+        self._zip = zipfile.ZipFile(zip_path)
+        self.chat_member = find_chat_member(self._zip.infolist())
+        if self.chat_member is None:
+            self._zip.close()
+            raise ValueError(f"No chat text file found in archive: {os.path.basename(zip_path)}")
+        self._media = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the archive
+        """
+        self._zip.close()
+
+    @property
+    def media(self):
+        """
+        Media members by file name, built on first access
+
+        Returns:
+            dict: File name to zipfile.ZipInfo
+        """
+        if self._media is None:
+            self._media = {
+                os.path.basename(info.filename): info
+                for info in self._zip.infolist()
+                if not info.is_dir() and info.filename != self.chat_member.filename
+            }
+        return self._media
+
+    def has_media(self, name):
+        """
+        Check whether the archive holds an attachment
+
+        Args:
+            name (str): Attachment file name as referenced in the chat
+
+        Returns:
+            bool: True if the attachment is in the archive
+        """
+        return name in self.media
+
+    def open_media(self, name):
+        """
+        Open an attachment for streaming reads
+
+        Args:
+            name (str): Attachment file name as referenced in the chat
+
+        Returns:
+            file: Binary file object, decompressed as it is read
+        """
+        return self._zip.open(self.media[name])
+
+    def extract_media(self, name, directory):
+        """
+        Extract one attachment to a directory, for tools that need a file path
+
+        Args:
+            name (str): Attachment file name as referenced in the chat
+            directory (str): Directory to extract into
+
+        Returns:
+            str: Path of the extracted file
+        """
+        target_path = os.path.join(directory, name)
+        with self.open_media(name) as source, open(target_path, "wb") as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        return target_path
+
+    def iter_lines(self):
+        """
+        Stream lines of the chat text out of the archive
+
+        Yields:
+            str: Lines of the chat export
+        """
+        # The encoding is detected from the head only, since zip members cannot be mapped
+        with self._zip.open(self.chat_member) as member:
+            head = member.read(self.sample_size)
+        encoding, text_start = detect_encoding(head, self.sample_size)
+        if text_start:
+            encoding = "utf-8-sig"
+
+        with self._zip.open(self.chat_member) as member:
+            with io.TextIOWrapper(member, encoding=encoding, errors="replace", newline="") as text:
+                for line in text:
+                    yield line
+
+def find_chat_member(members):
+    """
+    Find the chat text file among the members of an export archive
+
+    Args:
+        members (list): zipfile.ZipInfo entries
+
+    Returns:
+        zipfile.ZipInfo: Chat text member, or None if there is none
+    """
+    text_members = [info for info in members if not info.is_dir() and info.filename.lower().endswith(".txt")]
+
+    for info in text_members:
+        if os.path.basename(info.filename) == IOS_CHAT_MEMBER:
+            return info
+    for info in text_members:
+        if os.path.basename(info.filename).startswith("WhatsApp Chat"):
+            return info
+
+    # Otherwise the largest text file is most likely the chat
+    return max(text_members, key=lambda info: info.file_size, default=None)
+
+def is_chat_archive(file_path):
+    """
+    Check whether a chat input file is a zip export
+
+    Args:
+        file_path (str): Path to the chat export file
+
+    Returns:
+        bool: True for zip archives
+    """
+    return zipfile.is_zipfile(file_path)
+
+def iter_archive_chat_lines(zip_path):
+    """
+    Stream the chat text of a zip export line by line
+
+    Args:
+        zip_path (str): Path to the zip file
+
+    Yields:
+        str: Lines of the chat export
+    """
+    with ChatArchive(zip_path) as archive:
+        yield from archive.iter_lines()
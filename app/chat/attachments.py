@@ -0,0 +1,202 @@
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app.api.cache import hash_file, hash_stream
+from app.chat.archive import ChatArchive, is_chat_archive
+from config.settings import DEFAULT_SETTINGS
+
+# Attachment references as written by iOS ("<attached: name>") and Android ("name (file attached)")
+ATTACHMENT_PATTERN = re.compile(r'\u200e?<attached: ([^>\n]+)>|^\u200e?(\S+\.\w+) \(file attached\)', re.MULTILINE)
+
+# Extensions of voice notes and other audio WhatsApp exports
+AUDIO_EXTENSIONS = {".opus", ".ogg", ".m4a", ".mp3", ".aac", ".amr", ".wav", ".mpeg", ".mpga", ".webm"}
+
+class AttachmentSource:
+    """
+    Access to the media of a chat export, either the export's folder or its zip
+    """
+    def __init__(self, export_path):
+        """
+        Open the media source of a chat export
+
+        Args:
+            export_path (str): Path to the chat .txt file or .zip export
+        """
+        self.export_path = os.path.abspath(export_path)
+        self.archive = ChatArchive(export_path) if is_chat_archive(export_path) else None
+        self.directory = os.path.dirname(self.export_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the archive, if any
+        """
+        if self.archive is not None:
+            self.archive.close()
+
+    def exists(self, name):
+        """
+        Check whether an attachment is available
+
+        Args:
+            name (str): Attachment file name as referenced in the chat
+
+        Returns:
+            bool: True if the attachment can be read
+        """
+        if self.archive is not None:
+            return self.archive.has_media(name)
+        return os.path.isfile(os.path.join(self.directory, name))
+
+    def hash(self, name):
+        """
+        Hash the contents of an attachment
+
+        Args:
+            name (str): Attachment file name
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        if self.archive is not None:
+            with self.archive.open_media(name) as media:
+                return hash_stream(media)
+        return hash_file(os.path.join(self.directory, name))
+
+    def describe(self, name):
+        """
+        Get a lasting location of an attachment, for search results
+
+        Extracted copies are deleted after use, so attachments in a zip are
+        named by the archive path and the member name.
+
+        Args:
+            name (str): Attachment file name
+
+        Returns:
+            str: File path, or the archive path followed by the member name
+        """
+        if self.archive is not None:
+            return f"{self.export_path}/{name}"
+        return os.path.join(self.directory, name)
+
+    def local_path(self, name, temp_dir):
+        """
+        Get a file path for an attachment, extracting it from the zip if needed
+
+        Args:
+            name (str): Attachment file name
+            temp_dir (str): Directory for extracted files
+
+        Returns:
+            str: Path to the attachment on disk
+        """
+        if self.archive is not None:
+            return self.archive.extract_media(name, temp_dir)
+        return os.path.join(self.directory, name)
+
+def find_attachments(chat_store):
+    """
+    Find attachment references in a chat
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+
+    Returns:
+        list: (message index, reference text, file name) tuples in chat order
+    """
+    references = []
+    for index in range(len(chat_store)):
+        content = chat_store.content(index)
+        # Cheap check before the regex, since most messages have no attachment
+        if "attached" not in content:
+            continue
+        for match in ATTACHMENT_PATTERN.finditer(content):
+            references.append((index, match.group(0), (match.group(1) or match.group(2)).strip()))
+    return references
+
+def is_audio_attachment(name):
+    """
+    Check whether an attachment is a voice note or other audio
+
+    Args:
+        name (str): Attachment file name
+
+    Returns:
+        bool: True for audio files
+    """
+    return os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS
+
+def transcribe_voice_notes(chat_store, export_path, transcription_type="cleaned", max_workers=None):
+    """
+    Transcribe the voice notes referenced in a chat and splice the transcripts into it
+
+    Each distinct recording is transcribed once, so forwarded voice notes
+    with identical audio share one transcription. Recordings are transcribed
+    concurrently, and each reference is replaced by its transcript.
+
+    Args:
+        chat_store (MessageStore): Structured chat data, updated in place
+        export_path (str): Path to the chat .txt file or .zip export
+        transcription_type (str): 'verbatim' or 'cleaned'
+        max_workers (int, optional): Concurrent transcriptions
+
+    Returns:
+        dict: Counts of voice notes found, missing, transcribed, and failed
+    """
+    from app.audio.transcription import transcribe_audio
+
+    max_workers = max_workers or DEFAULT_SETTINGS["chat"]["attachment_workers"]
+    proofreading = DEFAULT_SETTINGS["transcription"]["proofreading"]
+    references = [reference for reference in find_attachments(chat_store) if is_audio_attachment(reference[2])]
+    stats = {"voice_notes": len(references), "missing": 0, "unique": 0, "transcribed": 0, "failed": 0}
+    if not references:
+        return stats
+
+    with AttachmentSource(export_path) as source, tempfile.TemporaryDirectory() as temp_dir:
+        # Group references by audio content
+        names_by_hash = {}
+        hash_by_name = {}
+        for _, _, name in references:
+            if name in hash_by_name:
+                continue
+            if not source.exists(name):
+                stats["missing"] += 1
+                hash_by_name[name] = None
+                continue
+            content_hash = source.hash(name)
+            hash_by_name[name] = content_hash
+            names_by_hash.setdefault(content_hash, name)
+        stats["unique"] = len(names_by_hash)
+
+        def transcribe(name):
+            try:
+                return transcribe_audio(source.local_path(name, temp_dir), transcription_type, proofreading, source.describe(name))
+            except Exception as e:
+                print(f"Error transcribing voice note {name}: {str(e)}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names_by_hash)))) as executor:
+            transcripts = dict(zip(names_by_hash, executor.map(transcribe, names_by_hash.values())))
+
+    stats["transcribed"] = sum(1 for transcript in transcripts.values() if transcript)
+    stats["failed"] = len(transcripts) - stats["transcribed"]
+
+    # Splice the transcripts into the messages that reference them
+    replacements = {}
+    for index, reference, name in references:
+        transcript = transcripts.get(hash_by_name[name])
+        if transcript:
+            content = replacements.get(index, chat_store.content(index))
+            replacements[index] = content.replace(reference, f"[Voice note: {transcript.strip()}]", 1)
+    for index, content in replacements.items():
+        chat_store.set_content(index, content)
+
+    return stats
@@ -0,0 +1,240 @@
+import os
+import re
+import json
+import hashlib
+
+from app.chat.formats import CHAT_FORMATS, detect_chat_format, sample_lines
+from app.chat.parser import iter_whatsapp_messages
+from app.chat.reader import ChatFileReader
+from app.chat.store import MessageStore
+from config.settings import DEFAULT_SETTINGS
+
+# Directory holding one checkpoint per chat
+CHECKPOINT_DIR = os.path.join(DEFAULT_SETTINGS["storage"]["local_path"], "checkpoints")
+
+def get_chat_id(file_path):
+    """
+    Derive a stable chat id from an export file name and its folder
+
+    Re-exports of the same chat keep their name apart from a copy suffix
+    such as " (1)", which is ignored. Different chats often share a name,
+    e.g. every unzipped iOS export is _chat.txt, so the id also carries a
+    short hash of the folder the export is in.
+
+    Args:
+        file_path (str): Path to the chat export file
+
+    Returns:
+        str: Chat id
+    """
+    file_path = os.path.abspath(file_path)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    name = re.sub(r'\s*\(\d+\)$', '', name)
+    name = re.sub(r'[^\w.-]+', '_', name).strip("_") or "chat"
+    folder_hash = hashlib.sha256(os.path.dirname(file_path).encode("utf-8")).hexdigest()[:12]
+    return f"{name}-{folder_hash}"
+
+def parse_chat_file_incremental(file_path, chat_id=None, checkpoint_dir=None, workers=1):
+    """
+    Parse a chat export, reusing the checkpoint from a previous import
+
+    If the export still starts with the previously imported bytes, only the
+    tail from the last known message onwards is parsed and appended to the
+    stored messages. Otherwise the whole file is parsed. A new checkpoint is
+    saved either way.
+
+    Args:
+        file_path (str): Path to the chat export file
+        chat_id (str, optional): Chat id, derived from the file name if not given
+        checkpoint_dir (str, optional): Directory holding checkpoints
+        workers (int): Worker processes for a full parse, 0 for one per CPU core
+
+    Returns:
+        tuple: (MessageStore, dict of import statistics)
+    """
+    chat_id = chat_id or get_chat_id(file_path)
+    checkpoint_dir = checkpoint_dir or CHECKPOINT_DIR
+    checkpoint = load_checkpoint(chat_id, checkpoint_dir)
+
+    with ChatFileReader(file_path) as reader:
+        if checkpoint and _prefix_unchanged(reader, checkpoint):
+            chat_store = MessageStore.load(_store_path(chat_id, checkpoint_dir))
+            chat_format = CHAT_FORMATS[checkpoint["format"]].with_date_order(checkpoint["date_order"])
+
+            # The last message may have gained continuation lines, so it is parsed again
+            reused = checkpoint["message_count"] - 1
+            chat_store.truncate(reused)
+            start = checkpoint["last_message_offset"]
+            chat_store.extend(iter_whatsapp_messages(reader.iter_lines(start), chat_format))
+        else:
+            sample, lines = sample_lines(reader.iter_lines())
+            chat_format = detect_chat_format(sample)
+            reused = 0
+            start = reader.text_start
+
+            chat_store = MessageStore(chat_format.date_order)
+            if workers != 1:
+                from app.chat.parallel import iter_whatsapp_messages_parallel
+                chat_store.extend(iter_whatsapp_messages_parallel(file_path, workers or None, chat_format))
+            else:
+                chat_store.extend(iter_whatsapp_messages(lines, chat_format))
+
+        save_checkpoint(chat_id, reader, chat_store, chat_format, start, checkpoint_dir)
+
+        stats = {
+            "chat_id": chat_id,
+            "reused_messages": reused,
+            "new_messages": len(chat_store) - reused,
+            "parsed_bytes": reader.size - start
+        }
+
+    return chat_store, stats
+
+def load_checkpoint(chat_id, checkpoint_dir=None):
+    """
+    Load the checkpoint of a chat
+
+    Args:
+        chat_id (str): Chat id
+        checkpoint_dir (str, optional): Directory holding checkpoints
+
+    Returns:
+        dict: Checkpoint data, or None if there is no usable checkpoint
+    """
+    checkpoint_dir = checkpoint_dir or CHECKPOINT_DIR
+    checkpoint_path = _checkpoint_path(chat_id, checkpoint_dir)
+
+    if not os.path.exists(checkpoint_path) or not os.path.exists(_store_path(chat_id, checkpoint_dir)):
+        return None
+
+    try:
+        with open(checkpoint_path, "r") as f:
+            checkpoint = json.load(f)
+    except Exception as e:
+        print(f"Error loading checkpoint: {str(e)}")
+        return None
+
+    # Checkpoints from before the whole prefix was hashed cannot be verified
+    if checkpoint.get("format") not in CHAT_FORMATS or "prefix_hash" not in checkpoint:
+        return None
+    return checkpoint
+
+def save_checkpoint(chat_id, reader, chat_store, chat_format, search_from, checkpoint_dir=None):
+    """
+    Save the checkpoint of a chat after an import
+
+    Args:
+        chat_id (str): Chat id
+        reader (ChatFileReader): Open chat file that was imported
+        chat_store (MessageStore): Parsed messages
+        chat_format (ChatFormat): Export layout
+        search_from (int): Byte offset of a message header at or before the last message
+        checkpoint_dir (str, optional): Directory holding checkpoints
+
+    Returns:
+        bool: Success status
+    """
+    checkpoint_dir = checkpoint_dir or CHECKPOINT_DIR
+
+    if not len(chat_store) or not reader.supports_byte_ranges:
+        return False
+
+    last_message_offset = _last_message_start(reader, chat_format, search_from)
+
+    checkpoint = {
+        "chat_id": chat_id,
+        "file_size": reader.size,
+        "prefix_hash": _hash_range(reader, 0, last_message_offset),
+        "last_message_offset": last_message_offset,
+        "last_message_hash": _hash_range(reader, last_message_offset, reader.size),
+        "message_count": len(chat_store),
+        "format": chat_format.name,
+        # The store may have switched order after the format was detected
+        "date_order": chat_store.date_order
+    }
+
+    try:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        chat_store.save(_store_path(chat_id, checkpoint_dir))
+        with open(_checkpoint_path(chat_id, checkpoint_dir), "w") as f:
+            json.dump(checkpoint, f, indent=4)
+        return True
+    except Exception as e:
+        print(f"Error saving checkpoint: {str(e)}")
+        return False
+
+def _prefix_unchanged(reader, checkpoint):
+    """
+    Check that an export still starts with the previously imported bytes
+
+    Every byte up to the end of the last imported message must match, so
+    an edited or redacted message anywhere in a re-export is noticed.
+    Hashing is cheap next to parsing, so the whole prefix is read.
+
+    Args:
+        reader (ChatFileReader): Open chat file
+        checkpoint (dict): Checkpoint data
+
+    Returns:
+        bool: True if the checkpoint can be reused
+    """
+    if not reader.supports_byte_ranges or reader.size < checkpoint["file_size"]:
+        return False
+    if _hash_range(reader, 0, checkpoint["last_message_offset"]) != checkpoint["prefix_hash"]:
+        return False
+    last_hash = _hash_range(reader, checkpoint["last_message_offset"], checkpoint["file_size"])
+    return last_hash == checkpoint["last_message_hash"]
+
+def _last_message_start(reader, chat_format, search_from):
+    """
+    Find the byte offset of the last message header in the file
+
+    Lines are checked backwards from the end of the file.
+
+    Args:
+        reader (ChatFileReader): Open chat file
+        chat_format (ChatFormat): Export layout
+        search_from (int): Offset to stop searching at
+
+    Returns:
+        int: Byte offset of the last header line
+    """
+    line_end = reader.size
+
+    while line_end > search_from:
+        newline = reader.data.rfind(b"\n", search_from, line_end - 1)
+        line_start = search_from if newline == -1 else newline + 1
+        if chat_format.match(reader.decode(line_start, line_end)):
+            return line_start
+        line_end = line_start
+
+    return search_from
+
+def _hash_range(reader, start, end):
+    """
+    Hash a byte range of the file
+
+    Args:
+        reader (ChatFileReader): Open chat file
+        start (int): Start byte offset
+        end (int): End byte offset
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    for offset in range(start, end, 1024 * 1024):
+        digest.update(reader.data[offset:min(offset + 1024 * 1024, end)])
+    return digest.hexdigest()
+
+def _checkpoint_path(chat_id, checkpoint_dir):
+    """
+    Get the path of a chat's checkpoint metadata file
+    """
+    return os.path.join(checkpoint_dir, f"{chat_id}.json")
+
+def _store_path(chat_id, checkpoint_dir):
+    """
+    Get the path of a chat's saved message store
+    """
+    return os.path.join(checkpoint_dir, f"{chat_id}.messages")
@@ -0,0 +1,182 @@
+import re
+
+import numpy as np
+
+from app.chat.topics import FEATURE_COUNT, vectorize
+
+# Most messages ranked at once, the similarity matrix grows with the square
+MAX_CANDIDATES = 800
+
+# Messages with fewer words carry too little to quote in a summary
+MIN_WORDS = 4
+
+# PageRank damping factor and iterations
+DAMPING = 0.85
+ITERATIONS = 30
+
+# Messages listed under each section
+SECTION_SIZE = 5
+
+# Cues that place a ranked message under a section, matched against its lowercase text
+SECTION_CUES = {
+    "decision": re.compile(r"\b(agreed|decided|decision|confirmed|approved|final|settled|go with|going with)\b"),
+    "next": re.compile(r"\b(will|need to|needs to|please|tomorrow|next|by (mon|tue|wed|thu|fri|sat|sun|end|tomorrow)\w*|follow up|todo|to do)\b"),
+    "money": re.compile(r"[$£€₦]|\b(budget|price|cost|quote|invoice|deposit|payment|paid|pay|fee|offer)\b"),
+    "time": re.compile(r"\b(deadline|schedule|date|week|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|\d{1,2}(st|nd|rd|th)|\d{1,2}[/.]\d{1,2})\b"),
+    "preference": re.compile(r"\b(prefer|prefers|like|likes|want|wants|rather|must|should|require|requires|need|needs)\b"),
+    "property": re.compile(r"\b(bed|bedroom|bath|sqm|sq ft|sqft|garden|kitchen|parking|floor|flat|apartment|house|property)\b"),
+    "viewing": re.compile(r"\b(viewing|viewed|visit|visited|saw|inspection|inspect)\b"),
+    "account": re.compile(r"\b(client|customer|account|company|ltd|inc)\b")
+}
+
+# Template sections in the order of get_template_prompt, each with the cue that fills it
+# (None for the overview section, which takes the best messages left over)
+TEMPLATE_SECTIONS = {
+    "Meeting Summary": [
+        ("Meeting Overview", None),
+        ("Key Discussion Points", None),
+        ("Decisions Made", "decision"),
+        ("Next Steps", "next")
+    ],
+    "Client Brief": [
+        ("Requirements", "preference"),
+        ("Preferences", "preference"),
+        ("Timeline", "time"),
+        ("Budget", "money"),
+        ("Other Details", None)
+    ],
+    "Sales Report": [
+        ("Overview", None),
+        ("Key Accounts", "account"),
+        ("Pipeline", "money"),
+        ("Forecast", "time")
+    ],
+    "Real Estate Checklist": [
+        ("Property Details", "property"),
+        ("Client Requirements", "preference"),
+        ("Viewing Notes", "viewing"),
+        ("Follow-up Items", "next")
+    ]
+}
+
+def extractive_summary(chat_store, template_type):
+    """
+    Summarize a chat locally by picking its most central messages
+
+    Messages are ranked TextRank-style: a cosine similarity matrix over
+    hashed TF-IDF vectors is treated as a graph and scored with PageRank.
+    The top messages are placed under the section headings of the template,
+    so the result has the same shape as a model summary. Runs in
+    milliseconds and needs no API call.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+
+    Returns:
+        str: Summary with the template's section headings
+    """
+    sections = TEMPLATE_SECTIONS.get(template_type, TEMPLATE_SECTIONS["Meeting Summary"])
+    ranked = rank_messages(chat_store)
+
+    placed = {title: [] for title, _ in sections}
+    used = set()
+
+    # Sections with a cue take the best ranked messages that match it
+    for title, cue in sections:
+        if cue is None:
+            continue
+        for index in ranked:
+            if len(placed[title]) >= SECTION_SIZE:
+                break
+            if index not in used and SECTION_CUES[cue].search(chat_store.content(index).lower()):
+                placed[title].append(index)
+                used.add(index)
+
+    # Sections without a cue share the best messages left over
+    open_sections = [title for title, cue in sections if cue is None]
+    remaining = [index for index in ranked if index not in used]
+    for position, title in enumerate(open_sections):
+        placed[title] = remaining[position * SECTION_SIZE:(position + 1) * SECTION_SIZE]
+
+    lines = [_describe_chat(chat_store), ""]
+    for number, (title, _) in enumerate(sections, 1):
+        lines.append(f"{number}) {title}")
+        # Messages are listed in chat order under each heading
+        for index in sorted(placed[title]):
+            lines.append(f"- {chat_store.sender(index)} ({chat_store.date(index)}): {_one_line(chat_store.content(index))}")
+        if not placed[title]:
+            lines.append("- Nothing found in the chat")
+        lines.append("")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+def rank_messages(chat_store):
+    """
+    Rank messages by centrality with PageRank over their similarity graph
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+
+    Returns:
+        list: Message indices, most central first
+    """
+    rows, columns, values, _ = vectorize(chat_store)
+    if not len(rows):
+        return []
+
+    # Candidates are messages long enough to quote, the wordiest ones if there are too many
+    word_counts = np.bincount(rows, minlength=len(chat_store))
+    candidates = np.flatnonzero(word_counts >= MIN_WORDS)
+    if not len(candidates):
+        candidates = np.flatnonzero(word_counts > 0)
+    if len(candidates) > MAX_CANDIDATES:
+        candidates = np.sort(candidates[np.argsort(-word_counts[candidates], kind="stable")[:MAX_CANDIDATES]])
+
+    mask = np.isin(rows, candidates)
+    matrix = np.zeros((len(candidates), FEATURE_COUNT), dtype=np.float32)
+    matrix[np.searchsorted(candidates, rows[mask]), columns[mask]] = values[mask]
+
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+
+    # Rows with no similar message link to every message evenly
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight > 0, out_weight, 1), 1 / len(candidates))
+
+    scores = np.full(len(candidates), 1 / len(candidates), dtype=np.float32)
+    for _ in range(ITERATIONS):
+        scores = (1 - DAMPING) / len(candidates) + DAMPING * (transition.T @ scores)
+
+    return candidates[np.argsort(-scores, kind="stable")].tolist()
+
+def _describe_chat(chat_store):
+    """
+    Describe the extent of a chat in one line
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+
+    Returns:
+        str: Message count, participants, and date span
+    """
+    if not len(chat_store):
+        return "Extractive summary of an empty chat."
+    first, last = chat_store.date(0), chat_store.date(len(chat_store) - 1)
+    period = first if first == last else f"{first} to {last}"
+    participants = ", ".join(chat_store.senders[:6]) + (" and others" if len(chat_store.senders) > 6 else "")
+    return f"Extractive summary of {len(chat_store)} messages between {participants}, {period}."
+
+def _one_line(text, limit=300):
+    """
+    Collapse a message to one line of bounded length
+
+    Args:
+        text (str): Message content
+        limit (int): Maximum characters
+
+    Returns:
+        str: Single-line text
+    """
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
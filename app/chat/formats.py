@@ -0,0 +1,313 @@
+import re
+import calendar
+import datetime
+from functools import lru_cache
+from itertools import islice
+
+# Building blocks shared by the per-locale grammars
+_DATE = r'(?P<date>\d{1,4}[./-]\d{1,2}[./-]\d{1,4})'
+_AMPM = r'(?:[AaPp]\.?\s?[Mm]\.?|vorm\.|nachm\.)'
+_TIME = r'(?P<time>\d{1,2}[:.]\d{2}(?:[:.]\d{2})?(?:[\s\u202f]?' + _AMPM + r')?)'
+_BODY = r'(?:(?P<sender>[^:]+?):\s)?(?P<content>.*)'
+
+_DATE_SEPARATORS = re.compile(r'[./-]')
+_TIME_FIELDS = re.compile(r'(\d{1,2})[:.](\d{2})(?:[:.](\d{2}))?')
+
+# Sender assigned to lines that have a timestamp but no author (joins, leaves, security notices)
+SYSTEM_SENDER = "System"
+
+# Units of relative time bounds such as "7d"
+_RELATIVE_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400}
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Characters a message header line can start with; anything else is a continuation line
+DEFAULT_PREFIXES = "0123456789[\u200e"
+
+class ChatFormat:
+    """
+    Precompiled line grammar for one WhatsApp export layout
+    """
+    __slots__ = ("name", "pattern", "prefixes", "date_order")
+
+    def __init__(self, name, pattern, prefixes=DEFAULT_PREFIXES, date_order="dmy"):
+        """
+        Initialize a chat format
+
+        Args:
+            name (str): Format name
+            pattern (str): Regular expression with date, time, sender, and content groups
+            prefixes (str): Characters a header line can start with
+            date_order (str): Order of the date fields, 'dmy', 'mdy', or 'ymd'
+        """
+        self.name = name
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.prefixes = frozenset(prefixes)
+        self.date_order = date_order
+
+    def match(self, line):
+        """
+        Match a chat line against this grammar
+
+        Args:
+            line (str): Raw chat line
+
+        Returns:
+            re.Match: Match object, or None for continuation lines
+        """
+        # Cheap prefix check so continuation lines skip the regex entirely
+        if not line or line[0] not in self.prefixes:
+            return None
+        return self.pattern.match(line)
+
+    def with_date_order(self, date_order):
+        """
+        Get a copy of this format with a different date order
+
+        Args:
+            date_order (str): 'dmy', 'mdy', or 'ymd'
+
+        Returns:
+            ChatFormat: Format copy
+        """
+        return ChatFormat(self.name, self.pattern, "".join(self.prefixes), date_order)
+
+# Registry of known export layouts, in detection priority order
+CHAT_FORMATS = {}
+
+def register_chat_format(chat_format):
+    """
+    Add a chat format to the registry
+
+    Args:
+        chat_format (ChatFormat): Format to register
+
+    Returns:
+        ChatFormat: The registered format
+    """
+    CHAT_FORMATS[chat_format.name] = chat_format
+    return chat_format
+
+# iOS: [31/12/23, 11:59:59 PM] Sender: message
+register_chat_format(ChatFormat(
+    "ios",
+    r'\u200e?\[' + _DATE + r',?\s' + _TIME + r'\]\s' + _BODY
+))
+
+# Android: 31/12/23, 23:59 - Sender: message (also 31.12.23 and 12/31/23, 11:59 PM)
+register_chat_format(ChatFormat(
+    "android",
+    r'\u200e?' + _DATE + r',?\s' + _TIME + r'\s[-\u2013]\s' + _BODY
+))
+
+def detect_chat_format(sample_lines):
+    """
+    Detect the export layout from a sample of chat lines
+
+    Args:
+        sample_lines (list): First few hundred lines of the chat
+
+    Returns:
+        ChatFormat: Best matching format with its date order resolved
+    """
+    best_format = None
+    best_dates = []
+
+    for chat_format in CHAT_FORMATS.values():
+        dates = []
+        for line in sample_lines:
+            match = chat_format.match(line)
+            if match:
+                dates.append(match.group("date"))
+        if best_format is None or len(dates) > len(best_dates):
+            best_format = chat_format
+            best_dates = dates
+
+    return best_format.with_date_order(detect_date_order(best_dates))
+
+def detect_date_order(date_strings):
+    """
+    Work out whether dates are day-first, month-first, or year-first
+
+    Args:
+        date_strings (list): Date strings from the chat
+
+    Returns:
+        str: 'dmy', 'mdy', or 'ymd'
+    """
+    day_first_votes = 0
+    month_first_votes = 0
+
+    for date_str in date_strings:
+        parts = _DATE_SEPARATORS.split(date_str)
+        if len(parts[0]) == 4:
+            return "ymd"
+        first, second = int(parts[0]), int(parts[1])
+        if first > 12:
+            day_first_votes += 1
+        elif second > 12:
+            month_first_votes += 1
+
+    # Most locales are day-first, so ties default to it
+    return "mdy" if month_first_votes > day_first_votes else "dmy"
+
+def fallback_date_order(date_strings, date_order):
+    """
+    Find the date order to switch to after a date failed to parse
+
+    The order is detected from the first lines only, so a US export whose
+    first days are all 12th or earlier looks day-first until a date such as
+    1/13/24 appears. Day and month are then swapped, as long as every date
+    seen so far is also valid the other way round.
+
+    Args:
+        date_strings (iterable): Every date string seen so far, including the failed one
+        date_order (str): Current order, 'dmy', 'mdy', or 'ymd'
+
+    Returns:
+        str: 'dmy' or 'mdy', or None if no other order fits the dates
+    """
+    if date_order == "ymd":
+        return None
+    other = "mdy" if date_order == "dmy" else "dmy"
+    if all(parse_date(date_str, other) is not None for date_str in date_strings):
+        return other
+    return None
+
+def parse_timestamp(date_str, time_str, date_order="dmy"):
+    """
+    Convert an export date and time to epoch seconds
+
+    Times are taken as written, without a timezone. A chat has few distinct
+    dates and times but many messages, so both halves are memoized.
+
+    Args:
+        date_str (str): Date as written in the export
+        time_str (str): Time as written in the export
+        date_order (str): 'dmy', 'mdy', or 'ymd'
+
+    Returns:
+        int: Seconds since the epoch, or None if the date is invalid in this order
+    """
+    day_start = parse_date(date_str, date_order)
+    if day_start is None:
+        return None
+    return day_start + parse_time(time_str)
+
+@lru_cache(maxsize=4096)
+def parse_date(date_str, date_order="dmy"):
+    """
+    Convert an export date to epoch seconds at midnight
+
+    Args:
+        date_str (str): Date as written in the export
+        date_order (str): 'dmy', 'mdy', or 'ymd'
+
+    Returns:
+        int: Seconds since the epoch, or None if the date is invalid
+    """
+    parts = [int(part) for part in _DATE_SEPARATORS.split(date_str)]
+    if date_order == "ymd":
+        year, month, day = parts
+    elif date_order == "mdy":
+        month, day, year = parts
+    else:
+        day, month, year = parts
+    if year < 100:
+        year += 2000
+
+    # Days past the end of the month would roll over into the next one
+    if not (1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]):
+        return None
+    return calendar.timegm((year, month, day, 0, 0, 0))
+
+@lru_cache(maxsize=4096)
+def parse_time(time_str):
+    """
+    Convert an export time to seconds since midnight
+
+    Args:
+        time_str (str): Time as written in the export
+
+    Returns:
+        int: Seconds since midnight
+    """
+    time_match = _TIME_FIELDS.match(time_str)
+    hour = int(time_match.group(1))
+    minute = int(time_match.group(2))
+    second = int(time_match.group(3) or 0)
+
+    # Convert 12h clock times using the AM/PM marker, if any
+    marker = time_str[time_match.end():].strip().lower()
+    if marker:
+        if marker.startswith(("p", "nachm")) and hour < 12:
+            hour += 12
+        elif marker.startswith(("a", "vorm")) and hour == 12:
+            hour = 0
+
+    return hour * 3600 + minute * 60 + second
+
+def resolve_time_bound(value, now=None):
+    """
+    Convert a time range option to epoch seconds on the chat clock
+
+    Export times carry no timezone, so relative bounds are measured from the
+    current local wall-clock time read the same way.
+
+    Args:
+        value: Epoch seconds, a date or datetime, an ISO date string, "today",
+            "yesterday", a weekday name for its most recent midnight, or a
+            relative span such as "24h", "7d", or "2w"
+        now (datetime.datetime, optional): Reference time, defaults to now
+
+    Returns:
+        int: Seconds since the epoch, or None if no bound is given
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime.datetime):
+        return calendar.timegm(value.timetuple())
+    if isinstance(value, datetime.date):
+        return calendar.timegm(value.timetuple())
+
+    now = now or datetime.datetime.now()
+    today = calendar.timegm(now.date().timetuple())
+    text = str(value).strip().lower()
+
+    if text == "today":
+        return today
+    if text == "yesterday":
+        return today - 86400
+    if text in _WEEKDAYS:
+        days_back = (now.weekday() - _WEEKDAYS.index(text)) % 7
+        return today - days_back * 86400
+
+    relative = re.fullmatch(r'(\d+)\s*([hdw])', text)
+    if relative:
+        return calendar.timegm(now.timetuple()) - int(relative.group(1)) * _RELATIVE_UNITS[relative.group(2)]
+
+    try:
+        return calendar.timegm(datetime.datetime.fromisoformat(text).timetuple())
+    except ValueError:
+        raise ValueError(f"Unrecognized time bound: {value}")
+
+def sample_lines(lines, sample_size=300):
+    """
+    Take a sample from a line stream without losing any lines
+
+    Args:
+        lines (iterable): Iterable of chat lines
+        sample_size (int): Number of lines to sample
+
+    Returns:
+        tuple: (sample list, iterator over all lines including the sample)
+    """
+    lines = iter(lines)
+    sample = list(islice(lines, sample_size))
+
+    def replay():
+        yield from sample
+        yield from lines
+
+    return sample, replay()
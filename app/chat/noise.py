@@ -0,0 +1,102 @@
+import re
+
+from app.api.budget import count_tokens
+from app.chat.formats import SYSTEM_SENDER
+from config.settings import DEFAULT_SETTINGS
+
+# Messages without content, by kind, matched against the message with any leading LRM mark removed
+NOISE_PATTERNS = {
+    "encryption": re.compile(
+        r"^(messages and calls are end-to-end encrypted|messages to this (group|chat) are now secured with end-to-end encryption"
+        r"|your security code with .+ changed|.+'s security code changed|messages you send to this (chat|group) .*encrypted)",
+        re.IGNORECASE
+    ),
+    "media_omitted": re.compile(
+        r"^<?(media|image|video|audio|sticker|gif|document|contact card|video note) omitted>?$", re.IGNORECASE
+    ),
+    "deleted": re.compile(r"^(this message was deleted|you deleted this message)\.?$", re.IGNORECASE),
+    "membership": re.compile(
+        r"(\bjoined using this group.s invite link|\bjoined from the community|\bleft$|\badded .+|\bremoved .+|\bcreated (the )?group\b"
+        r"|\bchanged (the subject|this group.s (icon|settings)|the group (description|name)|their phone number|to .+)"
+        r"|\b(is|are) now an admin$|\bno longer an admin$|\bdeleted this group.s icon$|\bwas added$|\bwere added$)",
+        re.IGNORECASE
+    ),
+    "missed_call": re.compile(r"^(missed (group )?(voice|video) call|silenced (voice|video) call)\b", re.IGNORECASE)
+}
+
+# Kinds only applied to notices, so messages such as "I left early" are kept
+SYSTEM_ONLY = {"membership"}
+
+def is_system_notice(sender, content):
+    """
+    Check whether a message is a notice from WhatsApp rather than a person
+
+    Android exports write notices without a sender, iOS exports mark them
+    with a leading LRM character.
+
+    Args:
+        sender (str): Message sender
+        content (str): Message content
+
+    Returns:
+        bool: True for notices
+    """
+    return sender == SYSTEM_SENDER or content.startswith("\u200e")
+
+def classify_noise(sender, content, kinds):
+    """
+    Find which kind of noise a message is, if any
+
+    Args:
+        sender (str): Message sender
+        content (str): Message content
+        kinds (iterable): Noise kinds to check, keys of NOISE_PATTERNS
+
+    Returns:
+        str: Matching kind, or None for messages with content
+    """
+    text = content.lstrip("\u200e").strip()
+    notice = None
+    for kind in kinds:
+        if kind in SYSTEM_ONLY:
+            if notice is None:
+                notice = is_system_notice(sender, content)
+            if not notice:
+                continue
+        if NOISE_PATTERNS[kind].search(text):
+            return kind
+    return None
+
+def filter_noise(chat_store, kinds=None):
+    """
+    Remove messages without content before the chat reaches any prompt
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        kinds (list, optional): Noise kinds to remove, defaults to the setting
+
+    Returns:
+        tuple: (store without the noise messages, stats with the count per kind,
+            messages removed, and prompt tokens saved)
+    """
+    kinds = DEFAULT_SETTINGS["chat"]["noise_filter"] if kinds is None else kinds
+    kinds = [kind for kind in kinds if kind in NOISE_PATTERNS]
+
+    counts = dict.fromkeys(kinds, 0)
+    kept = []
+    tokens_saved = 0
+    for index in range(len(chat_store)):
+        sender = chat_store.sender(index)
+        content = chat_store.content(index)
+        kind = classify_noise(sender, content, kinds) if kinds else None
+        if kind is None:
+            kept.append(index)
+            continue
+        counts[kind] += 1
+        # Counted as the line format_structured_chat would have written
+        tokens_saved += count_tokens(f"[{chat_store.time(index)}] {sender}: {content}\n")
+
+    stats = {"removed": len(chat_store) - len(kept), "by_kind": counts, "tokens_saved": tokens_saved}
+    if len(kept) == len(chat_store):
+        return chat_store, stats
+    return chat_store.subset(kept), stats
@@ -0,0 +1,336 @@
+import os
+import re
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from config.settings import DEFAULT_SETTINGS
+
+# Lines at the edge of a screenshot are often cut off, so overlaps may miss this many
+OVERLAP_SLACK = 2
+
+# Shortest shared run taken as overlap, in normalized characters, so repeated short lines such as "ok" are not enough
+MIN_OVERLAP_CHARS = 16
+
+# Time under a chat bubble, optionally followed by OCR noise from the read ticks
+BUBBLE_TIME = re.compile(r'^(\d{1,2}[:.]\d{2}(?:\s?[AaPp]\.?\s?[Mm]\.?)?)\W*$')
+
+# Line that can be a sender name above a bubble: a few words, starting with a capital, "~" or a phone number
+SENDER_NAME = re.compile(r"^[~+]?\s?[A-Z0-9][\w.'+\- ]{0,39}$")
+
+# Date separators between the bubbles, as shown by WhatsApp
+DATE_HEADER_FORMATS = ["%d %B %Y", "%B %d, %Y", "%d %b %Y", "%b %d, %Y", "%A, %d %B %Y", "%A, %B %d, %Y"]
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Sender of bubbles shown without a name, before any name appears
+UNKNOWN_SENDER = "Unknown"
+
+def tesseract_backend(image):
+    """
+    Recognize text with Tesseract
+
+    Args:
+        image (PIL.Image.Image): Grayscale image
+
+    Returns:
+        str: Recognized text
+    """
+    try:
+        import pytesseract
+    except ImportError:
+        raise ImportError("The tesseract OCR backend needs the pytesseract package and the tesseract binary")
+    return pytesseract.image_to_string(image)
+
+# OCR backends by name, each taking a PIL image and returning its text
+OCR_BACKENDS = {
+    "tesseract": tesseract_backend
+}
+
+def register_ocr_backend(name, backend):
+    """
+    Register an OCR backend
+
+    The backend must be a module-level function so it can run in worker processes.
+
+    Args:
+        name (str): Backend name used in the settings
+        backend (callable): Function taking a PIL image and returning its text
+    """
+    OCR_BACKENDS[name] = backend
+
+def extract_chat_text(image_paths, backend=None, workers=None, max_width=None):
+    """
+    Read a chat from overlapping screenshots
+
+    Screenshots are recognized in parallel and the overlapping lines between
+    consecutive pages are removed. The bubbles are then written as export
+    lines, so the text parses like an iOS export.
+
+    Args:
+        image_paths (list): Paths to screenshot images, in page order
+        backend (str, optional): OCR backend name, defaults to the setting
+        workers (int, optional): Worker processes, 0 for one per CPU core
+        max_width (int, optional): Width screenshots are scaled down to
+
+    Returns:
+        str: Chat text with one "[date, time] sender: text" line per bubble
+    """
+    settings = DEFAULT_SETTINGS["chat"]
+    backend = backend or settings["ocr_backend"]
+    workers = settings["ocr_workers"] if workers is None else workers
+    max_width = max_width or settings["ocr_max_width"]
+
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend: {backend}")
+
+    # Workers may start without the parent's registered backends, so they get the function itself
+    backend = OCR_BACKENDS[backend]
+
+    # Pages are stitched in the order the caller chose
+    tasks = [(path, backend, max_width) for path in image_paths]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    if workers <= 1:
+        pages = [ocr_screenshot(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pages = list(executor.map(ocr_screenshot, tasks))
+
+    return "\n".join(format_bubbles(stitch_pages(pages)))
+
+def ocr_screenshot(task):
+    """
+    Decode, downscale, and recognize one screenshot in a worker process
+
+    Args:
+        task (tuple): (image path, backend function, maximum width)
+
+    Returns:
+        list: Non-empty text lines of the screenshot
+    """
+    image_path, backend, max_width = task
+    image = load_image(image_path, max_width)
+    text = backend(image)
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+def load_image(image_path, max_width):
+    """
+    Load a screenshot as a grayscale image no wider than a limit
+
+    JPEGs are decoded in draft mode, which scales them down during decoding
+    instead of decoding the full image first.
+
+    Args:
+        image_path (str): Path to the image
+        max_width (int): Maximum width in pixels
+
+    Returns:
+        PIL.Image.Image: Grayscale image
+    """
+    from PIL import Image
+
+    image = Image.open(image_path)
+    if image.format == "JPEG" and image.width > max_width:
+        # Draft mode only scales by powers of two, so request at least the target size
+        image.draft("L", (max_width, image.height * max_width // image.width))
+
+    image = image.convert("L")
+    if image.width > max_width:
+        image = image.resize((max_width, image.height * max_width // image.width), Image.LANCZOS)
+    return image
+
+def stitch_pages(pages):
+    """
+    Join the lines of consecutive screenshots, dropping the lines they share
+
+    Args:
+        pages (list): Lists of text lines, one per screenshot in order
+
+    Returns:
+        list: Chat lines without the duplicated overlap
+    """
+    lines = []
+    for page in pages:
+        cut_lines, skip = find_overlap(lines, page)
+        # Lines cut off at the bottom of the previous page appear whole on this one
+        del lines[len(lines) - cut_lines:]
+        lines.extend(page[skip:])
+    return lines
+
+def format_bubbles(lines, today=None):
+    """
+    Turn stitched screenshot lines into export lines
+
+    A screenshot shows each message as a bubble: the sender's name in group
+    chats, the text, and the time below it. Date separators such as "Today"
+    or "12 January 2024" set the date of the bubbles after them. Bubbles
+    without a name keep the sender of the bubble before them.
+
+    Args:
+        lines (list): Stitched chat lines
+        today (datetime.date, optional): Date of "Today", defaults to the current date
+
+    Returns:
+        list: "[date, time] sender: text" lines, with continuation lines for multi-line bubbles
+    """
+    today = today or datetime.date.today()
+    date = today
+    sender = UNKNOWN_SENDER
+    senders = set()
+    bubble = []
+    last_time = None
+    chat_lines = []
+
+    for line in lines:
+        time_match = BUBBLE_TIME.match(line)
+        if time_match:
+            last_time = time_match.group(1)
+            sender = _add_bubble(chat_lines, bubble, date, last_time, sender, senders)
+            bubble = []
+            continue
+        header_date = _parse_date_header(line, today)
+        if header_date:
+            # Lines above a separator without a time were cut off at the top of the first page
+            sender = _add_bubble(chat_lines, bubble, date, last_time or "00:00", sender, senders)
+            bubble = []
+            date = header_date
+            continue
+        bubble.append(line)
+
+    # The last bubble may have lost its time at the bottom of the screen
+    _add_bubble(chat_lines, bubble, date, last_time or "00:00", sender, senders)
+    return chat_lines
+
+def _add_bubble(chat_lines, bubble, date, time_str, sender, senders):
+    """
+    Write one bubble as export lines
+
+    Args:
+        chat_lines (list): Export lines to append to
+        bubble (list): Lines of the bubble above its time
+        date (datetime.date): Date of the bubble
+        time_str (str): Time of the bubble
+        sender (str): Sender of the bubble before
+        senders (set): Names seen so far, updated with a new one
+
+    Returns:
+        str: Sender of this bubble
+    """
+    if not bubble:
+        return sender
+    name = bubble[0]
+    if len(bubble) > 1 and (name in senders or SENDER_NAME.match(name) and len(name.split()) <= 3):
+        sender = name
+        senders.add(name)
+        bubble = bubble[1:]
+    chat_lines.append(f"[{date.isoformat()}, {time_str}] {sender}: {bubble[0]}")
+    chat_lines.extend(bubble[1:])
+    return sender
+
+def _parse_date_header(line, today):
+    """
+    Read a date separator line
+
+    Args:
+        line (str): Text line
+        today (datetime.date): Date of "Today"
+
+    Returns:
+        datetime.date: Date of the separator, or None for other lines
+    """
+    text = line.strip().lower()
+    if text == "today":
+        return today
+    if text == "yesterday":
+        return today - datetime.timedelta(days=1)
+    # Days of the last week are shown by name
+    if text in WEEKDAYS:
+        return today - datetime.timedelta(days=(today.weekday() - WEEKDAYS.index(text)) % 7 or 7)
+    for date_format in DATE_HEADER_FORMATS:
+        try:
+            return datetime.datetime.strptime(line.strip().title(), date_format).date()
+        except ValueError:
+            continue
+    return None
+
+def find_overlap(previous_lines, page_lines):
+    """
+    Find how many leading lines of a page repeat the end of the previous pages
+
+    Lines are compared after normalizing away OCR noise such as spacing and
+    punctuation. Only a suffix of the previous text matching a prefix of the
+    page counts as overlap, longest first, so a repeated run of short lines
+    such as "ok" or a sender name elsewhere on the page is never taken for it.
+    Up to OVERLAP_SLACK lines at either edge may be skipped, but only lines
+    cut off by the screen edge: a partial line at the bottom of the previous
+    page must start its whole version on this page, and a partial line at the
+    top of this page must end its whole version on the previous one.
+
+    Args:
+        previous_lines (list): Lines collected so far
+        page_lines (list): Lines of the next page
+
+    Returns:
+        tuple: (trailing previous lines after the overlap, leading page lines to skip)
+    """
+    if not previous_lines or not page_lines:
+        return 0, 0
+
+    # The overlap cannot be longer than one page
+    tail = [_normalize(line) for line in previous_lines[-len(page_lines) - OVERLAP_SLACK:]]
+    head = [_normalize(line) for line in page_lines]
+
+    for size in range(min(len(tail), len(head)), 0, -1):
+        # Candidates of one size are tried with the fewest skipped edge lines first
+        edges = sorted(((cut, skip) for cut in range(OVERLAP_SLACK + 1) for skip in range(OVERLAP_SLACK + 1)), key=sum)
+        for cut, skip in edges:
+            start = len(tail) - cut - size
+            if start < 0 or skip + size > len(head):
+                continue
+            if tail[start:start + size] != head[skip:skip + size]:
+                continue
+            # Cut-off edge lines count towards the length, as they are repeated text too
+            if sum(len(line) for line in head[:skip + size + cut]) < MIN_OVERLAP_CHARS:
+                continue
+            if _edges_cut_off(tail, head, start, size, cut, skip):
+                return cut, skip + size
+    return 0, 0
+
+def _edges_cut_off(tail, head, start, size, cut, skip):
+    """
+    Check that the lines skipped around an overlap are cut-off copies of whole lines
+
+    Args:
+        tail (list): Normalized end of the previous lines
+        head (list): Normalized page lines
+        start (int): Start of the overlap in tail
+        size (int): Lines in the overlap
+        cut (int): Trailing tail lines after the overlap
+        skip (int): Leading head lines before the overlap
+
+    Returns:
+        bool: True if every skipped line is part of the line it stands for
+    """
+    for offset in range(cut):
+        # Cut off at the bottom of the previous page, whole on this page
+        whole = skip + size + offset
+        if whole >= len(head) or not head[whole].startswith(tail[start + size + offset]):
+            return False
+    for offset in range(skip):
+        # Cut off at the top of this page, whole on the previous page
+        whole = start - skip + offset
+        if whole >= 0 and not tail[whole].endswith(head[offset]):
+            return False
+    return True
+
+def _normalize(line):
+    """
+    Normalize a recognized line for overlap matching
+
+    Args:
+        line (str): Text line
+
+    Returns:
+        str: Lowercase letters and digits of the line
+    """
+    return re.sub(r'\W+', '', line.lower())
@@ -0,0 +1,168 @@
+import os
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+
+from app.chat.formats import detect_chat_format, sample_lines
+from app.chat.parser import iter_whatsapp_messages
+from app.chat.reader import ChatFileReader
+
+# Files smaller than this are parsed serially, process startup would dominate
+MIN_PARALLEL_BYTES = 8 * 1024 * 1024
+
+def iter_whatsapp_messages_parallel(file_path, workers=None, chat_format=None, min_bytes=MIN_PARALLEL_BYTES):
+    """
+    Parse a chat export on several cores, yielding messages in order
+
+    The file is split into byte ranges that each begin at a message header.
+    Every range is parsed in a worker process and the results are merged in
+    file order, so the output is identical to the serial parser.
+
+    Args:
+        file_path (str): Path to the chat export file
+        workers (int, optional): Number of worker processes, defaults to the CPU count
+        chat_format (ChatFormat, optional): Export layout, detected if not given
+        min_bytes (int): Smallest file size worth splitting
+
+    Yields:
+        dict: Message dictionary with date, time, sender, and content
+    """
+    workers = workers or os.cpu_count() or 1
+
+    with ChatFileReader(file_path) as reader:
+        if chat_format is None:
+            sample, _ = sample_lines(reader.iter_lines())
+            chat_format = detect_chat_format(sample)
+
+        # Small files and encodings without byte ranges are not worth splitting
+        if workers < 2 or reader.size < min_bytes or not reader.supports_byte_ranges:
+            yield from iter_whatsapp_messages(reader.iter_lines(), chat_format)
+            return
+
+        ranges = split_at_messages(reader, workers * 4, chat_format)
+
+    tasks = [(file_path, start, end, chat_format) for start, end in ranges]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from merge_chunk_results(executor.map(_parse_range, tasks))
+
+def split_at_messages(reader, chunk_count, chat_format):
+    """
+    Split a file into byte ranges that each start on a message header
+
+    Args:
+        reader (ChatFileReader): Open chat file
+        chunk_count (int): Target number of ranges
+        chat_format (ChatFormat): Export layout
+
+    Returns:
+        list: (start, end) byte offset tuples covering the whole file
+    """
+    chunk_size = max(1, (reader.size - reader.text_start) // chunk_count)
+    boundaries = [reader.text_start]
+
+    for index in range(1, chunk_count):
+        boundary = _next_message_start(reader, reader.text_start + index * chunk_size, chat_format)
+        if boundary > boundaries[-1] and boundary < reader.size:
+            boundaries.append(boundary)
+
+    boundaries.append(reader.size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def merge_chunk_results(chunk_results):
+    """
+    Merge per-range parse results in file order
+
+    Continuation lines at the start of a range belong to the last message of
+    the previous range and are stitched back onto it.
+
+    Args:
+        chunk_results (iterable): (leading lines, message rows) tuples in file order
+
+    Yields:
+        dict: Message dictionary with date, time, sender, and content
+    """
+    pending = None
+
+    for leading_lines, rows in chunk_results:
+        if pending and leading_lines:
+            pending["content"] = "\n".join([pending["content"]] + leading_lines)
+
+        for date_str, time_str, sender, content in rows:
+            if pending:
+                yield pending
+            pending = {"date": date_str, "time": time_str, "sender": sender, "content": content}
+
+    if pending:
+        yield pending
+
+def _next_message_start(reader, offset, chat_format):
+    """
+    Find the first message header at or after a byte offset
+
+    Args:
+        reader (ChatFileReader): Open chat file
+        offset (int): Byte offset
+        chat_format (ChatFormat): Export layout
+
+    Returns:
+        int: Byte offset of the header line, or the file size if there is none
+    """
+    position = reader.next_line_start(offset)
+
+    while position < reader.size:
+        newline = reader.data.find(b"\n", position)
+        line_end = reader.size if newline == -1 else newline + 1
+        if chat_format.match(reader.decode(position, line_end)):
+            return position
+        position = line_end
+
+    return reader.size
+
+def _parse_range(task):
+    """
+    Parse one byte range of a chat export in a worker process
+
+    Args:
+        task (tuple): (file path, start offset, end offset, chat format)
+
+    Returns:
+        tuple: (continuation lines before the first header, list of message rows)
+    """
+    file_path, start, end, chat_format = task
+    leading_lines = []
+
+    with ChatFileReader(file_path) as reader:
+        lines = reader.iter_lines(start, end)
+        for line in lines:
+            if chat_format.match(line):
+                messages = iter_whatsapp_messages(chain([line], lines), chat_format)
+                return leading_lines, _to_rows(messages)
+            leading_lines.append(line.strip())
+
+    return leading_lines, []
+
+def _to_rows(messages):
+    """
+    Convert messages to compact tuples for the trip back to the parent process
+
+    Repeated dates, times, and senders share one string object so they are
+    pickled only once per chunk.
+
+    Args:
+        messages (iterable): Message dictionaries
+
+    Returns:
+        list: (date, time, sender, content) tuples
+    """
+    shared = {}
+    rows = []
+
+    for message in messages:
+        rows.append((
+            shared.setdefault(message["date"], message["date"]),
+            shared.setdefault(message["time"], message["time"]),
+            shared.setdefault(message["sender"], message["sender"]),
+            message["content"]
+        ))
+
+    return rows
@@ -1,9 +1,20 @@
 import os
+import io
 import re
 import datetime
 import openai
 from dotenv import load_dotenv
 
+from app.api.budget import fits_budget, get_input_budget
+from app.api.cache import cached_call
+from app.api.client import get_openai_service
+from app.chat.archive import is_chat_archive, iter_archive_chat_lines
+from app.chat.formats import SYSTEM_SENDER, detect_chat_format, resolve_time_bound, sample_lines
+from app.chat.prompt_format import format_prompt_chat
+from app.chat.reader import ChatFileReader
+from app.chat.store import MessageStore
+from config.settings import DEFAULT_SETTINGS
+
 # Load environment variables
 load_dotenv()
 
@@ -16,44 +27,199 @@ openai.api_key = api_key
 
 # Do not create a client instance with OpenAI() constructor as it's not compatible with v0.28.1
 
+# Section markers for combined summary and action point responses
+SUMMARY_MARKER = "=== SUMMARY ==="
+ACTION_POINTS_MARKER = "=== ACTION POINTS ==="
+
+ACTION_POINTS_PROMPT = "You are an assistant that extracts action items, tasks, and commitments from WhatsApp conversations. For each action item, identify who is responsible, what the task is, and any deadlines mentioned. Format the output as a bulleted list with clear, concise points."
+
 def parse_chat(input_data, options):
     """
     Parse WhatsApp chat data and convert to structured format
     
     Args:
         input_data (dict): Input data with type and content
-        options (dict): Processing options
+        options (dict): Processing options, 'since' and 'until' limit the messages processed,
+            'on_preview' is called with the local summary before any API request,
+            'noise_filter' lists the kinds of content-free messages to drop
         
     Returns:
         dict: Processed chat data with summary, action points, and full content
     """
-    # Extract chat text based on input type
-    if input_data["type"] == "text":
-        chat_text = input_data["content"]
-    elif input_data["type"] == "file":
-        chat_text = read_chat_file(input_data["content"])
-    elif input_data["type"] == "screenshots":
-        chat_text = extract_text_from_screenshots(input_data["content"])
+    workers = options.get("parallel_workers", DEFAULT_SETTINGS["chat"]["parallel_workers"])
+    import_stats = None
+    is_archive = input_data["type"] == "file" and is_chat_archive(input_data["content"])
+    
+    if (input_data["type"] == "file" and not is_archive
+            and options.get("incremental", DEFAULT_SETTINGS["chat"]["incremental_import"])):
+        # Re-imports of a known chat only parse the part added since the last import
+        from app.chat.checkpoint import parse_chat_file_incremental
+        chat_store, import_stats = parse_chat_file_incremental(
+            input_data["content"], options.get("chat_id"), workers=workers
+        )
     else:
-        raise ValueError(f"Unsupported input type: {input_data['type']}")
+        chat_store = parse_chat_input(input_data, workers)
     
-    # Parse chat messages
-    messages = parse_whatsapp_messages(chat_text)
+    # The whole chat is indexed for search, even when only a time range is processed
+    full_chat_store = chat_store
+    since = resolve_time_bound(options.get("since"))
+    until = resolve_time_bound(options.get("until"))
+    if since is not None or until is not None:
+        # Only messages in the range are sent on, e.g. "since monday" or "7d"
+        chat_store = chat_store.slice_by_time(since, until)
     
-    # Structure the messages
-    structured_chat = structure_messages(messages)
+    attachment_stats = None
+    if input_data["type"] == "file" and options.get("transcribe_voice_notes", DEFAULT_SETTINGS["chat"]["transcribe_voice_notes"]):
+        # Voice notes in the export folder or zip are transcribed into the messages before summarizing
+        from app.chat.attachments import transcribe_voice_notes
+        attachment_stats = transcribe_voice_notes(
+            chat_store, input_data["content"], options.get("transcription_type", DEFAULT_SETTINGS["transcription"]["default_type"])
+        )
+    
+    noise_stats = None
+    noise_kinds = options.get("noise_filter", DEFAULT_SETTINGS["chat"]["noise_filter"])
+    if noise_kinds:
+        # Notices and placeholders carry no content, so they are dropped before any prompt is built
+        from app.chat.noise import filter_noise
+        chat_store, noise_stats = filter_noise(chat_store, noise_kinds)
     
     # Generate results based on options
-    result = {"full_content": format_structured_chat(structured_chat)}
+    result = {"full_content": format_structured_chat(chat_store)}
+    template_type = options.get("template", "Meeting Summary")
+    combined = options.get("combined_extraction", DEFAULT_SETTINGS["chat"]["combined_extraction"])
+    
+    if options.get("topic_grouping", DEFAULT_SETTINGS["chat"]["topic_grouping"]):
+        # Local clustering of the messages into topics, no API call involved
+        try:
+            from app.chat.topics import group_topics
+            result["topics"] = group_topics(chat_store)
+        except Exception as e:
+            print(f"Error grouping topics: {str(e)}")
     
-    if options.get("summary", False):
-        result["summary"] = generate_summary(structured_chat, options.get("template", "Meeting Summary"))
+    want_summary = options.get("summary", False)
+    want_action_points = options.get("action_points", False)
+    
+    if want_summary:
+        # A local extractive summary is ready in milliseconds, before any request is sent
+        result["summary_preview"] = generate_extractive_summary(chat_store, template_type)
+        if options.get("on_preview"):
+            options["on_preview"](result["summary_preview"])
+        
+        if fits_budget(result["full_content"], DEFAULT_SETTINGS["chat"]["local_summary_max_tokens"]):
+            # Short chats keep the local summary and skip the round-trip
+            result["summary"] = result["summary_preview"]
+            want_summary = False
     
-    if options.get("action_points", False):
-        result["action_points"] = extract_action_points(structured_chat)
+    # Recurring reports on long file exports rebuild the summary from stored per-day partials
+    rolling_chat_id = None
+    rolling_plan = None
+    if want_summary and input_data["type"] == "file" and options.get("rolling_summary", DEFAULT_SETTINGS["chat"]["rolling_summary"]):
+        from app.chat.checkpoint import get_chat_id
+        from app.chat.summarizer import plan_rolling_summary, should_use_rolling
+        chat_id = options.get("chat_id") or get_chat_id(input_data["content"])
+        try:
+            if should_use_rolling(chat_store, template_type, chat_id):
+                # Planned once, the estimate and the summary share it
+                rolling_plan = plan_rolling_summary(chat_store, template_type, chat_id)
+                rolling_chat_id = chat_id
+        except Exception as e:
+            print(f"Error checking stored summaries: {str(e)}")
+    
+    if want_summary or want_action_points:
+        # Token, cost, and latency estimate made before any request is sent
+        from app.chat.summarizer import estimate_chat_job
+        result["estimate"] = estimate_chat_job(
+            chat_store, template_type, want_summary, want_action_points, combined, rolling_plan
+        )
+    
+    if rolling_chat_id:
+        try:
+            from app.chat.summarizer import summarize_rolling
+            result["summary"], result["rolling_stats"] = summarize_rolling(
+                chat_store, template_type, rolling_chat_id, plan=rolling_plan
+            )
+            want_summary = False
+        except Exception as e:
+            # Fall back to summarizing the whole chat
+            print(f"Rolling summary failed: {str(e)}")
+    
+    if want_summary and want_action_points and combined:
+        # Fill both results from a single pass over the chat
+        result["summary"], result["action_points"] = generate_summary_and_action_points(chat_store, template_type)
+    else:
+        if want_summary:
+            result["summary"] = generate_summary(chat_store, template_type)
+        
+        if want_action_points:
+            result["action_points"] = extract_action_points(chat_store)
+    
+    if options.get("session_summaries", DEFAULT_SETTINGS["chat"]["session_summaries"]):
+        # One summary per conversation session, formatted as document sections
+        try:
+            from app.chat.sessions import format_session_sections
+            from app.chat.summarizer import summarize_sessions
+            result["sessions"] = summarize_sessions(chat_store)
+            result["session_sections"] = format_session_sections(result["sessions"])
+        except Exception as e:
+            print(f"Error summarizing sessions: {str(e)}")
+    
+    # Make the chat searchable from the dashboard
+    from app.search.index import index_parsed_chat
+    index_parsed_chat(full_chat_store, input_data, options)
+    
+    if since is not None or until is not None:
+        result["time_range"] = {"since": since, "until": until, "messages": len(chat_store), "total_messages": len(full_chat_store)}
+    if import_stats:
+        result["import_stats"] = import_stats
+    if attachment_stats:
+        result["attachment_stats"] = attachment_stats
+    if noise_stats:
+        result["noise_stats"] = noise_stats
     
     return result
 
+def parse_chat_input(input_data, workers=1):
+    """
+    Parse chat input of any supported type into a message store
+    
+    Args:
+        input_data (dict): Input data with type and content, file content may be a .txt or .zip export
+        workers (int): Worker processes for text file input, 0 for one per CPU core
+        
+    Returns:
+        MessageStore: Parsed messages
+    """
+    is_archive = False
+    
+    # Get a line stream based on input type
+    if input_data["type"] == "text":
+        lines = io.StringIO(input_data["content"])
+    elif input_data["type"] == "file" and is_chat_archive(input_data["content"]):
+        # Zip exports are streamed from the archive without extracting them
+        is_archive = True
+        lines = iter_archive_chat_lines(input_data["content"])
+    elif input_data["type"] == "file":
+        lines = iter_chat_file_lines(input_data["content"])
+    elif input_data["type"] == "screenshots":
+        lines = io.StringIO(extract_text_from_screenshots(input_data["content"]))
+    else:
+        raise ValueError(f"Unsupported input type: {input_data['type']}")
+    
+    # Detect the export layout from the first lines
+    sample, lines = sample_lines(lines)
+    chat_format = detect_chat_format(sample)
+    
+    # Parse chat messages lazily, one message at a time
+    if input_data["type"] == "file" and not is_archive and workers != 1:
+        # Large exports are split across worker processes
+        from app.chat.parallel import iter_whatsapp_messages_parallel
+        messages = iter_whatsapp_messages_parallel(input_data["content"], workers or None, chat_format)
+    else:
+        messages = iter_whatsapp_messages(lines, chat_format)
+    
+    # Structure the messages
+    return structure_messages(messages, chat_format.date_order)
+
 def read_chat_file(file_path):
     """
     Read WhatsApp chat export file
@@ -64,33 +230,43 @@ def read_chat_file(file_path):
     Returns:
         str: Chat text content
     """
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            return file.read()
-    except UnicodeDecodeError:
-        # Try with different encodings
-        encodings = ["latin-1", "iso-8859-1", "windows-1252"]
-        for encoding in encodings:
-            try:
-                with open(file_path, "r", encoding=encoding) as file:
-                    return file.read()
-            except UnicodeDecodeError:
-                continue
-        raise ValueError(f"Could not decode the file with any of the attempted encodings")
+    with ChatFileReader(file_path) as reader:
+        return reader.read_text()
+
+def iter_chat_file_lines(file_path):
+    """
+    Stream a WhatsApp chat export line by line
+    
+    The file is memory-mapped and decoded one chunk at a time, so memory use
+    does not grow with file size.
+    
+    Args:
+        file_path (str): Path to the chat export file
+        
+    Yields:
+        str: Lines of the chat export
+    """
+    with ChatFileReader(file_path) as reader:
+        yield from reader.iter_lines()
 
 def extract_text_from_screenshots(image_paths):
     """
     Extract text from WhatsApp chat screenshots using OCR
     
+    Overlapping screenshots are stitched into one chat without repeated lines.
+    
     Args:
         image_paths (list): List of paths to screenshot images
         
     Returns:
         str: Extracted text from all screenshots
     """
-    # This would use an OCR library to extract text from images
-    # For the MVP, we'll return a placeholder message
-    return "[OCR functionality will be implemented in a future version. Please use text input for now.]"
+    from app.chat.ocr import extract_chat_text
+    
+    try:
+        return extract_chat_text(image_paths)
+    except Exception as e:
+        raise Exception(f"Screenshot text extraction failed: {str(e)}")
 
 def parse_whatsapp_messages(chat_text):
     """
@@ -102,173 +278,333 @@ def parse_whatsapp_messages(chat_text):
     Returns:
         list: List of message dictionaries with date, sender, and content
     """
-    # Regular expression to match WhatsApp message format
-    # Format: [date, time] sender: message
-    pattern = r'\[?(\d{1,2}/\d{1,2}/\d{2,4}),?\s+(\d{1,2}:\d{2}(?::\d{2})?(?:\s*[AP]M)?)\]?\s+-?\s+([^:]+):\s+(.+)'
+    return list(iter_whatsapp_messages(io.StringIO(chat_text)))
+
+def iter_whatsapp_messages(lines, chat_format=None):
+    """
+    Parse WhatsApp chat lines into messages, yielding them one at a time
     
-    messages = []
+    Args:
+        lines (iterable): Iterable of raw chat lines, e.g. an open file
+        chat_format (ChatFormat, optional): Export layout, detected from the first lines if not given
+        
+    Yields:
+        dict: Message dictionary with date, time, sender, and content
+    """
+    # Pick the grammar for this export from a sample of its first lines
+    if chat_format is None:
+        sample, lines = sample_lines(lines)
+        chat_format = detect_chat_format(sample)
+    
+    match_line = chat_format.match
     current_message = None
+    content_parts = []
     
-    for line in chat_text.split('\n'):
-        match = re.match(pattern, line)
+    for line in lines:
+        match = match_line(line)
         if match:
-            # If we have a current message, add it to the list
+            # If we have a current message, emit it
             if current_message:
-                messages.append(current_message)
+                current_message["content"] = "\n".join(content_parts)
+                yield current_message
             
             # Extract message components
-            date_str, time_str, sender, content = match.groups()
+            date_str, time_str, sender, content = match.group("date", "time", "sender", "content")
             
-            # Create new message
+            # Create new message, lines without an author are system notices
             current_message = {
                 "date": date_str,
                 "time": time_str,
-                "sender": sender.strip(),
-                "content": content.strip()
+                "sender": sender.strip() if sender else SYSTEM_SENDER,
+                "content": ""
             }
+            content_parts = [content.strip()]
         elif current_message:
-            # Continuation of previous message
-            current_message["content"] += "\n" + line.strip()
+            # Continuation of previous message, joined once the message is complete
+            content_parts.append(line.strip())
     
-    # Add the last message
+    # Emit the last message
     if current_message:
-        messages.append(current_message)
-    
-    return messages
+        current_message["content"] = "\n".join(content_parts)
+        yield current_message
 
-def structure_messages(messages):
+def structure_messages(messages, date_order="dmy"):
     """
-    Structure messages by date and sender
+    Structure messages into a columnar message store
     
     Args:
-        messages (list): List of message dictionaries
+        messages (iterable): Message dictionaries, e.g. from iter_whatsapp_messages
+        date_order (str): Order of the date fields, 'dmy', 'mdy', or 'ymd'
         
     Returns:
-        dict: Structured chat data
+        MessageStore: Messages in chronological order, groupable by date and sender
+    """
+    chat_store = MessageStore(date_order)
+    chat_store.extend(messages)
+    return chat_store
+
+def format_structured_chat(chat_store):
     """
-    structured_chat = {}
+    Format structured chat data as readable text
     
-    for message in messages:
-        date = message["date"]
-        sender = message["sender"]
-        
-        # Initialize date entry if not exists
-        if date not in structured_chat:
-            structured_chat[date] = {}
-        
-        # Initialize sender entry if not exists
-        if sender not in structured_chat[date]:
-            structured_chat[date][sender] = []
+    The text is built once per store and reused by every consumer.
+    
+    Args:
+        chat_store (MessageStore): Structured chat data
         
-        # Add message to sender's list for this date
-        structured_chat[date][sender].append({
-            "time": message["time"],
-            "content": message["content"]
-        })
+    Returns:
+        str: Formatted chat text
+    """
+    if "formatted_text" not in chat_store.derived:
+        buffer = io.StringIO()
+        write_structured_chat(chat_store, buffer)
+        chat_store.derived["formatted_text"] = buffer.getvalue()
     
-    return structured_chat
+    return chat_store.derived["formatted_text"]
 
-def format_structured_chat(structured_chat):
+def write_structured_chat(chat_store, sink, chunk_size=64 * 1024):
     """
-    Format structured chat data as readable text
+    Stream formatted chat text to a text sink
+    
+    Output is written in chunks of roughly chunk_size characters, so slow
+    sinks such as sockets or UI widgets get few, large writes.
     
     Args:
-        structured_chat (dict): Structured chat data
+        chat_store (MessageStore): Structured chat data
+        sink: Object with a write(str) method, or a callable taking a str
+        chunk_size (int): Approximate characters per write
         
     Returns:
-        str: Formatted chat text
+        int: Number of characters written
     """
-    formatted_text = ""
+    write = sink.write if hasattr(sink, "write") else sink
+    pending = []
+    pending_size = 0
+    written = 0
+    
+    def emit(text):
+        nonlocal pending_size, written
+        pending.append(text)
+        pending_size += len(text)
+        if pending_size >= chunk_size:
+            write("".join(pending))
+            written += pending_size
+            pending.clear()
+            pending_size = 0
     
-    for date in sorted(structured_chat.keys()):
-        formatted_text += f"=== {date} ===\n\n"
+    for date, indices in chat_store.by_date().items():
+        emit(f"=== {date} ===\n\n")
         
-        for sender in structured_chat[date]:
-            for message in structured_chat[date][sender]:
-                formatted_text += f"[{message['time']}] {sender}: {message['content']}\n"
-            
-            formatted_text += "\n"
+        # Messages are listed in chronological order within each day
+        for index in indices:
+            emit(f"[{chat_store.time(index)}] {chat_store.sender(index)}: {chat_store.content(index)}\n")
         
-        formatted_text += "\n"
+        emit("\n")
+    
+    if pending:
+        write("".join(pending))
+        written += pending_size
     
-    return formatted_text
+    return written
 
-def generate_summary(structured_chat, template_type):
+def generate_summary(chat_store, template_type):
     """
     Generate a summary of the chat using GPT-4
     
+    Chats too long for one request are summarized hierarchically.
+    
     Args:
-        structured_chat (dict): Structured chat data
+        chat_store (MessageStore): Structured chat data
         template_type (str): Type of document template
         
     Returns:
-        str: Generated summary
+        str: Generated summary, or the local extractive summary if the request fails
     """
-    # Format chat for GPT input
-    formatted_chat = format_structured_chat(structured_chat)
-    
-    # Limit input size
-    if len(formatted_chat) > 12000:  # Approximate token limit
-        formatted_chat = formatted_chat[:12000] + "\n[Chat truncated due to length...]\n"
+    # Format chat for GPT input, compactly unless disabled
+    formatted_chat = format_prompt_chat(chat_store)
     
     # Create system prompt based on template type
     system_prompt = get_template_prompt(template_type)
     
+    instruction = "Please summarize this WhatsApp chat:\n\n"
+    
     try:
-        # Call GPT-4 to generate summary
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Please summarize this WhatsApp chat:\n\n{formatted_chat}"}
-            ]
-        )
-        
-        # Extract the summary
-        summary = response.choices[0].message.content
+        if not fits_budget(formatted_chat, get_input_budget(system_prompt, instruction)):
+            # Summarize the chat in parts and combine the partial summaries
+            from app.chat.summarizer import summarize_hierarchical
+            return summarize_hierarchical(chat_store, template_type)
         
-        return summary
+        # Call GPT-4 to generate summary
+        return request_completion(system_prompt, instruction + formatted_chat)
     except Exception as e:
-        # If summarization fails, return error message
+        # If summarization fails, fall back to the local summary
         print(f"Summarization failed: {str(e)}")
+        if DEFAULT_SETTINGS["chat"]["extractive_fallback"]:
+            return generate_extractive_summary(chat_store, template_type)
         return f"Error generating summary: {str(e)}"
 
-def extract_action_points(structured_chat):
+def extract_action_points(chat_store):
     """
     Extract action points from the chat using GPT-4
     
+    With the pre-filter on, only messages that look like requests, commitments,
+    or deadlines, and the messages around them, are sent. Chats too long for
+    one request are processed in parts and the lists merged.
+    
     Args:
-        structured_chat (dict): Structured chat data
+        chat_store (MessageStore): Structured chat data
         
     Returns:
         str: Extracted action points
     """
-    # Format chat for GPT input
-    formatted_chat = format_structured_chat(structured_chat)
+    if DEFAULT_SETTINGS["chat"]["action_prefilter"]:
+        from app.chat.action_filter import filter_action_candidates
+        chat_store = filter_action_candidates(chat_store)
+        if not len(chat_store):
+            return "No action points found in the chat."
+    
+    # Format chat for GPT input, compactly unless disabled
+    formatted_chat = format_prompt_chat(chat_store)
     
-    # Limit input size
-    if len(formatted_chat) > 12000:  # Approximate token limit
-        formatted_chat = formatted_chat[:12000] + "\n[Chat truncated due to length...]\n"
+    instruction = "Please extract all action points from this WhatsApp chat:\n\n"
     
     try:
-        # Call GPT-4 to extract action points
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an assistant that extracts action items, tasks, and commitments from WhatsApp conversations. For each action item, identify who is responsible, what the task is, and any deadlines mentioned. Format the output as a bulleted list with clear, concise points."},
-                {"role": "user", "content": f"Please extract all action points from this WhatsApp chat:\n\n{formatted_chat}"}
-            ]
-        )
+        if not fits_budget(formatted_chat, get_input_budget(ACTION_POINTS_PROMPT, instruction)):
+            # Extract action points from each part and merge the lists
+            from app.chat.summarizer import extract_action_points_hierarchical
+            return extract_action_points_hierarchical(chat_store)
         
-        # Extract the action points
-        action_points = response.choices[0].message.content
-        
-        return action_points
+        # Call GPT-4 to extract action points
+        return request_completion(ACTION_POINTS_PROMPT, instruction + formatted_chat)
     except Exception as e:
         # If extraction fails, return error message
         print(f"Action point extraction failed: {str(e)}")
         return f"Error extracting action points: {str(e)}"
 
+def generate_summary_and_action_points(chat_store, template_type):
+    """
+    Generate the summary and the action points in one request
+    
+    The model returns both as marked sections, so the chat is only sent once.
+    Chats too long for one request are processed hierarchically.
+    
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+        
+    Returns:
+        tuple: (summary, action points)
+    """
+    # Format chat for GPT input, compactly unless disabled
+    formatted_chat = format_prompt_chat(chat_store)
+    
+    system_prompt = get_combined_prompt(template_type)
+    instruction = "Please summarize this WhatsApp chat and extract all action points from it:\n\n"
+    
+    try:
+        if not fits_budget(formatted_chat, get_input_budget(system_prompt, instruction)):
+            # Process the chat in parts and combine both kinds of partial result
+            from app.chat.summarizer import summarize_and_extract_hierarchical
+            return summarize_and_extract_hierarchical(chat_store, template_type)
+        
+        response = request_completion(system_prompt, instruction + formatted_chat)
+        sections = split_combined_response(response)
+        if sections:
+            return sections
+        
+        # The model ignored the section markers, so ask for the action points separately
+        print("Combined extraction returned no sections, extracting action points separately")
+        return response, extract_action_points(chat_store)
+    except Exception as e:
+        # If extraction fails, fall back to the local summary
+        print(f"Combined extraction failed: {str(e)}")
+        if DEFAULT_SETTINGS["chat"]["extractive_fallback"]:
+            return generate_extractive_summary(chat_store, template_type), f"Error extracting action points: {str(e)}"
+        return f"Error generating summary: {str(e)}", f"Error extracting action points: {str(e)}"
+
+def generate_extractive_summary(chat_store, template_type):
+    """
+    Summarize the chat locally from its most central messages
+    
+    No API call is made, so this serves as a preview, as the summary of
+    short chats, and as the fallback when a request fails or times out.
+    
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+        
+    Returns:
+        str: Summary with the template's section headings
+    """
+    from app.chat.extractive import extractive_summary
+    
+    try:
+        return extractive_summary(chat_store, template_type)
+    except Exception as e:
+        print(f"Extractive summarization failed: {str(e)}")
+        return f"Error generating summary: {str(e)}"
+
+def get_combined_prompt(template_type):
+    """
+    Get the system prompt asking for a summary and action points together
+    
+    Args:
+        template_type (str): Type of document template
+        
+    Returns:
+        str: System prompt for GPT
+    """
+    return (
+        f"{get_template_prompt(template_type)}\n\n"
+        f"In addition, act as an assistant that extracts action items, tasks, and commitments. "
+        f"For each action item, identify who is responsible, what the task is, and any deadlines mentioned, "
+        f"as a bulleted list with clear, concise points.\n\n"
+        f"Reply with exactly two sections. Start the first with the line {SUMMARY_MARKER} followed by the summary, "
+        f"and the second with the line {ACTION_POINTS_MARKER} followed by the action points."
+    )
+
+def split_combined_response(response):
+    """
+    Split a combined response into its summary and action point sections
+    
+    Args:
+        response (str): Model response
+        
+    Returns:
+        tuple: (summary, action points), or None if the markers are missing
+    """
+    summary_start = response.find(SUMMARY_MARKER)
+    action_start = response.find(ACTION_POINTS_MARKER)
+    if summary_start == -1 or action_start == -1 or action_start < summary_start:
+        return None
+    
+    summary = response[summary_start + len(SUMMARY_MARKER):action_start].strip()
+    action_points = response[action_start + len(ACTION_POINTS_MARKER):].strip()
+    return summary, action_points
+
+def request_completion(system_prompt, user_content):
+    """
+    Send one chat completion request to GPT-4
+    
+    Identical requests are answered from the response cache. Others go
+    through the shared OpenAI service, which limits concurrency and retries
+    transient failures.
+    
+    Args:
+        system_prompt (str): System prompt
+        user_content (str): User message
+        
+    Returns:
+        str: Response text
+    """
+    service = get_openai_service()
+    
+    return cached_call(
+        "chat",
+        (service.gpt_model, system_prompt, user_content),
+        lambda: service.complete(system_prompt, user_content)
+    )
+
 def get_template_prompt(template_type):
     """
     Get system prompt based on template type
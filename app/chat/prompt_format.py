@@ -0,0 +1,174 @@
+import io
+
+from config.settings import DEFAULT_SETTINGS
+
+# Consecutive messages from one sender closer together than this are merged
+MERGE_SECONDS = 600
+
+LEGEND_NOTE = ("Each line starts with the time since the previous message (+5m, +2h10m), "
+               "or with the time of day for the first message of a day. "
+               "Consecutive messages from one participant are merged.")
+
+def use_compact_prompts(compact=None):
+    """
+    Resolve whether prompts use the compact chat format
+
+    Args:
+        compact (bool, optional): Explicit choice, defaults to the setting
+
+    Returns:
+        bool: True for the compact format
+    """
+    return DEFAULT_SETTINGS["chat"]["compact_prompts"] if compact is None else compact
+
+def get_sender_aliases(chat_store):
+    """
+    Get short ids for the senders of a chat, the most active sender first
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+
+    Returns:
+        list: Alias of each sender id, A to Z, then AA, AB, and so on
+    """
+    if "sender_aliases" not in chat_store.derived:
+        counts = [0] * len(chat_store.senders)
+        for sender_id in chat_store.sender_ids:
+            counts[sender_id] += 1
+        aliases = [None] * len(chat_store.senders)
+        for rank, sender_id in enumerate(sorted(range(len(counts)), key=lambda sender_id: -counts[sender_id])):
+            aliases[sender_id] = _alias(rank)
+        chat_store.derived["sender_aliases"] = aliases
+    return chat_store.derived["sender_aliases"]
+
+def format_legend(chat_store, sender_ids, compact=None):
+    """
+    Format the participant legend placed before compact chat text
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        sender_ids (iterable): Senders appearing in the text
+        compact (bool, optional): Whether the text is compact, defaults to the setting
+
+    Returns:
+        str: Legend, empty for the plain format
+    """
+    if not use_compact_prompts(compact):
+        return ""
+    aliases = get_sender_aliases(chat_store)
+    participants = "; ".join(f"{aliases[sender_id]} = {chat_store.senders[sender_id]}" for sender_id in sorted(sender_ids, key=aliases.__getitem__))
+    return f"Participants: {participants}\n{LEGEND_NOTE}\n\n"
+
+def iter_prompt_days(chat_store, compact=None):
+    """
+    Serialize a chat for prompts one day at a time
+
+    The plain format writes "[time] sender: content" for every message. The
+    compact format writes the sender's alias, the time since the previous
+    message, and merges consecutive messages from one sender, which uses
+    far fewer tokens in chats with long display names.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        compact (bool, optional): Whether to use the compact format, defaults to the setting
+
+    Yields:
+        tuple: (date, list of (sender id, line) tuples)
+    """
+    compact = use_compact_prompts(compact)
+    aliases = get_sender_aliases(chat_store) if compact else None
+
+    for date, indices in chat_store.by_date().items():
+        if not compact:
+            yield date, [
+                (chat_store.sender_ids[index], f"[{chat_store.time(index)}] {chat_store.sender(index)}: {chat_store.content(index)}\n")
+                for index in indices
+            ]
+            continue
+
+        entries = []
+        block_sender = None
+        block_parts = []
+        previous = None
+
+        for index in indices:
+            sender_id = chat_store.sender_ids[index]
+            timestamp = chat_store.timestamps[index]
+            if sender_id == block_sender and timestamp - previous < MERGE_SECONDS:
+                # Merged messages still move the reference for the next gap
+                block_parts.append(chat_store.content(index))
+                previous = timestamp
+                continue
+
+            if block_parts:
+                entries.append((block_sender, "\n".join(block_parts) + "\n"))
+
+            # The first message of a day keeps its time, later ones give the gap since the message before
+            prefix = chat_store.time(index) + " " if previous is None else _format_delta(timestamp - previous)
+            block_sender = sender_id
+            block_parts = [f"{prefix}{aliases[sender_id]}: {chat_store.content(index)}"]
+            previous = timestamp
+
+        if block_parts:
+            entries.append((block_sender, "\n".join(block_parts) + "\n"))
+        yield date, entries
+
+def format_prompt_chat(chat_store, compact=None):
+    """
+    Format a whole chat for a prompt, with its legend
+
+    The text is built once per store and format.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        compact (bool, optional): Whether to use the compact format, defaults to the setting
+
+    Returns:
+        str: Chat text for the prompt
+    """
+    compact = use_compact_prompts(compact)
+    cache_key = ("prompt_text", compact)
+    if cache_key not in chat_store.derived:
+        buffer = io.StringIO()
+        buffer.write(format_legend(chat_store, set(chat_store.sender_ids), compact))
+        for date, entries in iter_prompt_days(chat_store, compact):
+            buffer.write(f"=== {date} ===\n\n")
+            buffer.writelines(line for _, line in entries)
+            buffer.write("\n")
+        chat_store.derived[cache_key] = buffer.getvalue()
+    return chat_store.derived[cache_key]
+
+def _format_delta(seconds):
+    """
+    Format the gap between two messages as a line prefix
+
+    Args:
+        seconds (int): Gap in seconds
+
+    Returns:
+        str: "+5m ", "+2h10m ", or nothing for gaps under a minute
+    """
+    minutes = max(0, seconds) // 60
+    if not minutes:
+        return ""
+    if minutes < 60:
+        return f"+{minutes}m "
+    hours, minutes = divmod(minutes, 60)
+    return f"+{hours}h{minutes}m " if minutes else f"+{hours}h "
+
+def _alias(rank):
+    """
+    Turn a sender rank into a short alias
+
+    Args:
+        rank (int): 0 for the most active sender
+
+    Returns:
+        str: A to Z, then AA, AB, and so on
+    """
+    alias = ""
+    rank += 1
+    while rank:
+        rank, remainder = divmod(rank - 1, 26)
+        alias = chr(65 + remainder) + alias
+    return alias
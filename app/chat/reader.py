@@ -0,0 +1,208 @@
+import io
+import os
+import mmap
+import codecs
+
+# Byte order marks, longest first so UTF-32 is not mistaken for UTF-16
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16")
+]
+
+# Encodings tried when the sample is not valid UTF-8
+FALLBACK_ENCODINGS = ["windows-1252", "latin-1"]
+
+class ChatFileReader:
+    """
+    Memory-mapped reader for WhatsApp chat exports
+
+    The encoding is detected once from a bounded sample and text is decoded
+    lazily by byte range, so large exports are never copied into one string.
+    """
+    def __init__(self, file_path, sample_size=256 * 1024):
+        """
+        Open and memory-map a chat export
+
+        Args:
+            file_path (str): Path to the chat export file
+            sample_size (int): Bytes per sample window used for encoding detection
+        """
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+
+        # Zero-length files cannot be mapped
+        if self.size:
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.data = b""
+
+        self.encoding, self.text_start = detect_encoding(self.data, sample_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map and file handle
+        """
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    @property
+    def supports_byte_ranges(self):
+        """
+        Check whether lines can be located by searching for newline bytes
+
+        Returns:
+            bool: False for UTF-16 files
+        """
+        return self.encoding != "utf-16"
+
+    def decode(self, start, end):
+        """
+        Decode a byte range of the file
+
+        Args:
+            start (int): Start byte offset
+            end (int): End byte offset
+
+        Returns:
+            str: Decoded text
+        """
+        return self.data[start:end].decode(self.encoding, errors="replace")
+
+    def iter_lines(self, start=None, end=None, chunk_size=1024 * 1024):
+        """
+        Stream lines from a byte range of the file
+
+        The range is decoded in chunks that end on a newline, so only one chunk
+        is held as text at a time.
+
+        Args:
+            start (int, optional): Start byte offset, defaults to the start of the text
+            end (int, optional): End byte offset, defaults to the end of the file
+            chunk_size (int): Approximate bytes decoded at a time
+
+        Yields:
+            str: Lines of the chat export
+        """
+        if not self.supports_byte_ranges:
+            yield from self._iter_text_stream()
+            return
+
+        position = self.text_start if start is None else max(start, self.text_start)
+        end = self.size if end is None else min(end, self.size)
+
+        while position < end:
+            chunk_end = min(position + chunk_size, end)
+            if chunk_end < end:
+                # Cut the chunk after the last newline so no line is split
+                newline = self.data.rfind(b"\n", position, chunk_end)
+                if newline == -1:
+                    newline = self.data.find(b"\n", chunk_end, end)
+                chunk_end = end if newline == -1 else newline + 1
+
+            for line in io.StringIO(self.decode(position, chunk_end)):
+                yield line
+            position = chunk_end
+
+    def next_line_start(self, offset):
+        """
+        Find the first line that starts at or after a byte offset
+
+        Args:
+            offset (int): Byte offset
+
+        Returns:
+            int: Byte offset of the line start, or the file size if there is none
+        """
+        if offset <= self.text_start:
+            return self.text_start
+        newline = self.data.find(b"\n", offset - 1)
+        return self.size if newline == -1 else newline + 1
+
+    def read_text(self):
+        """
+        Decode the whole file
+
+        Returns:
+            str: Chat text content
+        """
+        return "".join(self.iter_lines())
+
+    def _iter_text_stream(self):
+        """
+        Stream lines through an incremental decoder for encodings without byte ranges
+
+        Yields:
+            str: Lines of the chat export
+        """
+        with open(self.file_path, "r", encoding=self.encoding, errors="replace", newline="") as file:
+            for line in file:
+                yield line
+
+def detect_encoding(data, sample_size=256 * 1024):
+    """
+    Detect the encoding of chat export bytes from a bounded sample
+
+    A BOM is trusted if present. Otherwise windows from the start, middle, and
+    end of the data are validated as UTF-8 chunk by chunk.
+
+    Args:
+        data (bytes or mmap.mmap): File contents
+        sample_size (int): Bytes per sample window
+
+    Returns:
+        tuple: (encoding name, byte offset where the text starts)
+    """
+    head = data[:4]
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            # utf-16 consumes its own BOM, utf-8-sig is decoded by range so skip it
+            return ("utf-8", len(bom)) if encoding == "utf-8-sig" else (encoding, 0)
+
+    size = len(data)
+    windows = [0, max(0, size // 2 - sample_size // 2), max(0, size - sample_size)]
+
+    for encoding in ["utf-8"] + FALLBACK_ENCODINGS:
+        if all(_is_valid_sample(data, start, sample_size, encoding) for start in windows):
+            return encoding, 0
+
+    return FALLBACK_ENCODINGS[-1], 0
+
+def _is_valid_sample(data, start, sample_size, encoding):
+    """
+    Validate one sample window of the data
+
+    Args:
+        data (bytes or mmap.mmap): File contents
+        start (int): Start byte offset of the window
+        sample_size (int): Window size in bytes
+        encoding (str): Encoding to validate against
+
+    Returns:
+        bool: True if the window decodes cleanly
+    """
+    window = data[start:start + sample_size]
+
+    if encoding == "utf-8":
+        # Skip continuation bytes of a character cut at the window start
+        skip = 0
+        while start and skip < 3 and skip < len(window) and window[skip] & 0xC0 == 0x80:
+            skip += 1
+        window = window[skip:]
+
+    # The incremental decoder tolerates a character cut at the window end
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        for offset in range(0, len(window), 64 * 1024):
+            decoder.decode(window[offset:offset + 64 * 1024], final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
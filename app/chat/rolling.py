@@ -0,0 +1,134 @@
+import os
+import time
+import sqlite3
+import threading
+
+from config.settings import DEFAULT_SETTINGS
+
+# Database holding the partial summaries of every chat
+SUMMARY_DB = os.path.join(DEFAULT_SETTINGS["storage"]["local_path"], "summaries.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS partials (
+    chat_id TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    unit_key TEXT NOT NULL,
+    template TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (chat_id, unit, unit_key, template)
+);
+"""
+
+class PartialSummaryStore:
+    """
+    Persistent partial summaries of the days or sessions of each chat
+
+    One row per (chat id, unit, unit key, template) holds the summary and
+    the hash of the text it was made from. A changed day replaces its row,
+    so the store holds one version of each day.
+    """
+    def __init__(self, db_path):
+        """
+        Open or create the store
+
+        Args:
+            db_path (str): Path to the SQLite database
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Close the database connection
+        """
+        with self._lock:
+            self._connection.close()
+
+    def get_many(self, chat_id, unit, template, content_hashes):
+        """
+        Look up the stored summaries of several units
+
+        Args:
+            chat_id (str): Chat id
+            unit (str): 'day' or 'session'
+            template (str): Type of document template
+            content_hashes (dict): Current content hash of each unit key
+
+        Returns:
+            dict: Summary of each unit key whose stored hash is current
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT unit_key, content_hash, summary FROM partials WHERE chat_id = ? AND unit = ? AND template = ?",
+                (chat_id, unit, template)
+            ).fetchall()
+        return {unit_key: summary for unit_key, content_hash, summary in rows if content_hashes.get(unit_key) == content_hash}
+
+    def has_partials(self, chat_id, unit, template):
+        """
+        Check whether any partial summary of a chat is stored
+
+        Args:
+            chat_id (str): Chat id
+            unit (str): 'day' or 'session'
+            template (str): Type of document template
+
+        Returns:
+            bool: True if at least one partial is stored
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM partials WHERE chat_id = ? AND unit = ? AND template = ? LIMIT 1",
+                (chat_id, unit, template)
+            ).fetchone()
+        return row is not None
+
+    def put_many(self, chat_id, unit, template, entries):
+        """
+        Store the summaries of several units, replacing older versions
+
+        Args:
+            chat_id (str): Chat id
+            unit (str): 'day' or 'session'
+            template (str): Type of document template
+            entries (list): (unit key, content hash, summary) tuples
+        """
+        now = int(time.time())
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO partials (chat_id, unit, unit_key, template, content_hash, summary, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(chat_id, unit, unit_key, template, content_hash, summary, now) for unit_key, content_hash, summary in entries]
+            )
+
+    def clear_chat(self, chat_id):
+        """
+        Remove every stored summary of a chat
+
+        Args:
+            chat_id (str): Chat id
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM partials WHERE chat_id = ?", (chat_id,))
+
+_partial_store = None
+_partial_store_lock = threading.Lock()
+
+def get_partial_store():
+    """
+    Get the shared partial summary store
+
+    Returns:
+        PartialSummaryStore: Shared store instance
+    """
+    global _partial_store
+    with _partial_store_lock:
+        if _partial_store is None:
+            _partial_store = PartialSummaryStore(SUMMARY_DB)
+    return _partial_store
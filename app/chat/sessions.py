@@ -0,0 +1,134 @@
+import datetime
+
+import numpy as np
+
+from config.settings import DEFAULT_SETTINGS
+
+# Gaps this many robust deviations above the typical log gap end a session
+GAP_DEVIATIONS = 3.0
+
+def adaptive_gap_threshold(gaps, min_gap=None, max_gap=None):
+    """
+    Pick the silence that ends a conversation in this chat
+
+    The threshold follows the chat's own pace: it is set well above the
+    typical gap between replies, measured as median and median absolute
+    deviation of the log gaps, and kept within the configured bounds. Busy
+    groups get a short threshold, slow one-to-one chats a long one.
+
+    Args:
+        gaps (np.ndarray): Seconds between consecutive messages
+        min_gap (int, optional): Shortest threshold in seconds, defaults to the setting
+        max_gap (int, optional): Longest threshold in seconds, defaults to the setting
+
+    Returns:
+        float: Threshold in seconds
+    """
+    settings = DEFAULT_SETTINGS["chat"]
+    min_gap = settings["session_min_gap_minutes"] * 60 if min_gap is None else min_gap
+    max_gap = settings["session_max_gap_hours"] * 3600 if max_gap is None else max_gap
+
+    positive = gaps[gaps > 0]
+    if not len(positive):
+        return float(max_gap)
+
+    log_gaps = np.log(positive)
+    median = np.median(log_gaps)
+    deviation = np.median(np.abs(log_gaps - median)) * 1.4826
+    return float(np.clip(np.exp(median + GAP_DEVIATIONS * deviation), min_gap, max_gap))
+
+def find_session_starts(timestamps, min_gap=None, max_gap=None):
+    """
+    Find where new sessions start in a sequence of message times
+
+    Args:
+        timestamps (sequence): Epoch seconds of the messages in chronological order
+        min_gap (int, optional): Shortest threshold in seconds
+        max_gap (int, optional): Longest threshold in seconds
+
+    Returns:
+        np.ndarray: Index of the first message of each session
+    """
+    times = np.asarray(timestamps, dtype=np.int64)
+    if not len(times):
+        return np.zeros(0, dtype=np.int64)
+
+    gaps = np.diff(times)
+    threshold = adaptive_gap_threshold(gaps, min_gap, max_gap)
+    return np.concatenate(([0], np.flatnonzero(gaps > threshold) + 1))
+
+def segment_sessions(chat_store):
+    """
+    Split a chat into conversation sessions separated by long silences
+
+    Unlike grouping by date, a thread running past midnight stays in one
+    session and separate conversations on one day become separate sessions.
+    The result is kept until the messages change.
+
+    Args:
+        chat_store (MessageStore): Structured chat data in chronological order
+
+    Returns:
+        list: Sessions as dicts with number, start and end index, first and
+            last timestamp, and message count
+    """
+    if "sessions" not in chat_store.derived:
+        starts = find_session_starts(chat_store.timestamps).tolist()
+        ends = starts[1:] + [len(chat_store)]
+        chat_store.derived["sessions"] = [
+            {
+                "number": number,
+                "start": start,
+                "end": end,
+                "first_timestamp": chat_store.timestamps[start],
+                "last_timestamp": chat_store.timestamps[end - 1],
+                "message_count": end - start
+            }
+            for number, (start, end) in enumerate(zip(starts, ends), 1)
+        ]
+    return chat_store.derived["sessions"]
+
+def get_session_store(chat_store, session):
+    """
+    Get a store holding the messages of one session
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        session (dict): Session from segment_sessions
+
+    Returns:
+        MessageStore: Messages of the session
+    """
+    return chat_store.subset(range(session["start"], session["end"]))
+
+def format_session_title(session):
+    """
+    Format the heading of a session
+
+    Args:
+        session (dict): Session from segment_sessions
+
+    Returns:
+        str: Title such as "Session 3: 2024-02-01 21:40 to 2024-02-02 01:10 (85 messages)"
+    """
+    first = datetime.datetime.utcfromtimestamp(session["first_timestamp"])
+    last = datetime.datetime.utcfromtimestamp(session["last_timestamp"])
+    period = first.strftime("%Y-%m-%d %H:%M")
+    if last != first:
+        period += " to " + last.strftime("%H:%M" if last.date() == first.date() else "%Y-%m-%d %H:%M")
+    return f"Session {session['number']}: {period} ({session['message_count']} messages)"
+
+def format_session_sections(sessions):
+    """
+    Format session summaries as document sections
+
+    The markdown is what generate_document expects, one level-two heading
+    per session.
+
+    Args:
+        sessions (list): Sessions with a 'summary' each
+
+    Returns:
+        str: Markdown text
+    """
+    return "\n\n".join(f"## {format_session_title(session)}\n\n{session['summary'].strip()}" for session in sessions)
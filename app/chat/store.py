@@ -0,0 +1,433 @@
+import json
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from app.chat.formats import parse_timestamp, fallback_date_order
+
+class MessageStore:
+    """
+    Compact columnar store for parsed chat messages
+
+    Messages are kept in chronological order as parallel arrays of epoch
+    timestamps and interned sender, date, and time ids. Message text lives in
+    one shared UTF-8 buffer addressed by start/end offsets.
+    """
+    __slots__ = (
+        "date_order", "timestamps", "sender_ids", "date_ids", "time_ids",
+        "text_starts", "text_ends", "text", "senders", "dates", "times",
+        "_sender_lookup", "_date_lookup", "_time_lookup", "derived"
+    )
+
+    def __init__(self, date_order="dmy"):
+        """
+        Initialize an empty message store
+
+        Args:
+            date_order (str): Order of the date fields, 'dmy', 'mdy', or 'ymd'
+        """
+        self.date_order = date_order
+        self.timestamps = array("q")
+        self.sender_ids = array("I")
+        self.date_ids = array("I")
+        self.time_ids = array("I")
+        self.text_starts = array("Q")
+        self.text_ends = array("Q")
+        self.text = bytearray()
+        self.senders = []
+        self.dates = []
+        self.times = []
+        self._sender_lookup = {}
+        self._date_lookup = {}
+        self._time_lookup = {}
+
+        # Values computed from the messages, cleared whenever the messages change
+        self.derived = {}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.message(index)
+
+    def append(self, message):
+        """
+        Append a parsed message
+
+        Args:
+            message (dict): Message dictionary with date, time, sender, and content
+        """
+        self.derived.clear()
+        timestamp = parse_timestamp(message["date"], message["time"], self.date_order)
+        if timestamp is None:
+            timestamp = self._redetect_date_order(message["date"], message["time"])
+        self.timestamps.append(timestamp)
+        self.sender_ids.append(_intern(message["sender"], self.senders, self._sender_lookup))
+        self.date_ids.append(_intern(message["date"], self.dates, self._date_lookup))
+        self.time_ids.append(_intern(message["time"], self.times, self._time_lookup))
+
+        encoded = message["content"].encode("utf-8")
+        self.text_starts.append(len(self.text))
+        self.text.extend(encoded)
+        self.text_ends.append(len(self.text))
+
+    def _redetect_date_order(self, date_str, time_str):
+        """
+        Handle a date that is invalid in the current date order
+
+        If the date and every earlier date are valid with day and month
+        swapped, the store switches order and parses the earlier timestamps
+        again. Otherwise the message takes the time of the message before it,
+        so it stays in place rather than jumping to 1970.
+
+        Args:
+            date_str (str): Date as written in the export
+            time_str (str): Time as written in the export
+
+        Returns:
+            int: Seconds since the epoch for the message
+        """
+        date_order = fallback_date_order(self.dates + [date_str], self.date_order)
+        if date_order is None:
+            print(f"Error parsing date: {date_str} is not a valid {self.date_order} date")
+            return self.timestamps[-1] if len(self.timestamps) else 0
+
+        self.date_order = date_order
+        for index in range(len(self.timestamps)):
+            self.timestamps[index] = parse_timestamp(self.dates[self.date_ids[index]], self.times[self.time_ids[index]], date_order)
+        return parse_timestamp(date_str, time_str, date_order)
+
+    def extend(self, messages):
+        """
+        Append messages from any iterable, e.g. a message stream
+
+        Args:
+            messages (iterable): Message dictionaries
+        """
+        for message in messages:
+            self.append(message)
+
+    def set_content(self, index, content):
+        """
+        Replace the text of a message
+
+        The new text is appended to the shared buffer and the message is
+        pointed at it, so other offsets stay valid.
+
+        Args:
+            index (int): Message index
+            content (str): New message content
+        """
+        self.derived.clear()
+        encoded = content.encode("utf-8")
+        self.text_starts[index] = len(self.text)
+        self.text.extend(encoded)
+        self.text_ends[index] = len(self.text)
+
+    def truncate(self, length):
+        """
+        Drop every message from an index onwards
+
+        Args:
+            length (int): Number of messages to keep
+        """
+        if length >= len(self):
+            return
+        self.derived.clear()
+        # Replaced texts may sit after later messages, so keep everything the kept messages use
+        del self.text[max(self.text_ends[:length], default=0):]
+        for column in (self.timestamps, self.sender_ids, self.date_ids, self.time_ids, self.text_starts, self.text_ends):
+            del column[length:]
+
+        # Ids are assigned in order of first appearance, so unused entries are at the end
+        _trim_table(self.sender_ids, self.senders, self._sender_lookup)
+        _trim_table(self.date_ids, self.dates, self._date_lookup)
+        _trim_table(self.time_ids, self.times, self._time_lookup)
+
+    def save(self, file_path):
+        """
+        Write the store to a binary file
+
+        Args:
+            file_path (str): Path to save the store to
+        """
+        columns = [getattr(self, name) for name in _COLUMNS]
+        header = json.dumps({
+            "date_order": self.date_order,
+            "senders": self.senders,
+            "dates": self.dates,
+            "times": self.times,
+            "columns": [[column.typecode, len(column)] for column in columns],
+            "text_size": len(self.text)
+        }).encode("utf-8")
+
+        with open(file_path, "wb") as file:
+            file.write(struct.pack("<Q", len(header)))
+            file.write(header)
+            for column in columns:
+                column.tofile(file)
+            file.write(self.text)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Read a store written by save
+
+        Args:
+            file_path (str): Path to the saved store
+
+        Returns:
+            MessageStore: Loaded store
+        """
+        with open(file_path, "rb") as file:
+            header_size = struct.unpack("<Q", file.read(8))[0]
+            header = json.loads(file.read(header_size).decode("utf-8"))
+
+            chat_store = cls(header["date_order"])
+            for name, (typecode, length) in zip(_COLUMNS, header["columns"]):
+                column = array(typecode)
+                column.fromfile(file, length)
+                setattr(chat_store, name, column)
+            chat_store.text = bytearray(file.read(header["text_size"]))
+
+        chat_store.senders = header["senders"]
+        chat_store.dates = header["dates"]
+        chat_store.times = header["times"]
+        chat_store._sender_lookup = {value: index for index, value in enumerate(chat_store.senders)}
+        chat_store._date_lookup = {value: index for index, value in enumerate(chat_store.dates)}
+        chat_store._time_lookup = {value: index for index, value in enumerate(chat_store.times)}
+        return chat_store
+
+    def content(self, index):
+        """
+        Get the text of a message
+
+        Args:
+            index (int): Message index
+
+        Returns:
+            str: Message content
+        """
+        return self.text[self.text_starts[index]:self.text_ends[index]].decode("utf-8")
+
+    def sender(self, index):
+        """
+        Get the sender of a message
+
+        Args:
+            index (int): Message index
+
+        Returns:
+            str: Sender name
+        """
+        return self.senders[self.sender_ids[index]]
+
+    def date(self, index):
+        """
+        Get the date string of a message
+
+        Args:
+            index (int): Message index
+
+        Returns:
+            str: Date as written in the export
+        """
+        return self.dates[self.date_ids[index]]
+
+    def time(self, index):
+        """
+        Get the time string of a message
+
+        Args:
+            index (int): Message index
+
+        Returns:
+            str: Time as written in the export
+        """
+        return self.times[self.time_ids[index]]
+
+    def message(self, index):
+        """
+        Get a message as a dictionary
+
+        Args:
+            index (int): Message index
+
+        Returns:
+            dict: Message with date, time, sender, content, and timestamp
+        """
+        return {
+            "date": self.date(index),
+            "time": self.time(index),
+            "sender": self.sender(index),
+            "content": self.content(index),
+            "timestamp": self.timestamps[index]
+        }
+
+    def time_index(self):
+        """
+        Get the messages in chronological order
+
+        Exports are almost always in order already, in which case no sort is
+        needed. The index is kept until the messages change.
+
+        Returns:
+            tuple: (message indices sorted by time, their timestamps in ascending order)
+        """
+        if "time_index" not in self.derived:
+            timestamps = self.timestamps
+            if all(timestamps[index] <= timestamps[index + 1] for index in range(len(timestamps) - 1)):
+                order = array("I", range(len(timestamps)))
+                sorted_timestamps = timestamps
+            else:
+                order = array("I", sorted(range(len(timestamps)), key=timestamps.__getitem__))
+                sorted_timestamps = array("q", (timestamps[index] for index in order))
+            self.derived["time_index"] = (order, sorted_timestamps)
+        return self.derived["time_index"]
+
+    def indices_between(self, since=None, until=None):
+        """
+        Find the messages in a time range by binary search
+
+        Args:
+            since (int, optional): Start of the range in epoch seconds, inclusive
+            until (int, optional): End of the range in epoch seconds, exclusive
+
+        Returns:
+            list: Message indices in the range, in store order
+        """
+        order, sorted_timestamps = self.time_index()
+        start = 0 if since is None else bisect_left(sorted_timestamps, since)
+        end = len(order) if until is None else bisect_left(sorted_timestamps, until)
+        return sorted(order[start:end])
+
+    def slice_by_time(self, since=None, until=None):
+        """
+        Get a new store holding only the messages in a time range
+
+        Args:
+            since (int, optional): Start of the range in epoch seconds, inclusive
+            until (int, optional): End of the range in epoch seconds, exclusive
+
+        Returns:
+            MessageStore: Store with the messages in the range
+        """
+        return self.subset(self.indices_between(since, until))
+
+    def subset(self, indices):
+        """
+        Get a new store holding some of the messages
+
+        Args:
+            indices (iterable): Message indices to copy, in the order to keep them
+
+        Returns:
+            MessageStore: Store with the selected messages
+        """
+        chat_store = MessageStore(self.date_order)
+        for index in indices:
+            # Timestamps are copied rather than parsed again
+            chat_store.timestamps.append(self.timestamps[index])
+            chat_store.sender_ids.append(_intern(self.sender(index), chat_store.senders, chat_store._sender_lookup))
+            chat_store.date_ids.append(_intern(self.date(index), chat_store.dates, chat_store._date_lookup))
+            chat_store.time_ids.append(_intern(self.time(index), chat_store.times, chat_store._time_lookup))
+            chat_store.text_starts.append(len(chat_store.text))
+            chat_store.text.extend(self.text[self.text_starts[index]:self.text_ends[index]])
+            chat_store.text_ends.append(len(chat_store.text))
+        return chat_store
+
+    def by_date(self):
+        """
+        Group messages by date
+
+        Returns:
+            GroupedView: Lazy mapping of date string to message indices
+        """
+        return GroupedView(self.date_ids, self.dates, self._date_lookup)
+
+    def by_sender(self):
+        """
+        Group messages by sender
+
+        Returns:
+            GroupedView: Lazy mapping of sender name to message indices
+        """
+        return GroupedView(self.sender_ids, self.senders, self._sender_lookup)
+
+class GroupedView(Mapping):
+    """
+    Lazy read-only mapping from a group key to the indices of its messages
+
+    The index lists are only built on first access.
+    """
+    __slots__ = ("_ids", "_labels", "_lookup", "_groups")
+
+    def __init__(self, ids, labels, lookup):
+        """
+        Initialize a grouped view
+
+        Args:
+            ids (array): Group id of each message
+            labels (list): Group key for each group id
+            lookup (dict): Group id for each group key
+        """
+        self._ids = ids
+        self._labels = labels
+        self._lookup = lookup
+        self._groups = None
+
+    def _build(self):
+        if self._groups is None:
+            groups = [array("I") for _ in self._labels]
+            for index, group_id in enumerate(self._ids):
+                groups[group_id].append(index)
+            self._groups = groups
+        return self._groups
+
+    def __getitem__(self, key):
+        return self._build()[self._lookup[key]]
+
+    def __iter__(self):
+        # Groups are listed in order of first appearance
+        return iter(self._labels)
+
+    def __len__(self):
+        return len(self._labels)
+
+# Array columns written by MessageStore.save, in file order
+_COLUMNS = ("timestamps", "sender_ids", "date_ids", "time_ids", "text_starts", "text_ends")
+
+def _trim_table(ids, values, lookup):
+    """
+    Remove interned values that no message refers to any more
+
+    Args:
+        ids (array): Id of each message
+        values (list): Id-to-value table
+        lookup (dict): Value-to-id table
+    """
+    used = max(ids) + 1 if ids else 0
+    for value in values[used:]:
+        del lookup[value]
+    del values[used:]
+
+def _intern(value, values, lookup):
+    """
+    Get the id of a value, adding it to the table if new
+
+    Args:
+        value (str): Value to intern
+        values (list): Id-to-value table
+        lookup (dict): Value-to-id table
+
+    Returns:
+        int: Value id
+    """
+    value_id = lookup.get(value)
+    if value_id is None:
+        value_id = len(values)
+        values.append(value)
+        lookup[value] = value_id
+    return value_id
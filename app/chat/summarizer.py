@@ -0,0 +1,607 @@
+import math
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from app.chat.parser import (
+    ACTION_POINTS_MARKER, ACTION_POINTS_PROMPT, SUMMARY_MARKER,
+    get_combined_prompt, get_template_prompt, request_completion, split_combined_response
+)
+from app.chat.sessions import get_session_store, segment_sessions
+from app.chat.prompt_format import format_legend, format_prompt_chat, get_sender_aliases, iter_prompt_days, use_compact_prompts
+from app.api.budget import TOKENS_PER_MESSAGE, count_tokens, estimate_cost, fits_budget, get_input_budget
+from config.settings import DEFAULT_SETTINGS
+
+PARTIAL_SUMMARY_PROMPT = "You are an assistant that summarizes one part of a longer WhatsApp chat. Write a concise factual summary of this part. Keep every decision, commitment, deadline, figure, and name of the person involved, since the summary will later be combined with summaries of the other parts."
+
+COMBINE_SUMMARIES_PROMPT = "You are an assistant that merges summaries of consecutive parts of a WhatsApp chat into one concise factual summary. Keep every decision, commitment, deadline, figure, and name of the person involved, in chronological order."
+
+MERGE_ACTION_POINTS_PROMPT = "You are an assistant that merges lists of action items extracted from consecutive parts of a WhatsApp chat. Remove duplicates, keep the latest status of each item, and for each action item identify who is responsible, what the task is, and any deadlines mentioned. Format the output as a bulleted list with clear, concise points."
+
+# Longest instruction placed before a chunk, used to size the chunks
+CHUNK_INSTRUCTION = "Please summarize this part of a WhatsApp chat and extract its action points:\n\n"
+
+# Instruction placed before the text of one session
+SESSION_INSTRUCTION = "Please summarize this conversation from a WhatsApp chat:\n\n"
+
+# Typical response length, used for cost estimates
+ESTIMATED_OUTPUT_TOKENS = 500
+
+PARTIAL_COMBINED_PROMPT = PARTIAL_SUMMARY_PROMPT + f" Also extract the action items of this part, each with who is responsible, the task, and any deadline, as a bulleted list. Reply with exactly two sections. Start the first with the line {SUMMARY_MARKER} followed by the summary, and the second with the line {ACTION_POINTS_MARKER} followed by the action items."
+
+def summarize_hierarchical(chat_store, template_type, max_tokens=None, max_workers=None):
+    """
+    Summarize a long chat with a map-reduce over day-aligned chunks
+
+    Chunks are summarized concurrently, then the partial summaries are
+    combined, recursively if they do not fit in one request, into the final
+    template summary.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+        max_tokens (int, optional): Token budget per request
+        max_workers (int, optional): Concurrent requests
+
+    Returns:
+        str: Generated summary
+    """
+    max_tokens = max_tokens or get_chunk_budget()
+    chunks = split_into_chunks(chat_store, max_tokens)
+
+    partials = _map_concurrently(
+        lambda chunk: request_completion(PARTIAL_SUMMARY_PROMPT, f"Please summarize this part of a WhatsApp chat:\n\n{chunk}"),
+        chunks,
+        max_workers
+    )
+
+    combined = reduce_partials(partials, COMBINE_SUMMARIES_PROMPT, max_tokens, max_workers)
+    return request_completion(
+        get_template_prompt(template_type),
+        f"Please summarize this WhatsApp chat. It is given as summaries of its consecutive parts:\n\n{combined}"
+    )
+
+def extract_action_points_hierarchical(chat_store, max_tokens=None, max_workers=None):
+    """
+    Extract action points from a long chat with a map-reduce over day-aligned chunks
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        max_tokens (int, optional): Token budget per request
+        max_workers (int, optional): Concurrent requests
+
+    Returns:
+        str: Extracted action points
+    """
+    max_tokens = max_tokens or get_chunk_budget()
+    chunks = split_into_chunks(chat_store, max_tokens)
+
+    partials = _map_concurrently(
+        lambda chunk: request_completion(ACTION_POINTS_PROMPT, f"Please extract all action points from this part of a WhatsApp chat:\n\n{chunk}"),
+        chunks,
+        max_workers
+    )
+
+    combined = reduce_partials(partials, MERGE_ACTION_POINTS_PROMPT, max_tokens, max_workers)
+    return request_completion(
+        MERGE_ACTION_POINTS_PROMPT,
+        f"Please merge these action point lists from consecutive parts of a WhatsApp chat:\n\n{combined}"
+    )
+
+def summarize_and_extract_hierarchical(chat_store, template_type, max_tokens=None, max_workers=None):
+    """
+    Summarize a long chat and extract its action points in one map-reduce
+
+    Each chunk is sent once and returns both a partial summary and a partial
+    action point list. The two kinds of partial result are reduced separately
+    and combined in one final request.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+        max_tokens (int, optional): Token budget per request
+        max_workers (int, optional): Concurrent requests
+
+    Returns:
+        tuple: (summary, action points)
+    """
+    max_tokens = max_tokens or get_chunk_budget()
+    chunks = split_into_chunks(chat_store, max_tokens)
+
+    responses = _map_concurrently(
+        lambda chunk: request_completion(PARTIAL_COMBINED_PROMPT, CHUNK_INSTRUCTION + chunk),
+        chunks,
+        max_workers
+    )
+
+    summaries = []
+    action_lists = []
+    for response in responses:
+        sections = split_combined_response(response) or (response, "")
+        summaries.append(sections[0])
+        action_lists.append(sections[1])
+
+    # Half of the budget each, since both go into the final request
+    combined_summaries, combined_actions = _map_concurrently(
+        lambda job: reduce_partials(job[0], job[1], max_tokens // 2, max_workers),
+        [(summaries, COMBINE_SUMMARIES_PROMPT), (action_lists, MERGE_ACTION_POINTS_PROMPT)],
+        2
+    )
+
+    response = request_completion(
+        get_combined_prompt(template_type),
+        f"Please summarize this WhatsApp chat and merge its action points. "
+        f"The chat is given as summaries of its consecutive parts, followed by the action points found in each part.\n\n"
+        f"Summaries:\n\n{combined_summaries}\n\nAction points:\n\n{combined_actions}"
+    )
+    return split_combined_response(response) or (response, combined_actions)
+
+def summarize_sessions(chat_store, max_tokens=None, max_workers=None):
+    """
+    Summarize each conversation session of a chat concurrently
+
+    Every session is a request of its own, so its response is cached and
+    reused for as long as the session itself does not change. Sessions too
+    long for one request are summarized in chunks and merged.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        max_tokens (int, optional): Token budget per request
+        max_workers (int, optional): Concurrent requests
+
+    Returns:
+        list: Sessions from segment_sessions, each with its 'summary'
+    """
+    max_tokens = max_tokens or get_chunk_budget()
+    sessions = segment_sessions(chat_store)
+
+    summaries = _map_concurrently(
+        lambda session: summarize_session(get_session_store(chat_store, session), max_tokens),
+        sessions,
+        max_workers
+    )
+    return [dict(session, summary=summary) for session, summary in zip(sessions, summaries)]
+
+def summarize_session(session_store, max_tokens, system_prompt=PARTIAL_SUMMARY_PROMPT):
+    """
+    Summarize the messages of one session or day
+
+    Args:
+        session_store (MessageStore): Messages of the session
+        max_tokens (int): Token budget per request
+        system_prompt (str): System prompt for the summary
+
+    Returns:
+        str: Session summary
+    """
+    chunks = split_into_chunks(session_store, max_tokens)
+    if len(chunks) == 1:
+        return request_completion(system_prompt, SESSION_INSTRUCTION + chunks[0])
+
+    # Parts of one session run one after the other, sessions already run side by side
+    partials = [
+        request_completion(system_prompt, f"Please summarize this part of a WhatsApp chat:\n\n{chunk}")
+        for chunk in chunks
+    ]
+    combined = reduce_partials(partials, COMBINE_SUMMARIES_PROMPT, max_tokens, 1)
+    return request_completion(
+        COMBINE_SUMMARIES_PROMPT,
+        f"Please merge these summaries of consecutive parts of one conversation:\n\n{combined}"
+    )
+
+def iter_summary_units(chat_store, unit="day"):
+    """
+    Split a chat into the units that are summarized and stored separately
+
+    Days are keyed by their date, sessions by the time of their first
+    message, so both keys stay the same when later messages are added.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        unit (str): 'day' or 'session'
+
+    Yields:
+        tuple: (unit key, store with the messages of the unit)
+    """
+    if unit == "session":
+        for session in segment_sessions(chat_store):
+            yield str(session["first_timestamp"]), get_session_store(chat_store, session)
+    elif unit == "day":
+        for date, indices in chat_store.by_date().items():
+            yield date, chat_store.subset(indices)
+    else:
+        raise ValueError(f"Unsupported summary unit: {unit}")
+
+def summarize_rolling(chat_store, template_type, chat_id, unit=None, max_tokens=None, max_workers=None, plan=None):
+    """
+    Summarize a chat from stored partial summaries of its days or sessions
+
+    Only units that are new or changed since the last run are sent to the
+    model, concurrently. The template summary is then rebuilt from all the
+    partials, so the cost of a recurring report follows the new activity
+    rather than the length of the chat.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+        chat_id (str): Stable chat id, e.g. from get_chat_id
+        unit (str, optional): 'day' or 'session', defaults to the setting
+        max_tokens (int, optional): Token budget per request
+        max_workers (int, optional): Concurrent requests
+        plan (tuple, optional): Result of plan_rolling_summary for the same unit, made if not given
+
+    Returns:
+        tuple: (summary, stats with the number of units, reused partials, and summarized units)
+    """
+    unit = unit or DEFAULT_SETTINGS["chat"]["rolling_summary_unit"]
+    max_tokens = max_tokens or get_chunk_budget()
+    units, stored, missing = plan or plan_rolling_summary(chat_store, template_type, chat_id, unit)
+
+    summaries = _map_concurrently(
+        lambda entry: summarize_session(entry[2], max_tokens, get_partial_prompt(template_type)),
+        missing,
+        max_workers
+    )
+    fresh = [(unit_key, content_hash, summary) for (unit_key, content_hash, _), summary in zip(missing, summaries)]
+
+    from app.chat.rolling import get_partial_store
+    get_partial_store().put_many(chat_id, unit, template_type, fresh)
+    stored.update((unit_key, summary) for unit_key, _, summary in fresh)
+
+    stats = {"units": len(units), "reused": len(units) - len(missing), "summarized": len(missing)}
+    if not units:
+        return "", stats
+
+    # The final summary is rebuilt from every partial in chronological order
+    combined = reduce_partials([stored[unit_key] for unit_key, _, _ in units], COMBINE_SUMMARIES_PROMPT, max_tokens, max_workers)
+    summary = request_completion(
+        get_template_prompt(template_type),
+        f"Please summarize this WhatsApp chat. It is given as summaries of its consecutive parts:\n\n{combined}"
+    )
+    return summary, stats
+
+def plan_rolling_summary(chat_store, template_type, chat_id, unit=None):
+    """
+    Find which units of a chat have a current stored partial summary
+
+    Every unit is formatted and hashed, so the plan is made once per import
+    and shared by estimate_chat_job and summarize_rolling.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+        chat_id (str): Stable chat id
+        unit (str, optional): 'day' or 'session', defaults to the setting
+
+    Returns:
+        tuple: (list of (unit key, content hash, unit store) in order,
+            dict of stored summary by unit key, list of units to summarize)
+    """
+    from app.chat.rolling import get_partial_store
+
+    unit = unit or DEFAULT_SETTINGS["chat"]["rolling_summary_unit"]
+    units = []
+    for unit_key, unit_store in iter_summary_units(chat_store, unit):
+        content_hash = hashlib.sha256(format_prompt_chat(unit_store).encode("utf-8")).hexdigest()
+        units.append((unit_key, content_hash, unit_store))
+
+    stored = get_partial_store().get_many(chat_id, unit, template_type, {unit_key: content_hash for unit_key, content_hash, _ in units})
+    missing = [entry for entry in units if entry[0] not in stored]
+    return units, stored, missing
+
+def should_use_rolling(chat_store, template_type, chat_id, unit=None):
+    """
+    Decide whether a chat is summarized from per-unit partials
+
+    Partials pay off for chats that already have some stored, and for chats
+    that need a hierarchical summary anyway. A chat that fits one request is
+    cheaper to send whole, together with its action points.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+        chat_id (str): Stable chat id
+        unit (str, optional): 'day' or 'session', defaults to the setting
+
+    Returns:
+        bool: True to summarize with summarize_rolling
+    """
+    from app.chat.rolling import get_partial_store
+
+    unit = unit or DEFAULT_SETTINGS["chat"]["rolling_summary_unit"]
+    if get_partial_store().has_partials(chat_id, unit, template_type):
+        return True
+    system_prompt = get_template_prompt(template_type)
+    return not fits_budget(format_prompt_chat(chat_store), get_input_budget(system_prompt, "Please summarize this WhatsApp chat:\n\n"))
+
+def get_partial_prompt(template_type):
+    """
+    Get the system prompt for stored partial summaries
+
+    Partials are written with the template in mind, so each template has its own.
+
+    Args:
+        template_type (str): Type of document template
+
+    Returns:
+        str: System prompt
+    """
+    return f"{PARTIAL_SUMMARY_PROMPT} The final document is a {template_type}, so keep what it needs."
+
+def split_into_chunks(chat_store, max_tokens):
+    """
+    Split a chat into formatted text chunks that fit a token budget
+
+    Whole days are kept together where possible. A day that does not fit on
+    its own is split between messages. In the compact format each chunk
+    starts with a legend of the participants it mentions.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        max_tokens (int): Token budget per chunk
+
+    Returns:
+        list: Formatted chunk texts in chronological order
+    """
+    compact = use_compact_prompts()
+    cache_key = ("chunks", max_tokens, compact)
+    if cache_key in chat_store.derived:
+        return chat_store.derived[cache_key]
+
+    chunks = []
+    current = []
+    current_senders = set()
+    current_tokens = 0
+
+    # Legend tokens are counted as participants join a chunk
+    legend_tokens = count_tokens(format_legend(chat_store, [], compact))
+    if compact:
+        aliases = get_sender_aliases(chat_store)
+        sender_tokens = [count_tokens(f"{aliases[sender_id]} = {name}; ") for sender_id, name in enumerate(chat_store.senders)]
+    else:
+        sender_tokens = [0] * len(chat_store.senders)
+
+    def flush():
+        nonlocal current_tokens
+        if current:
+            chunks.append(format_legend(chat_store, current_senders, compact) + "".join(current))
+            current.clear()
+            current_senders.clear()
+            current_tokens = 0
+
+    def new_senders_tokens(entries):
+        senders = {sender_id for sender_id, _ in entries} - current_senders
+        return sum(sender_tokens[sender_id] for sender_id in senders)
+
+    for date, entries in iter_prompt_days(chat_store, compact):
+        header = f"=== {date} ===\n\n"
+        line_tokens_list = [count_tokens(line) for _, line in entries]
+        day_tokens = count_tokens(header) + sum(line_tokens_list) + new_senders_tokens(entries)
+
+        # Start a new chunk rather than split a day that fits in one
+        if current_tokens + day_tokens > max_tokens - legend_tokens and day_tokens <= max_tokens - legend_tokens:
+            flush()
+
+        current.append(header)
+        current_tokens += count_tokens(header)
+        for (sender_id, line), line_tokens in zip(entries, line_tokens_list):
+            if line_tokens > max_tokens // 2:
+                # A single oversized message is cut to about half the budget
+                line = line[:len(line) * max_tokens // 2 // line_tokens] + " [message truncated]\n"
+                line_tokens = count_tokens(line)
+            cost = line_tokens + (0 if sender_id in current_senders else sender_tokens[sender_id])
+            if current_tokens + cost > max_tokens - legend_tokens:
+                flush()
+                current.append(f"=== {date} (continued) ===\n\n")
+                current_tokens = count_tokens(current[0])
+                cost = line_tokens + sender_tokens[sender_id]
+            current.append(line)
+            current_senders.add(sender_id)
+            current_tokens += cost
+        current.append("\n")
+
+    flush()
+    chat_store.derived[cache_key] = chunks
+    return chunks
+
+def reduce_partials(partials, prompt, max_tokens, max_workers=None):
+    """
+    Combine partial results until they fit in one request
+
+    Partials are grouped into batches that fit the budget and each batch is
+    merged concurrently. This repeats until one batch remains.
+
+    Args:
+        partials (list): Partial results in chronological order
+        prompt (str): System prompt for merging a batch
+        max_tokens (int): Token budget per request
+        max_workers (int, optional): Concurrent requests
+
+    Returns:
+        str: Numbered partial results that fit in one request
+    """
+    while True:
+        combined = _number_parts(partials)
+        if len(partials) <= 1 or count_tokens(combined) <= max_tokens:
+            return combined
+
+        batches = []
+        batch_tokens = max_tokens
+        for partial in partials:
+            partial_tokens = count_tokens(partial)
+            # Every batch takes at least two parts so each round shrinks the list
+            if batch_tokens + partial_tokens > max_tokens and (not batches or len(batches[-1]) >= 2):
+                batches.append([])
+                batch_tokens = 0
+            batches[-1].append(partial)
+            batch_tokens += partial_tokens
+
+        partials = _map_concurrently(
+            lambda batch: batch[0] if len(batch) == 1 else request_completion(prompt, _number_parts(batch)),
+            batches,
+            max_workers
+        )
+
+def estimate_chat_job(chat_store, template_type, summary=True, action_points=True, combined=None, rolling_plan=None):
+    """
+    Estimate the requests, cost, and latency of processing a chat before submitting it
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        template_type (str): Type of document template
+        summary (bool): Whether a summary is requested
+        action_points (bool): Whether action points are requested
+        combined (bool, optional): Whether both are extracted in one pass, defaults to the setting
+        rolling_plan (tuple, optional): Result of plan_rolling_summary if the summary is made with summarize_rolling
+
+    Returns:
+        dict: Estimate from estimate_cost, with the number of chunks
+    """
+    if combined is None:
+        combined = DEFAULT_SETTINGS["chat"]["combined_extraction"]
+    rolling = summary and rolling_plan is not None
+
+    # Separate summary and action point jobs each make their own pass over the chat
+    passes = []
+    if summary and action_points and combined and not rolling:
+        passes.append((chat_store, get_combined_prompt(template_type)))
+    else:
+        if summary and not rolling:
+            passes.append((chat_store, get_template_prompt(template_type)))
+        if action_points:
+            if DEFAULT_SETTINGS["chat"]["action_prefilter"]:
+                # The action point pass only sends the candidate messages
+                from app.chat.action_filter import filter_action_candidates
+                passes.append((filter_action_candidates(chat_store), ACTION_POINTS_PROMPT))
+            else:
+                passes.append((chat_store, ACTION_POINTS_PROMPT))
+
+    totals = [_estimate_pass(pass_store, system_prompt) for pass_store, system_prompt in passes if len(pass_store)]
+    if rolling:
+        totals.append(_estimate_rolling(rolling_plan, template_type))
+    if not totals:
+        return estimate_cost(0, 0, requests=0, rounds=0)
+
+    # Passes run one after the other
+    input_tokens, requests, rounds, chunks = (sum(values) for values in zip(*totals))
+    estimate = estimate_cost(input_tokens, requests * ESTIMATED_OUTPUT_TOKENS, requests, rounds)
+    estimate["chunks"] = chunks
+    return estimate
+
+def _estimate_pass(chat_store, system_prompt):
+    """
+    Estimate one pass over a chat, hierarchical if it does not fit one request
+
+    Args:
+        chat_store (MessageStore): Messages sent in the pass
+        system_prompt (str): System prompt of the pass
+
+    Returns:
+        tuple: (input tokens, requests, sequential rounds, chunks)
+    """
+    formatted_chat = format_prompt_chat(chat_store)
+    overhead = count_tokens(system_prompt) + 2 * TOKENS_PER_MESSAGE + 20
+
+    if fits_budget(formatted_chat, get_input_budget(system_prompt, "")):
+        return count_tokens(formatted_chat) + overhead, 1, 1, 1
+
+    max_tokens = get_chunk_budget()
+    chunks = split_into_chunks(chat_store, max_tokens)
+    input_tokens = sum(count_tokens(chunk) for chunk in chunks) + len(chunks) * overhead
+    reduce_tokens, reduce_requests, reduce_rounds = _estimate_reduce(len(chunks), max_tokens, overhead)
+    return input_tokens + reduce_tokens, len(chunks) + reduce_requests, 1 + reduce_rounds, len(chunks)
+
+def _estimate_rolling(plan, template_type):
+    """
+    Estimate a rolling summary, counting only units without a stored partial
+
+    Args:
+        plan (tuple): Result of plan_rolling_summary
+        template_type (str): Type of document template
+
+    Returns:
+        tuple: (input tokens, requests, sequential rounds, chunks)
+    """
+    units, _, missing = plan
+    if not units:
+        return 0, 0, 0, 0
+
+    # Missing units are summarized side by side, the longest sets the rounds
+    unit_totals = [_estimate_pass(unit_store, get_partial_prompt(template_type)) for _, _, unit_store in missing]
+    input_tokens = sum(total[0] for total in unit_totals)
+    requests = sum(total[1] for total in unit_totals)
+    rounds = max((total[2] for total in unit_totals), default=0)
+    chunks = sum(total[3] for total in unit_totals)
+
+    overhead = count_tokens(get_template_prompt(template_type)) + 2 * TOKENS_PER_MESSAGE + 20
+    reduce_tokens, reduce_requests, reduce_rounds = _estimate_reduce(len(units), get_chunk_budget(), overhead)
+    return input_tokens + reduce_tokens, requests + reduce_requests, rounds + reduce_rounds, chunks
+
+def _estimate_reduce(partial_count, max_tokens, overhead):
+    """
+    Estimate combining partial results into one final request
+
+    Args:
+        partial_count (int): Number of partial results
+        max_tokens (int): Token budget per request
+        overhead (int): Prompt tokens added to each request
+
+    Returns:
+        tuple: (input tokens, requests, sequential rounds)
+    """
+    input_tokens = 0
+    requests = 0
+    rounds = 0
+
+    # Each reduce round merges partials in batches that fit the budget
+    partial_tokens = partial_count * ESTIMATED_OUTPUT_TOKENS
+    while partial_tokens > max_tokens:
+        batches = math.ceil(partial_tokens / max_tokens)
+        input_tokens += partial_tokens + batches * overhead
+        requests += batches
+        rounds += 1
+        partial_tokens = batches * ESTIMATED_OUTPUT_TOKENS
+
+    # Final request over the combined partials
+    return input_tokens + partial_tokens + overhead, requests + 1, rounds + 1
+
+def get_chunk_budget():
+    """
+    Get the token budget for one chunk of a long chat
+
+    Returns:
+        int: The configured chunk size, or as much as fits the model window
+    """
+    window_budget = get_input_budget(PARTIAL_COMBINED_PROMPT, CHUNK_INSTRUCTION)
+    configured = DEFAULT_SETTINGS["chat"]["summary_chunk_tokens"]
+    return min(configured, window_budget) if configured else window_budget
+
+def _number_parts(parts):
+    """
+    Join partial results under numbered part headings
+
+    Args:
+        parts (list): Partial results in chronological order
+
+    Returns:
+        str: Joined text
+    """
+    return "\n".join(f"--- Part {number} ---\n{part}\n" for number, part in enumerate(parts, 1))
+
+def _map_concurrently(function, items, max_workers=None):
+    """
+    Apply a function to items in a thread pool, keeping their order
+
+    Args:
+        function (callable): Function to apply
+        items (list): Items to process
+        max_workers (int, optional): Number of threads
+
+    Returns:
+        list: Results in the order of the items
+    """
+    max_workers = max_workers or DEFAULT_SETTINGS["chat"]["summary_workers"]
+    if len(items) <= 1:
+        return [function(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(function, items))
@@ -0,0 +1,309 @@
+import re
+import math
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from config.settings import DEFAULT_SETTINGS
+
+# Hashed feature space, small enough to densify one batch at a time
+FEATURE_COUNT = 2048
+
+# Messages densified and compared with the centroids at once
+BATCH_SIZE = 4096
+
+# Mini-batch k-means passes over the messages
+EPOCHS = 3
+
+# Messages shown for each topic, nearest to its centre first
+HIGHLIGHT_COUNT = 3
+
+_WORD = re.compile(r'[^\W\d_]{3,}')
+
+# Words too common in chats to say anything about a topic
+STOPWORDS = set((
+    "the and for are but not you all any can had her was one our out day get has him his how man new now old see "
+    "two way who boy did its let put say she too use that with have this will your from they know want been good "
+    "much some time very when come here just like long make many more only over such take than them well were what "
+    "okay yes yeah thanks thank please sure lol haha hahaha omitted media message deleted image sticker audio video "
+    "there their then about would could should into also what which where why because going gonna really"
+).split())
+
+def group_topics(chat_store, max_topics=None, seed=0):
+    """
+    Group the messages of a chat into topics without any API call
+
+    Messages become hashed TF-IDF vectors, built as sparse coordinates and
+    densified one batch at a time, and are clustered with mini-batch
+    spherical k-means. Messages with no topic words, such as "ok", join the
+    topic of the message before them.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        max_topics (int, optional): Most topics to find, defaults to the setting
+        seed (int): Random seed for the clustering
+
+    Returns:
+        list: Topics, largest first, each with keywords, message count,
+            senders, first and last date, and highlight messages
+    """
+    max_topics = max_topics or DEFAULT_SETTINGS["chat"]["max_topics"]
+    rows, columns, values, bucket_words = vectorize(chat_store)
+    vectorized = np.unique(rows)
+    if not len(vectorized):
+        return []
+
+    topic_count = max(1, min(max_topics, int(math.sqrt(len(vectorized) / 20))))
+    rng = np.random.default_rng(seed)
+
+    # Rows are remapped so that only messages with topic words are clustered
+    row_lookup = np.full(len(chat_store), -1, dtype=np.int64)
+    row_lookup[vectorized] = np.arange(len(vectorized))
+    local_rows = row_lookup[rows]
+
+    batches = _batch_bounds(local_rows, len(vectorized))
+    centroids = _init_centroids(local_rows, columns, values, len(vectorized), topic_count, rng)
+    centroids = _fit_centroids(batches, local_rows, columns, values, centroids, rng)
+    labels, similarity = _assign(batches, local_rows, columns, values, centroids)
+
+    # Messages without topic words follow the conversation they are part of
+    message_labels = np.full(len(chat_store), -1, dtype=np.int64)
+    message_labels[vectorized] = labels
+    message_labels = _carry_forward(message_labels)
+
+    topics = []
+    for topic in range(topic_count):
+        members = np.flatnonzero(message_labels == topic)
+        if not len(members):
+            continue
+
+        # Nearest messages to the centre, among those that were clustered
+        clustered = np.flatnonzero(labels == topic)
+        nearest = clustered[np.argsort(-similarity[clustered])[:HIGHLIGHT_COUNT]]
+        top_buckets = np.argsort(-centroids[topic])[:5]
+        senders = Counter(chat_store.sender_ids[index] for index in members)
+
+        topics.append({
+            "keywords": [bucket_words[bucket] for bucket in top_buckets if centroids[topic, bucket] > 0 and bucket in bucket_words],
+            "message_count": int(len(members)),
+            "senders": [chat_store.senders[sender_id] for sender_id, _ in senders.most_common(3)],
+            "first_date": chat_store.date(int(members[0])),
+            "last_date": chat_store.date(int(members[-1])),
+            "highlights": [
+                f"{chat_store.sender(int(vectorized[row]))}: {chat_store.content(int(vectorized[row]))}" for row in nearest
+            ],
+            "message_indices": members.tolist()
+        })
+
+    topics.sort(key=lambda topic: topic["message_count"], reverse=True)
+    return topics
+
+def vectorize(chat_store):
+    """
+    Build hashed TF-IDF vectors for every message as sparse coordinates
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+
+    Returns:
+        tuple: (row array, column array, L2-normalized value array, dict of
+            bucket to its most frequent word)
+    """
+    buckets = {}
+    bucket_counts = Counter()
+    rows = []
+    columns = []
+
+    for index in range(len(chat_store)):
+        for word in _WORD.findall(chat_store.content(index).lower()):
+            if word in STOPWORDS:
+                continue
+            bucket = buckets.get(word)
+            if bucket is None:
+                bucket = zlib.crc32(word.encode("utf-8")) % FEATURE_COUNT
+                buckets[word] = bucket
+            bucket_counts[word] += 1
+            rows.append(index)
+            columns.append(bucket)
+
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32), {}
+
+    # Repeated words in one message are merged into a term count
+    keys, counts = np.unique(np.array(rows, dtype=np.int64) * FEATURE_COUNT + np.array(columns, dtype=np.int64),
+                             return_counts=True)
+    rows = keys // FEATURE_COUNT
+    columns = keys % FEATURE_COUNT
+
+    document_count = len(np.unique(rows))
+    document_frequency = np.bincount(columns, minlength=FEATURE_COUNT)
+    idf = np.log((1 + document_count) / (1 + document_frequency)) + 1
+    values = ((1 + np.log(counts)) * idf[columns]).astype(np.float32)
+
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(chat_store)))
+    values /= norms[rows].astype(np.float32)
+
+    bucket_words = {}
+    for word, _ in bucket_counts.most_common():
+        bucket_words.setdefault(buckets[word], word)
+
+    return rows, columns, values, bucket_words
+
+def _batch_bounds(rows, row_count):
+    """
+    Split sorted sparse coordinates into batches of whole rows
+
+    Args:
+        rows (np.ndarray): Sorted row of each coordinate
+        row_count (int): Number of rows
+
+    Returns:
+        list: (first row, end row, first coordinate, end coordinate) tuples
+    """
+    bounds = []
+    for first_row in range(0, row_count, BATCH_SIZE):
+        end_row = min(first_row + BATCH_SIZE, row_count)
+        start, end = np.searchsorted(rows, [first_row, end_row])
+        bounds.append((first_row, end_row, int(start), int(end)))
+    return bounds
+
+def _densify(batch, rows, columns, values):
+    """
+    Densify one batch of sparse rows
+
+    Args:
+        batch (tuple): Batch bounds from _batch_bounds
+        rows, columns, values (np.ndarray): Sparse coordinates
+
+    Returns:
+        np.ndarray: Dense float32 matrix of the batch
+    """
+    first_row, end_row, start, end = batch
+    dense = np.zeros((end_row - first_row, FEATURE_COUNT), dtype=np.float32)
+    dense[rows[start:end] - first_row, columns[start:end]] = values[start:end]
+    return dense
+
+def _init_centroids(rows, columns, values, row_count, topic_count, rng):
+    """
+    Pick starting centroids with k-means++ on a sample of messages
+
+    Args:
+        rows, columns, values (np.ndarray): Sparse coordinates
+        row_count (int): Number of rows
+        topic_count (int): Number of centroids
+        rng (np.random.Generator): Random generator
+
+    Returns:
+        np.ndarray: Centroid matrix
+    """
+    sample_rows = np.sort(rng.choice(row_count, size=min(row_count, BATCH_SIZE), replace=False))
+    mask = np.isin(rows, sample_rows)
+    sample = np.zeros((len(sample_rows), FEATURE_COUNT), dtype=np.float32)
+    sample[np.searchsorted(sample_rows, rows[mask]), columns[mask]] = values[mask]
+
+    centroids = [sample[rng.integers(len(sample))]]
+    distances = 2 - 2 * sample @ centroids[0]
+    for _ in range(1, topic_count):
+        probabilities = np.clip(distances, 0, None)
+        total = probabilities.sum()
+        choice = rng.choice(len(sample), p=probabilities / total) if total > 0 else rng.integers(len(sample))
+        centroids.append(sample[choice])
+        distances = np.minimum(distances, 2 - 2 * sample @ sample[choice])
+
+    return np.array(centroids, dtype=np.float32)
+
+def _fit_centroids(batches, rows, columns, values, centroids, rng):
+    """
+    Refine centroids with mini-batch spherical k-means
+
+    Args:
+        batches (list): Batch bounds
+        rows, columns, values (np.ndarray): Sparse coordinates
+        centroids (np.ndarray): Starting centroids
+        rng (np.random.Generator): Random generator
+
+    Returns:
+        np.ndarray: Unit-length centroids
+    """
+    seen = np.zeros(len(centroids), dtype=np.float64)
+
+    for _ in range(EPOCHS):
+        for batch_number in rng.permutation(len(batches)):
+            dense = _densify(batches[batch_number], rows, columns, values)
+            labels = np.argmax(dense @ centroids.T, axis=1)
+
+            # Each centroid moves towards its batch mean with a decaying step
+            for topic in np.unique(labels):
+                members = dense[labels == topic]
+                seen[topic] += len(members)
+                step = len(members) / seen[topic]
+                centroids[topic] = (1 - step) * centroids[topic] + step * members.mean(axis=0)
+
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids = centroids / np.where(norms > 0, norms, 1)
+
+    return centroids
+
+def _assign(batches, rows, columns, values, centroids):
+    """
+    Assign every message to its nearest centroid
+
+    Args:
+        batches (list): Batch bounds
+        rows, columns, values (np.ndarray): Sparse coordinates
+        centroids (np.ndarray): Unit-length centroids
+
+    Returns:
+        tuple: (topic of each row, cosine similarity to that topic)
+    """
+    labels = []
+    similarities = []
+    for batch in batches:
+        scores = _densify(batch, rows, columns, values) @ centroids.T
+        batch_labels = np.argmax(scores, axis=1)
+        labels.append(batch_labels)
+        similarities.append(scores[np.arange(len(scores)), batch_labels])
+    return np.concatenate(labels), np.concatenate(similarities)
+
+def _carry_forward(labels):
+    """
+    Fill unlabelled entries with the label before them
+
+    Entries before the first label take the first label.
+
+    Args:
+        labels (np.ndarray): Labels with -1 for unlabelled entries
+
+    Returns:
+        np.ndarray: Filled labels
+    """
+    positions = np.where(labels >= 0, np.arange(len(labels)), 0)
+    np.maximum.accumulate(positions, out=positions)
+    filled = labels[positions]
+    first = np.flatnonzero(labels >= 0)
+    if len(first):
+        filled[:first[0]] = labels[first[0]]
+    return filled
+
+def format_topics(topics):
+    """
+    Format topics as readable text
+
+    Args:
+        topics (list): Topics from group_topics
+
+    Returns:
+        str: Formatted topic list
+    """
+    sections = []
+    for number, topic in enumerate(topics, 1):
+        period = topic["first_date"] if topic["first_date"] == topic["last_date"] else f"{topic['first_date']} - {topic['last_date']}"
+        lines = [
+            f"Topic {number}: {', '.join(topic['keywords']) or 'general'}",
+            f"{topic['message_count']} messages, {period}, mostly {', '.join(topic['senders'])}"
+        ]
+        lines.extend(f"- {highlight}" for highlight in topic["highlights"])
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
@@ -0,0 +1,439 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import struct
+import threading
+
+from config.settings import DEFAULT_SETTINGS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    source TEXT,
+    first_entry INTEGER NOT NULL,
+    entry_count INTEGER NOT NULL,
+    indexed_at INTEGER NOT NULL,
+    content_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS entry_ranges (
+    document_id INTEGER NOT NULL,
+    first_entry INTEGER NOT NULL,
+    entry_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entry_ranges_document ON entry_ranges (document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+    content,
+    sender UNINDEXED,
+    document_id UNINDEXED,
+    timestamp UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Query syntax that is passed to FTS5 as written
+FTS_SYNTAX = re.compile(r'["*]|\b(AND|OR|NOT|NEAR)\b')
+
+# Words dropped from plain queries, they match most messages and only slow the ranking down
+STOPWORDS = set((
+    "a about an and are as at be but by can could did do does for from had has have he her him his how i if in is it its "
+    "me my no not of on or our say said she so that the their them they this to us was we were what when "
+    "where which who why will with would you your"
+).split())
+
+class SearchIndex:
+    """
+    Persistent full-text index over processed chats and transcripts
+
+    Backed by an SQLite FTS5 table with one row per chat message or
+    transcript paragraph, each pointing to its document, sender, and time.
+    A document's entries are stored in runs of consecutive rowids, one run
+    per import, so a grown chat only adds a run for its new messages.
+    """
+    def __init__(self, db_path):
+        """
+        Open or create the index
+
+        Args:
+            db_path (str): Path to the SQLite database
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._migrate()
+
+    def close(self):
+        """
+        Close the database connection
+        """
+        with self._lock:
+            self._connection.close()
+
+    def index_chat(self, chat_store, doc_key, title, source=None):
+        """
+        Index the messages of a chat, replacing or extending a previous version of it
+
+        If the messages indexed last time are still the first messages of the
+        chat, only the messages after them are added, and an unchanged chat
+        is skipped. Otherwise the chat is indexed again from scratch.
+
+        Args:
+            chat_store (MessageStore): Structured chat data
+            doc_key (str): Stable key of the chat
+            title (str): Title shown in search results
+            source (str, optional): File the chat came from
+        """
+        with self._lock:
+            existing = self._connection.execute(
+                "SELECT id, entry_count, content_hash FROM documents WHERE doc_key = ?", (doc_key,)
+            ).fetchone()
+
+        start = 0
+        hasher = None
+        if existing and existing[2] and existing[1] <= len(chat_store):
+            hasher = chat_content_hasher(chat_store, existing[1])
+            if hasher.hexdigest() == existing[2]:
+                start = existing[1]
+        if not start:
+            hasher = chat_content_hasher(chat_store, 0)
+        update_chat_hasher(hasher, chat_store, start, len(chat_store))
+
+        rows = (
+            (chat_store.content(index), chat_store.sender(index), chat_store.timestamps[index])
+            for index in range(start, len(chat_store))
+        )
+        if start:
+            self._append_entries(existing[0], title, rows, hasher.hexdigest())
+        else:
+            self._replace_document(doc_key, "chat", title, source, rows, hasher.hexdigest())
+
+    def index_transcription(self, text, doc_key, title, source=None, timestamp=None):
+        """
+        Index a transcript paragraph by paragraph, replacing a previous version of it
+
+        Args:
+            text (str): Transcript text
+            doc_key (str): Stable key of the recording
+            title (str): Title shown in search results
+            source (str, optional): Audio file the transcript came from
+            timestamp (int, optional): Recording time in epoch seconds
+        """
+        timestamp = timestamp or int(time.time())
+        paragraphs = [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
+        self._replace_document(doc_key, "transcription", title, source, ((paragraph, "", timestamp) for paragraph in paragraphs))
+
+    def search(self, query, limit=50, kind=None):
+        """
+        Find the messages and transcript passages that best match a query
+
+        Plain words are matched individually and ranked by BM25, so a question
+        such as "what did the client say about the deposit" ranks passages
+        with the rare words first. Queries with quotes, *, or AND/OR/NOT/NEAR
+        use FTS5 syntax as written.
+
+        Args:
+            query (str): Search query
+            limit (int): Maximum number of hits
+            kind (str, optional): 'chat' or 'transcription' to search only one kind
+
+        Returns:
+            list: Hits with title, kind, source, sender, timestamp, and snippet
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT documents.title, documents.kind, documents.source, entries.sender, entries.timestamp, "
+            "snippet(entries, 0, '[', ']', '...', 16) "
+            "FROM entries JOIN documents ON documents.id = entries.document_id "
+            "WHERE entries MATCH ?"
+        )
+        parameters = [match]
+        if kind:
+            sql += " AND documents.kind = ?"
+            parameters.append(kind)
+        sql += " ORDER BY rank LIMIT ?"
+        parameters.append(limit)
+
+        with self._lock:
+            try:
+                rows = self._connection.execute(sql, parameters).fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"Error searching index: {str(e)}")
+                return []
+
+        return [
+            {"title": title, "kind": kind, "source": source, "sender": sender, "timestamp": timestamp, "snippet": snippet}
+            for title, kind, source, sender, timestamp, snippet in rows
+        ]
+
+    def get_stats(self):
+        """
+        Get the size of the index
+
+        Returns:
+            dict: Number of indexed documents and entries
+        """
+        with self._lock:
+            documents, entries = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(entry_count), 0) FROM documents"
+            ).fetchone()
+        return {"documents": documents, "entries": entries}
+
+    def _migrate(self):
+        """
+        Bring an index created by an older version up to the current schema
+
+        Older indexes kept each document in a single run of rowids given on
+        the documents row, and had no content hashes.
+        """
+        with self._lock, self._connection:
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(documents)")]
+            if "content_hash" in columns:
+                return
+            self._connection.execute("ALTER TABLE documents ADD COLUMN content_hash TEXT")
+            self._connection.execute(
+                "INSERT INTO entry_ranges (document_id, first_entry, entry_count) "
+                "SELECT id, first_entry, entry_count FROM documents"
+            )
+
+    def _replace_document(self, doc_key, kind, title, source, rows, content_hash=None):
+        """
+        Replace the entries of a document in one transaction
+
+        Args:
+            doc_key (str): Stable document key
+            kind (str): 'chat' or 'transcription'
+            title (str): Title shown in search results
+            source (str): Origin of the document
+            rows (iterable): (content, sender, timestamp) tuples
+            content_hash (str, optional): Hash of the indexed content, for later appends
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.cursor()
+            existing = cursor.execute("SELECT id FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()
+            if existing:
+                # Entries of a document have consecutive rowids within each run, so they are deleted by range
+                document_id = existing[0]
+                for first_entry, entry_count in cursor.execute(
+                    "SELECT first_entry, entry_count FROM entry_ranges WHERE document_id = ?", (document_id,)
+                ).fetchall():
+                    cursor.execute("DELETE FROM entries WHERE rowid BETWEEN ? AND ?", (first_entry, first_entry + entry_count - 1))
+                cursor.execute("DELETE FROM entry_ranges WHERE document_id = ?", (document_id,))
+                cursor.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+
+            first_entry = cursor.execute("SELECT COALESCE(MAX(rowid), 0) + 1 FROM entries").fetchone()[0]
+            cursor.execute(
+                "INSERT INTO documents (doc_key, kind, title, source, first_entry, entry_count, indexed_at, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                (doc_key, kind, title, source, first_entry, int(time.time()), content_hash)
+            )
+            document_id = cursor.lastrowid
+
+            entry_count = self._insert_entries(cursor, document_id, rows)
+            cursor.execute("UPDATE documents SET entry_count = ? WHERE id = ?", (entry_count, document_id))
+
+    def _append_entries(self, document_id, title, rows, content_hash):
+        """
+        Add entries to the end of a document in one transaction
+
+        Args:
+            document_id (int): Document id
+            title (str): Title shown in search results
+            rows (iterable): (content, sender, timestamp) tuples
+            content_hash (str): Hash of the document's content after the append
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.cursor()
+            entry_count = self._insert_entries(cursor, document_id, rows)
+            cursor.execute(
+                "UPDATE documents SET entry_count = entry_count + ?, title = ?, indexed_at = ?, content_hash = ? WHERE id = ?",
+                (entry_count, title, int(time.time()), content_hash, document_id)
+            )
+
+    def _insert_entries(self, cursor, document_id, rows):
+        """
+        Insert entries as one run of consecutive rowids after every existing entry
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the open transaction
+            document_id (int): Document id
+            rows (iterable): (content, sender, timestamp) tuples
+
+        Returns:
+            int: Number of entries inserted
+        """
+        first_entry = cursor.execute("SELECT COALESCE(MAX(rowid), 0) + 1 FROM entries").fetchone()[0]
+        entry_count = 0
+        def numbered_rows():
+            nonlocal entry_count
+            for content, sender, timestamp in rows:
+                yield first_entry + entry_count, content, sender, document_id, timestamp
+                entry_count += 1
+
+        cursor.executemany(
+            "INSERT INTO entries (rowid, content, sender, document_id, timestamp) VALUES (?, ?, ?, ?, ?)",
+            numbered_rows()
+        )
+        if entry_count:
+            cursor.execute(
+                "INSERT INTO entry_ranges (document_id, first_entry, entry_count) VALUES (?, ?, ?)",
+                (document_id, first_entry, entry_count)
+            )
+        return entry_count
+
+def chat_content_hasher(chat_store, count):
+    """
+    Hash the first messages of a chat
+
+    The hash covers the time, sender, and text of each message, message by
+    message, so it does not depend on how the text is laid out in the store
+    and a hash of more messages can be continued from it.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        count (int): Number of leading messages to hash
+
+    Returns:
+        hashlib.sha256: Hasher, to be extended with update_chat_hasher
+    """
+    return update_chat_hasher(hashlib.sha256(), chat_store, 0, count)
+
+def update_chat_hasher(hasher, chat_store, start, end):
+    """
+    Add a run of messages to a chat hash
+
+    Args:
+        hasher (hashlib.sha256): Hasher holding the messages before start
+        chat_store (MessageStore): Structured chat data
+        start (int): First message to add
+        end (int): Message after the last one to add
+
+    Returns:
+        hashlib.sha256: The same hasher
+    """
+    for index in range(start, end):
+        text_start, text_end = chat_store.text_starts[index], chat_store.text_ends[index]
+        # The length keeps the boundaries between messages in the hash
+        hasher.update(struct.pack("<qQ", chat_store.timestamps[index], text_end - text_start))
+        hasher.update(chat_store.sender(index).encode("utf-8") + b"\0")
+        hasher.update(chat_store.text[text_start:text_end])
+    return hasher
+
+def build_match_query(query):
+    """
+    Turn a search box query into an FTS5 match expression
+
+    Args:
+        query (str): Search query
+
+    Returns:
+        str: Match expression, empty if the query has no words
+    """
+    if FTS_SYNTAX.search(query):
+        return query.strip()
+    words = re.findall(r'\w+', query)
+    words = [word for word in words if word.lower() not in STOPWORDS] or words
+    return " OR ".join(f'"{word}"' for word in words)
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+def get_search_index():
+    """
+    Get the shared search index, or None if search is disabled
+
+    Returns:
+        SearchIndex: Shared index instance
+    """
+    global _search_index
+    settings = DEFAULT_SETTINGS["search"]
+    if not settings["enabled"]:
+        return None
+
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = SearchIndex(settings["path"])
+    return _search_index
+
+def search(query, limit=50, kind=None):
+    """
+    Search all indexed chats and transcripts
+
+    Args:
+        query (str): Search query
+        limit (int): Maximum number of hits
+        kind (str, optional): 'chat' or 'transcription' to search only one kind
+
+    Returns:
+        list: Hits with title, kind, source, sender, timestamp, and snippet
+    """
+    index = get_search_index()
+    return index.search(query, limit, kind) if index else []
+
+def index_parsed_chat(chat_store, input_data, options=None):
+    """
+    Add a chat processed by parse_chat to the search index
+
+    File exports are keyed by their absolute path, so a re-import of the
+    same file replaces the earlier version. Pasted text and screenshots are
+    keyed by their content.
+
+    Args:
+        chat_store (MessageStore): Structured chat data
+        input_data (dict): Input data with type and content
+        options (dict, optional): Processing options, 'title' overrides the result title
+    """
+    index = get_search_index()
+    if index is None or not len(chat_store):
+        return
+
+    options = options or {}
+    try:
+        if input_data["type"] == "file":
+            # Keyed by the full path, exports of different chats often share a file name such as _chat.txt
+            source = os.path.abspath(input_data["content"])
+            doc_key = f"chat:{source}"
+            title = os.path.basename(source)
+            if title == "_chat.txt":
+                # iOS exports all share this name, the folder names the chat
+                title = os.path.basename(os.path.dirname(source)) or title
+        else:
+            source = None
+            digest = hashlib.sha256(chat_store.text).hexdigest()
+            doc_key = f"chat:{input_data['type']}:{digest}"
+            title = f"{'Pasted' if input_data['type'] == 'text' else 'Screenshot'} chat from {chat_store.date(0)}"
+
+        index.index_chat(chat_store, doc_key, options.get("title") or title, source)
+    except Exception as e:
+        print(f"Error indexing chat: {str(e)}")
+
+def index_transcribed_audio(text, file_path, content_hash=None, source=None):
+    """
+    Add a finished transcription to the search index
+
+    Args:
+        text (str): Transcript text
+        file_path (str): Path to the audio file
+        content_hash (str, optional): Hash of the audio, so identical recordings share one entry
+        source (str, optional): Location shown in search results, defaults to the file path,
+            e.g. the archive path and member name for a voice note extracted from a zip
+    """
+    index = get_search_index()
+    if index is None or not text:
+        return
+
+    try:
+        source = source or os.path.abspath(file_path)
+        doc_key = f"transcription:{content_hash or source}"
+        index.index_transcription(text, doc_key, os.path.basename(source), source, int(os.path.getmtime(file_path)))
+    except Exception as e:
+        print(f"Error indexing transcription: {str(e)}")
@@ -6,6 +6,7 @@ import threading
 
 # Import chat processing module
 from app.chat.parser import parse_chat
+from app.chat.topics import format_topics
 
 class ChatPanel(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -257,7 +258,9 @@ class ChatPanel(ctk.CTkFrame):
     
     def browse_chat_file(self):
         filetypes = [
+            ("WhatsApp Exports", "*.txt *.zip"),
             ("Text Files", "*.txt"),
+            ("ZIP Files", "*.zip"),
             ("All Files", "*.*")
         ]
         file_path = filedialog.askopenfilename(filetypes=filetypes)
@@ -304,7 +307,8 @@ class ChatPanel(ctk.CTkFrame):
             "summary": self.summary_var.get(),
             "action_points": self.action_points_var.get(),
             "topic_grouping": self.topic_grouping_var.get(),
-            "template": self.template_var.get()
+            "template": self.template_var.get(),
+            "on_preview": self.show_summary_preview
         }
         
         # Update UI
@@ -324,8 +328,8 @@ class ChatPanel(ctk.CTkFrame):
             # Call the chat parsing function from the chat module
             result = parse_chat(input_data, options)
             
-            # Update UI with results
-            self.update_results(result)
+            # Update UI with results, queued after any preview so the preview never overwrites them
+            self.after(0, self.update_results, result)
         except Exception as e:
             # Handle errors
             self.status_var.set(f"Error: {str(e)}")
@@ -333,6 +337,15 @@ class ChatPanel(ctk.CTkFrame):
             # Re-enable the process button
             self.process_button.configure(state="normal")
     
+    def show_summary_preview(self, preview):
+        # Called from the processing thread, so the preview is drawn on the UI thread
+        self.after(0, self.draw_summary_preview, preview)
+    
+    def draw_summary_preview(self, preview):
+        # Local summary shown while the full summary is generated
+        self.summary_textbox.delete("0.0", "end")
+        self.summary_textbox.insert("0.0", preview)
+    
     def clear_results(self):
         # Clear all result textboxes
         self.summary_textbox.delete("0.0", "end")
@@ -345,6 +358,12 @@ class ChatPanel(ctk.CTkFrame):
             self.summary_textbox.delete("0.0", "end")
             self.summary_textbox.insert("0.0", result["summary"])
         
+        if result.get("session_sections"):
+            self.summary_textbox.insert("end", "\n\nSessions\n\n" + result["session_sections"])
+        
+        if result.get("topics"):
+            self.summary_textbox.insert("end", "\n\nTopics\n\n" + format_topics(result["topics"]))
+        
         if "action_points" in result:
             self.action_points_textbox.delete("0.0", "end")
             self.action_points_textbox.insert("0.0", result["action_points"])
@@ -3,6 +3,8 @@ import customtkinter as ctk
 from PIL import Image
 import datetime
 
+from app.search.index import search
+
 class Dashboard(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
@@ -98,6 +100,31 @@ class Dashboard(ctk.CTkFrame):
         self.activity_list_frame.grid(row=1, column=0, padx=20, pady=(10, 20), sticky="nsew")
         self.activity_list_frame.grid_columnconfigure(0, weight=1)
         
+        # Search across processed chats and transcripts
+        self.search_frame = ctk.CTkFrame(self)
+        self.search_frame.grid(row=3, column=0, padx=20, pady=(0, 20), sticky="nsew")
+        self.search_frame.grid_columnconfigure(0, weight=1)
+        
+        self.search_var = ctk.StringVar()
+        self.search_entry = ctk.CTkEntry(
+            self.search_frame,
+            textvariable=self.search_var,
+            placeholder_text="Search chats and transcripts, e.g. what did the client say about the deposit"
+        )
+        self.search_entry.grid(row=0, column=0, padx=(20, 10), pady=10, sticky="ew")
+        self.search_entry.bind("<Return>", lambda event: self.run_search())
+        
+        self.search_button = ctk.CTkButton(
+            self.search_frame,
+            text="Search",
+            width=100,
+            command=self.run_search
+        )
+        self.search_button.grid(row=0, column=1, padx=(0, 20), pady=10)
+        
+        self.search_results_textbox = ctk.CTkTextbox(self.search_frame, height=200)
+        self.search_results_textbox.grid(row=1, column=0, columnspan=2, padx=20, pady=(0, 20), sticky="nsew")
+        
         # Placeholder for activity items
         self.create_activity_items()
     
@@ -176,6 +203,24 @@ class Dashboard(ctk.CTkFrame):
         # This would open the activity in the appropriate panel
         print(f"Viewing activity: {activity['name']}")
     
+    def run_search(self):
+        query = self.search_var.get().strip()
+        self.search_results_textbox.delete("0.0", "end")
+        if not query:
+            return
+        
+        hits = search(query)
+        if not hits:
+            self.search_results_textbox.insert("0.0", f"No results for \"{query}\"")
+            return
+        
+        lines = []
+        for hit in hits:
+            when = datetime.datetime.utcfromtimestamp(hit["timestamp"]).strftime("%Y-%m-%d %H:%M") if hit["timestamp"] else ""
+            who = f" {hit['sender']}" if hit["sender"] else ""
+            lines.append(f"{self.get_icon_for_type(hit['kind'])} {hit['title']}  {when}{who}\n    {hit['snippet']}\n")
+        self.search_results_textbox.insert("0.0", "\n".join(lines))
+    
     def update_stats(self, transcription_count=0, chat_count=0, document_count=0):
         # Update the stats counters
         self.transcription_count.configure(text=str(transcription_count))
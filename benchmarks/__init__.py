@@ -0,0 +1 @@
+# Benchmarks for chat processing performance
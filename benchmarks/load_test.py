@@ -0,0 +1,115 @@
+"""
+Load-test the chat and transcription pipelines end to end against the local stand-in server
+
+Starts benchmarks.openai_server in process, points the app at it, disables
+the response cache, and runs concurrent parse_chat and transcribe_audio jobs.
+
+Usage:
+    python -m benchmarks.load_test [jobs] [concurrency] [chat_kb] [latency] [error_rate] [rate_limit_rate]
+"""
+import os
+import sys
+import time
+import wave
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import API_SETTINGS, DEFAULT_SETTINGS
+from benchmarks.openai_server import LocalOpenAIServer
+from benchmarks.synthetic_chat import write_synthetic_chat
+
+def run(jobs=20, concurrency=4, chat_kb=256, latency="lognormal:0.5:0.5", error_rate=0.02, rate_limit_rate=0.05):
+    """
+    Run chat and voice note jobs concurrently and report throughput and latency
+
+    Args:
+        jobs (int): Number of jobs of each kind
+        concurrency (int): Jobs running at once
+        chat_kb (int): Size of each synthetic chat export in KB
+        latency (str): Server latency spec
+        error_rate (float): Fraction of requests failing with a server error
+        rate_limit_rate (float): Fraction of requests failing with a rate limit
+    """
+    with LocalOpenAIServer(latency=latency, error_rate=error_rate, rate_limit_rate=rate_limit_rate,
+                           retry_after=0.5, seed=0) as server:
+        # Configure before the shared service and cache are created
+        API_SETTINGS["openai"]["api_base"] = server.api_base
+        API_SETTINGS["openai"]["api_key"] = API_SETTINGS["openai"]["api_key"] or "local"
+        DEFAULT_SETTINGS["cache"]["enabled"] = False
+
+        from app.api.client import get_openai_service
+        from app.audio.transcription import transcribe_audio
+        from app.chat.parser import parse_chat
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chat_path = os.path.join(temp_dir, "chat.txt")
+            write_synthetic_chat(chat_path, chat_kb * 1024)
+            with open(chat_path, "r", encoding="utf-8") as f:
+                chat_text = f.read()
+
+            audio_path = os.path.join(temp_dir, "voice_note.wav")
+            _write_silence(audio_path, seconds=5)
+
+            options = {"summary": True, "action_points": True, "template": "Meeting Summary"}
+            tasks = [("chat", lambda: parse_chat({"type": "text", "content": chat_text}, options))] * jobs
+            tasks += [("audio", lambda: transcribe_audio(audio_path, "cleaned", True))] * jobs
+
+            timings = {"chat": [], "audio": []}
+            failures = {"chat": 0, "audio": 0}
+
+            def timed(task):
+                kind, job = task
+                start = time.perf_counter()
+                try:
+                    job()
+                    timings[kind].append(time.perf_counter() - start)
+                except Exception as e:
+                    failures[kind] += 1
+                    print(f"Error in {kind} job: {str(e)}")
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(timed, tasks))
+            elapsed = time.perf_counter() - start
+
+        print(f"{2 * jobs} jobs in {elapsed:.1f}s ({2 * jobs / elapsed:.2f} jobs/s), concurrency {concurrency}")
+        for kind, values in timings.items():
+            if values:
+                values.sort()
+                print(f"{kind:5s}  p50 {_percentile(values, 50):6.2f}s  p95 {_percentile(values, 95):6.2f}s  "
+                      f"max {values[-1]:6.2f}s  failed {failures[kind]}")
+        print(f"client {get_openai_service().stats}")
+        print(f"server {server.stats}")
+
+def _write_silence(file_path, seconds):
+    """
+    Write a silent mono WAV file
+
+    Args:
+        file_path (str): Path to write to
+        seconds (int): Duration in seconds
+    """
+    with wave.open(file_path, "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(16000)
+        audio.writeframes(b"\x00\x00" * 16000 * seconds)
+
+def _percentile(sorted_values, percent):
+    """
+    Get a percentile of sorted values by the nearest-rank method
+
+    Args:
+        sorted_values (list): Values in ascending order
+        percent (float): Percentile from 0 to 100
+
+    Returns:
+        float: Percentile value
+    """
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    converters = [int, int, int, str, float, float]
+    run(*(convert(argument) for convert, argument in zip(converters, arguments)))
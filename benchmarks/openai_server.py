@@ -0,0 +1,334 @@
+"""
+Local stand-in for the OpenAI endpoints the app uses, for offline benchmarks and load tests
+
+Serves chat completions and audio transcriptions with configurable latency,
+injected server errors and rate limits, and canned or echoed responses.
+Point the app at it with OPENAI_API_BASE=http://127.0.0.1:<port>/v1.
+
+Usage:
+    python -m benchmarks.openai_server [--port 8099] [--latency lognormal:0.8:0.5]
+        [--token-latency 0.0] [--error-rate 0.0] [--rate-limit-rate 0.0]
+        [--retry-after 1] [--mode canned|echo] [--seed 0]
+
+Latency specs are fixed:<seconds>, uniform:<low>:<high>, normal:<mean>:<stddev>,
+or lognormal:<median>:<sigma>.
+"""
+import re
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Reply used in canned mode, valid for both single and combined summary prompts
+CANNED_REPLY = (
+    "=== SUMMARY ===\n"
+    "The team agreed on the project timeline and budget. The draft is ready for review.\n\n"
+    "=== ACTION POINTS ===\n"
+    "- Alice: send the invoice by Friday\n"
+    "- Bob: call the client about the deposit"
+)
+CANNED_TRANSCRIPT = "Hi, it's me. Please send the invoice by Friday and call me when you can."
+
+# Longest echoed reply, so echo mode does not inflate reduce rounds
+MAX_ECHO_CHARS = 2000
+
+class LocalOpenAIServer:
+    """
+    OpenAI-compatible HTTP server running on a background thread
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency="fixed:0", token_latency=0.0,
+                 error_rate=0.0, rate_limit_rate=0.0, retry_after=1, mode="canned", seed=None):
+        """
+        Initialize the server
+
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on, 0 for any free port
+            latency (str): Latency spec for every response
+            token_latency (float): Extra seconds per generated token of a completion
+            error_rate (float): Fraction of requests answered with a 500 error
+            rate_limit_rate (float): Fraction of requests answered with a 429 error
+            retry_after (float): Retry-After seconds sent with 429 errors
+            mode (str): 'canned' for fixed replies, 'echo' to return the input
+            seed (int, optional): Random seed for latencies and injected errors
+        """
+        self.sample_latency = parse_latency(latency)
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.mode = mode
+        self.stats = {"requests": 0, "completions": 0, "transcriptions": 0, "errors": 0, "rate_limited": 0}
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def api_base(self):
+        """
+        Base URL to configure as the OpenAI api_base
+        """
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """
+        Start serving on a background thread
+
+        Returns:
+            LocalOpenAIServer: This server
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="openai-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Serve on the calling thread until interrupted
+        """
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        """
+        Stop serving and close the socket
+        """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def draw(self):
+        """
+        Draw the outcome and latency of one request
+
+        Returns:
+            tuple: (outcome, latency in seconds), outcome is 'ok', 'error', or 'rate_limited'
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            roll = self._random.random()
+            latency = self.sample_latency(self._random)
+
+            if roll < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return "rate_limited", latency
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return "error", latency
+            return "ok", latency
+
+    def count(self, key):
+        """
+        Increment a request counter
+
+        Args:
+            key (str): Counter name
+        """
+        with self._lock:
+            self.stats[key] += 1
+
+def parse_latency(spec):
+    """
+    Parse a latency spec into a sampling function
+
+    Args:
+        spec (str): Latency spec, e.g. 'uniform:0.2:1.5'
+
+    Returns:
+        callable: Function taking a random.Random and returning seconds
+    """
+    kind, *values = spec.split(":")
+    values = [float(value) for value in values]
+
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+def _make_handler(server):
+    """
+    Build a request handler class bound to a server
+
+    Args:
+        server (LocalOpenAIServer): Server holding the configuration and counters
+
+    Returns:
+        type: BaseHTTPRequestHandler subclass
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                with server._lock:
+                    stats = dict(server.stats)
+                self._send_json(200, stats)
+            else:
+                self._send_error(404, "Not found", "invalid_request_error")
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            path = self.path.rstrip("/")
+
+            if not path.endswith(("/chat/completions", "/audio/transcriptions")):
+                self._send_error(404, "Not found", "invalid_request_error")
+                return
+
+            outcome, latency = server.draw()
+            if outcome == "rate_limited":
+                time.sleep(min(latency, 0.05))
+                self._send_error(429, "Rate limit reached (injected)", "rate_limit_exceeded",
+                                 {"Retry-After": str(server.retry_after)})
+                return
+            if outcome == "error":
+                time.sleep(latency)
+                self._send_error(500, "Internal server error (injected)", "server_error")
+                return
+
+            if path.endswith("/chat/completions"):
+                self._complete(json.loads(body or b"{}"), latency)
+            else:
+                self._transcribe(body, latency)
+
+        def _complete(self, request, latency):
+            server.count("completions")
+            messages = request.get("messages", [])
+            prompt = "".join(message.get("content", "") for message in messages)
+
+            if server.mode == "echo":
+                reply = messages[-1].get("content", "")[:MAX_ECHO_CHARS] if messages else ""
+            else:
+                reply = CANNED_REPLY
+
+            prompt_tokens = len(prompt) // 4 + 1
+            completion_tokens = len(reply) // 4 + 1
+            time.sleep(latency + completion_tokens * server.token_latency)
+
+            self._send_json(200, {
+                "id": f"chatcmpl-local-{server.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+
+        def _transcribe(self, body, latency):
+            server.count("transcriptions")
+            fields, audio_size = _parse_multipart(self.headers.get("Content-Type", ""), body)
+            text = f"Transcript of {audio_size} bytes of audio." if server.mode == "echo" else CANNED_TRANSCRIPT
+            time.sleep(latency)
+
+            response_format = fields.get("response_format", "json")
+            if response_format == "text":
+                self._send(200, (text + "\n").encode("utf-8"), "text/plain; charset=utf-8")
+            elif response_format == "verbose_json":
+                self._send_json(200, {
+                    "task": "transcribe",
+                    "language": "english",
+                    "duration": 5.0,
+                    "text": text,
+                    "segments": [{"id": 0, "start": 0.0, "end": 5.0, "text": text}]
+                })
+            else:
+                self._send_json(200, {"text": text})
+
+        def _send_error(self, status, message, error_type, headers=None):
+            self._send_json(status, {"error": {"message": message, "type": error_type, "code": None}}, headers)
+
+        def _send_json(self, status, data, headers=None):
+            self._send(status, json.dumps(data).encode("utf-8"), "application/json", headers)
+
+        def _send(self, status, payload, content_type, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+def _parse_multipart(content_type, body):
+    """
+    Read the form fields and file size from a multipart request body
+
+    Args:
+        content_type (str): Content-Type header with the boundary
+        body (bytes): Request body
+
+    Returns:
+        tuple: (dict of text fields, size of the uploaded file in bytes)
+    """
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        return {}, 0
+
+    fields = {}
+    file_size = 0
+    for part in body.split(b"--" + match.group(1).encode("latin-1")):
+        head, _, value = part.partition(b"\r\n\r\n")
+        name = re.search(rb'name="([^"]*)"', head)
+        if not name:
+            continue
+        value = value[:-2] if value.endswith(b"\r\n") else value
+        if b"filename=" in head:
+            file_size = len(value)
+        else:
+            fields[name.group(1).decode("utf-8")] = value.decode("utf-8", "replace")
+
+    return fields, file_size
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", default="lognormal:0.8:0.5")
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1)
+    parser.add_argument("--mode", choices=["canned", "echo"], default="canned")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    local_server = LocalOpenAIServer(
+        args.host, args.port, args.latency, args.token_latency, args.error_rate,
+        args.rate_limit_rate, args.retry_after, args.mode, args.seed
+    )
+    print(f"Serving on {local_server.api_base}, set OPENAI_API_BASE to this address")
+    local_server.serve_forever()
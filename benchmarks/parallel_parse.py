@@ -0,0 +1,46 @@
+"""
+Benchmark parallel chat parsing against the serial parser
+
+Usage:
+    python -m benchmarks.parallel_parse [size_mb] [max_workers]
+"""
+import os
+import sys
+import time
+import tempfile
+
+from app.chat.parallel import iter_whatsapp_messages_parallel
+from app.chat.parser import iter_chat_file_lines, iter_whatsapp_messages
+from benchmarks.synthetic_chat import write_synthetic_chat
+
+def run(size_mb=200, max_workers=None):
+    """
+    Time serial and parallel parsing for increasing worker counts
+
+    Args:
+        size_mb (int): Size of the synthetic export in MB
+        max_workers (int, optional): Largest worker count, defaults to the CPU count
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "chat.txt")
+        message_count = write_synthetic_chat(file_path, size_mb * 1024 * 1024)
+        print(f"{size_mb} MB export, {message_count} messages")
+
+        start = time.perf_counter()
+        serial = list(iter_whatsapp_messages(iter_chat_file_lines(file_path)))
+        serial_time = time.perf_counter() - start
+        print(f"serial      {serial_time:8.2f}s")
+
+        workers = 2
+        while workers <= max_workers:
+            start = time.perf_counter()
+            parallel = list(iter_whatsapp_messages_parallel(file_path, workers, min_bytes=0))
+            elapsed = time.perf_counter() - start
+            status = "identical" if parallel == serial else "MISMATCH"
+            print(f"{workers:2d} workers  {elapsed:8.2f}s  speedup {serial_time / elapsed:5.2f}x  {status}")
+            workers *= 2
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,49 @@
+"""
+Compare the prompt tokens of the plain and compact chat formats
+
+Runs on the given WhatsApp exports (.txt or .zip), or on a synthetic export
+if none are given.
+
+Usage:
+    python -m benchmarks.prompt_tokens [export ...]
+"""
+import os
+import sys
+import time
+import tempfile
+
+from app.api.budget import count_tokens
+from app.chat.parser import parse_chat_input
+from app.chat.prompt_format import format_prompt_chat
+from benchmarks.synthetic_chat import write_synthetic_chat
+
+def run(paths=None):
+    """
+    Print the tokens of each export in both formats and the saving
+
+    Args:
+        paths (list, optional): Export files, defaults to a 1 MB synthetic export
+    """
+    if not paths:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "synthetic.txt")
+            write_synthetic_chat(file_path, 1024 * 1024)
+            run([file_path])
+        return
+
+    print(f"{'export':30} {'messages':>9} {'plain':>10} {'compact':>10} {'saved':>7} {'format s':>9}")
+    for path in paths:
+        chat_store = parse_chat_input({"type": "file", "content": path})
+        plain_tokens = count_tokens(format_prompt_chat(chat_store, compact=False))
+
+        start = time.perf_counter()
+        compact_text = format_prompt_chat(chat_store, compact=True)
+        elapsed = time.perf_counter() - start
+        compact_tokens = count_tokens(compact_text)
+
+        saved = 1 - compact_tokens / plain_tokens if plain_tokens else 0
+        print(f"{os.path.basename(path)[:30]:30} {len(chat_store):9d} {plain_tokens:10d} {compact_tokens:10d} "
+              f"{saved:6.1%} {elapsed:9.2f}")
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
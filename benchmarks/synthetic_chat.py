@@ -0,0 +1,39 @@
+import random
+
+SENDERS = ["Alice", "Bob", "+44 7700 900123 (Site Manager)", "Dayo", "Emeka"]
+WORDS = ("please send the invoice by friday we will meet at the site tomorrow "
+         "ok thanks noted deposit client budget draft ready call me when you can").split()
+
+def write_synthetic_chat(file_path, target_bytes, seed=0):
+    """
+    Write a synthetic Android-style WhatsApp export for benchmarking
+
+    About one message in eight spans several lines.
+
+    Args:
+        file_path (str): Path to write the export to
+        target_bytes (int): Approximate file size in bytes
+        seed (int): Random seed
+
+    Returns:
+        int: Number of messages written
+    """
+    rng = random.Random(seed)
+    written = 0
+    count = 0
+    minute = 0
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        while written < target_bytes:
+            minute += rng.randint(0, 90)
+            day, hour, mins = 1 + (minute // 1440) % 28, (minute // 60) % 24, minute % 60
+            month = 1 + (minute // 40320) % 12
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 30)))
+            if rng.random() < 0.125:
+                text += "\n" + "\n".join(" ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(rng.randint(1, 5)))
+            line = f"{day:02d}/{month:02d}/24, {hour:02d}:{mins:02d} - {rng.choice(SENDERS)}: {text}\n"
+            file.write(line)
+            written += len(line.encode("utf-8"))
+            count += 1
+
+    return count
@@ -21,7 +21,30 @@ DEFAULT_SETTINGS = {
         "summary": True,
         "action_points": True,
         "topic_grouping": True,
-        "default_template": "Meeting Summary"
+        "max_topics": 8,  # Most topics found by topic grouping
+        "default_template": "Meeting Summary",
+        "parallel_workers": 0,  # 0 = one per CPU core, 1 = serial
+        "incremental_import": True,  # Re-imports of a chat file only parse new messages
+        "summary_chunk_tokens": 0,  # Token budget per chunk when summarizing long chats, 0 = fill the model window
+        "summary_workers": 8,  # Concurrent requests when summarizing long chats
+        "session_summaries": False,  # Also summarize each conversation session as its own document section
+        "rolling_summary": True,  # Summarize file exports too long for one request from stored per-day partials, only new or changed days are sent
+        "rolling_summary_unit": "day",  # Unit of stored partial summaries, day or session
+        "session_min_gap_minutes": 30,  # Shortest silence that can end a session
+        "session_max_gap_hours": 8,  # Longest silence needed to end a session in slow chats
+        "combined_extraction": True,  # Get summary and action points from one request
+        "compact_prompts": True,  # Send chats to the model with sender aliases, time gaps, and merged messages
+        "action_prefilter": True,  # Send only likely action item messages to separate action point extraction
+        "action_min_score": 3,  # Lowest pre-filter score of an action item candidate
+        "action_context_messages": 1,  # Messages kept before and after each candidate
+        "local_summary_max_tokens": 300,  # Chats up to this size get the local extractive summary, no API call
+        "extractive_fallback": True,  # Use the local extractive summary when the summary request fails
+        "noise_filter": ["encryption", "media_omitted", "deleted", "membership", "missed_call"],  # Content-free messages dropped before processing, [] keeps all
+        "transcribe_voice_notes": False,  # Replace voice note attachments in file exports with transcripts
+        "attachment_workers": 4,  # Concurrent voice note transcriptions
+        "ocr_backend": "tesseract",  # OCR backend for screenshots
+        "ocr_workers": 0,  # Processes recognizing screenshots, 0 = one per CPU core
+        "ocr_max_width": 1280  # Screenshots are scaled down to this width before OCR
     },
     "document": {
         "default_format": "pdf",  # pdf, docx
@@ -33,6 +56,16 @@ DEFAULT_SETTINGS = {
             "logo_path": ""
         }
     },
+    "cache": {
+        "enabled": True,
+        "path": os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cache"),
+        "max_size_mb": 500,
+        "max_age_days": 90
+    },
+    "search": {
+        "enabled": True,  # Index processed chats and transcripts for full-text search
+        "path": os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "search.db")
+    },
     "storage": {
         "local_path": os.path.join(os.path.dirname(os.path.dirname(__file__)), "data"),
         "max_history": 50
@@ -43,8 +76,15 @@ DEFAULT_SETTINGS = {
 API_SETTINGS = {
     "openai": {
         "api_key": os.getenv("OPENAI_API_KEY", ""),
+        "api_base": os.getenv("OPENAI_API_BASE", ""),  # Empty = the OpenAI API, or e.g. a local stand-in server
         "whisper_model": "whisper-1",
-        "gpt_model": "gpt-4"
+        "gpt_model": "gpt-4",
+        "reserved_output_tokens": 1024,  # Context window kept free for the response
+        "max_concurrency": 8,  # Requests in flight at once
+        "request_timeout": 120,  # Seconds per attempt
+        "max_retries": 5,  # Retries on rate limits, server errors, and timeouts
+        "backoff_base": 1.0,  # Seconds, doubled on each retry with random jitter
+        "backoff_max": 60
     }
 }
 
@@ -0,0 +1,76 @@
+from app.chat.checkpoint import parse_chat_file_incremental
+from app.chat.parser import parse_chat_input
+
+def write_lines(path, lines, mode="w"):
+    """
+    Write export lines to a file
+    """
+    with open(path, mode, encoding="utf-8", newline="") as file:
+        file.write("".join(line + "\n" for line in lines))
+
+def export_lines(first, last):
+    """
+    Android export lines of messages first to last - 1
+    """
+    return [f"05/03/2024, {10 + number // 60:02d}:{number % 60:02d} - {'Ann' if number % 3 else 'Bob'}: message {number}"
+            for number in range(first, last)]
+
+def parse_full(path):
+    """
+    Messages of a file parsed from scratch
+    """
+    return list(parse_chat_input({"type": "file", "content": path}))
+
+def test_append_reuses_the_imported_messages(tmp_path):
+    """
+    After an append only the tail is parsed and the result matches a full parse
+    """
+    path = str(tmp_path / "chat.txt")
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    write_lines(path, export_lines(0, 100))
+    chat_store, stats = parse_chat_file_incremental(path, checkpoint_dir=checkpoint_dir)
+    assert stats["reused_messages"] == 0 and len(chat_store) == 100
+
+    # The last message gains a continuation line, then new messages follow
+    write_lines(path, ["and a second line"] + export_lines(100, 120), "a")
+    chat_store, stats = parse_chat_file_incremental(path, checkpoint_dir=checkpoint_dir)
+
+    assert stats["reused_messages"] == 99
+    assert stats["new_messages"] == 21
+    assert list(chat_store) == parse_full(path)
+    assert chat_store.content(99) == "message 99\nand a second line"
+
+def test_changed_head_parses_everything_again(tmp_path):
+    """
+    An edit before the last imported message discards the checkpoint
+    """
+    path = str(tmp_path / "chat.txt")
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    write_lines(path, export_lines(0, 100))
+    parse_chat_file_incremental(path, checkpoint_dir=checkpoint_dir)
+
+    lines = export_lines(0, 110)
+    lines[0] = lines[0].replace("message 0", "redacted")
+    write_lines(path, lines)
+    chat_store, stats = parse_chat_file_incremental(path, checkpoint_dir=checkpoint_dir)
+
+    assert stats["reused_messages"] == 0
+    assert chat_store.content(0) == "redacted"
+    assert list(chat_store) == parse_full(path)
+
+def test_same_length_edit_in_the_middle_is_noticed(tmp_path):
+    """
+    An edit of the same length far from both ends of the file is noticed too
+    """
+    path = str(tmp_path / "chat.txt")
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    write_lines(path, export_lines(0, 3000))
+    parse_chat_file_incremental(path, checkpoint_dir=checkpoint_dir)
+
+    lines = export_lines(0, 3000)
+    lines[2500] = lines[2500].replace("message 2500", "massage 2500")
+    write_lines(path, lines + export_lines(3000, 3010))
+    chat_store, stats = parse_chat_file_incremental(path, checkpoint_dir=checkpoint_dir)
+
+    assert stats["reused_messages"] == 0
+    assert chat_store.content(2500) == "massage 2500"
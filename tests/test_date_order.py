@@ -0,0 +1,52 @@
+from app.chat.formats import fallback_date_order, parse_date
+from app.chat.store import MessageStore
+
+def message(date, content="hi"):
+    """
+    Message dictionary on a date at 10:00
+    """
+    return {"date": date, "time": "10:00", "sender": "Ann", "content": content}
+
+def test_switches_to_month_first_on_the_first_invalid_date():
+    """
+    A US chat read as day-first switches at 1/13/24 and fixes earlier messages
+    """
+    chat_store = MessageStore("dmy")
+    chat_store.extend(message(f"1/{day}/24") for day in range(1, 13))
+    assert chat_store.timestamps[1] == parse_date("1/2/24", "dmy") + 36000
+
+    chat_store.append(message("1/13/24"))
+
+    assert chat_store.date_order == "mdy"
+    assert list(chat_store.timestamps) == [parse_date(f"1/{day}/24", "mdy") + 36000 for day in range(1, 14)]
+
+def test_impossible_date_keeps_the_previous_time():
+    """
+    A date invalid in both orders is not stored as 1970
+    """
+    chat_store = MessageStore("dmy")
+    chat_store.append(message("5/3/24"))
+    chat_store.append(message("13/13/24"))
+
+    assert chat_store.date_order == "dmy"
+    assert chat_store.timestamps[1] == chat_store.timestamps[0]
+
+def test_no_switch_when_an_earlier_date_rules_it_out():
+    """
+    Day-first stays when an earlier date is only valid day-first
+    """
+    chat_store = MessageStore("dmy")
+    chat_store.append(message("20/1/24"))
+    chat_store.append(message("1/13/24"))
+
+    assert chat_store.date_order == "dmy"
+    assert chat_store.timestamps[1] == chat_store.timestamps[0]
+
+def test_days_past_the_end_of_the_month_are_invalid():
+    """
+    Feb 30 is invalid in either order, so it cannot justify a switch
+    """
+    assert parse_date("31/02/24", "dmy") is None
+    assert parse_date("29/02/24", "dmy") is not None
+    assert fallback_date_order(["02/30/24", "1/13/24"], "dmy") is None
+    assert fallback_date_order(["02/12/24", "1/13/24"], "dmy") == "mdy"
@@ -0,0 +1,60 @@
+from app.chat import ocr
+from app.chat.ocr import stitch_pages
+from app.chat.parser import parse_chat_input
+from config.settings import DEFAULT_SETTINGS
+
+# Recognized text of each fake screenshot
+PAGES = {
+    "page1.png": "Today\nAnn\nthe deposit is due friday\n10:00\nBob\nplease send the invoice\n10:02\nAnn\nwill do, sending it to",
+    "page2.png": "send the invoice\n10:02\nAnn\nwill do, sending it tonight\n10:03\nBob\nthanks\n10:04"
+}
+
+def fake_backend(image):
+    """
+    OCR backend returning the text of a fake screenshot
+    """
+    return PAGES[image]
+
+def test_repeated_short_lines_are_not_taken_for_overlap():
+    """
+    A run of "ok" and sender names repeated elsewhere must not drop real lines
+    """
+    p1 = ["Bob", "hello everyone", "10:01", "Alice", "ok", "Bob", "ok"]
+    p2 = ["Alice", "ok", "Bob", "ok", "Carol", "done, the keys are with me", "10:03"]
+    p3 = ["see you at the site tomorrow", "10:05", "Alice", "ok", "Bob", "ok"]
+
+    lines = stitch_pages([p1, p2, p3])
+
+    assert lines[-6:] == p3
+    assert "done, the keys are with me" in lines
+
+def test_overlap_with_cut_off_edge_lines():
+    """
+    Lines cut off at the screen edges are replaced by their whole versions
+    """
+    p1 = ["Ann", "the deposit is due friday", "10:00", "Bob", "please send the invoice", "10:02", "Ann", "will do, sending it to"]
+    p2 = ["send the invoice", "10:02", "Ann", "will do, sending it tonight", "10:03", "Bob", "thanks"]
+
+    assert stitch_pages([p1, p2]) == [
+        "Ann", "the deposit is due friday", "10:00", "Bob", "please send the invoice",
+        "10:02", "Ann", "will do, sending it tonight", "10:03", "Bob", "thanks"
+    ]
+
+def test_screenshots_parse_into_messages(monkeypatch):
+    """
+    Stitched bubbles go through parse_chat_input as messages with senders and times
+    """
+    monkeypatch.setitem(ocr.OCR_BACKENDS, "fake", fake_backend)
+    monkeypatch.setitem(DEFAULT_SETTINGS["chat"], "ocr_backend", "fake")
+    monkeypatch.setitem(DEFAULT_SETTINGS["chat"], "ocr_workers", 1)
+    monkeypatch.setattr(ocr, "load_image", lambda image_path, max_width: image_path)
+
+    chat_store = parse_chat_input({"type": "screenshots", "content": ["page1.png", "page2.png"]})
+
+    assert [(message["sender"], message["time"], message["content"]) for message in chat_store] == [
+        ("Ann", "10:00", "the deposit is due friday"),
+        ("Bob", "10:02", "please send the invoice"),
+        ("Ann", "10:03", "will do, sending it tonight"),
+        ("Bob", "10:04", "thanks")
+    ]
+    assert chat_store.timestamps[1] - chat_store.timestamps[0] == 120
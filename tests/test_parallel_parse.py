@@ -0,0 +1,37 @@
+import pytest
+
+from app.chat.parallel import iter_whatsapp_messages_parallel
+from app.chat.parser import iter_chat_file_lines, iter_whatsapp_messages
+
+def write_export(path, newline, bom):
+    """
+    Write an Android export with multi-line messages and notices
+    """
+    lines = []
+    for number in range(400):
+        minute = number % 60
+        lines.append(f"{number % 28 + 1:02d}/03/2024, 10:{minute:02d} - Ann: message {number}")
+        if number % 7 == 0:
+            lines.append(f"second line of {number}")
+            lines.append("")
+        if number % 50 == 0:
+            lines.append(f"{number % 28 + 1:02d}/03/2024, 10:{minute:02d} - Bob joined using this group's invite link")
+    text = newline.join(lines) + newline
+    with open(path, "wb") as file:
+        file.write(("\ufeff" if bom else "").encode("utf-8") + text.encode("utf-8"))
+
+@pytest.mark.parametrize("newline, bom", [("\n", False), ("\r\n", False), ("\r\n", True), ("\n", True)])
+def test_parallel_parse_matches_serial(tmp_path, newline, bom):
+    """
+    Every split of the file gives the messages of the serial parser
+    """
+    path = str(tmp_path / "chat.txt")
+    write_export(path, newline, bom)
+
+    serial = list(iter_whatsapp_messages(iter_chat_file_lines(path)))
+    parallel = list(iter_whatsapp_messages_parallel(path, workers=3, min_bytes=0))
+
+    assert len(serial) == 408
+    assert parallel == serial
+    assert not serial[0]["date"].startswith("\ufeff")
+    assert all("\r" not in message["content"] for message in serial)
@@ -0,0 +1,55 @@
+from app.chat.store import MessageStore
+
+def make_store(count):
+    """
+    Store with count messages from three senders
+    """
+    chat_store = MessageStore("dmy")
+    chat_store.extend(
+        {"date": f"{number // 10 + 1:02d}/03/2024", "time": f"10:{number % 60:02d}", "sender": f"Sender {number % 3}",
+         "content": f"message {number}"}
+        for number in range(count)
+    )
+    return chat_store
+
+def test_truncate_keeps_the_leading_messages():
+    """
+    Truncating gives the same store as adding only the kept messages
+    """
+    chat_store = make_store(30)
+    chat_store.truncate(12)
+
+    assert list(chat_store) == list(make_store(12))
+    assert chat_store.dates == make_store(12).dates
+
+def test_truncate_after_set_content_keeps_replaced_text():
+    """
+    Text replaced into the buffer after later messages survives a truncate
+    """
+    chat_store = make_store(30)
+    chat_store.set_content(2, "replaced")
+    chat_store.truncate(5)
+    chat_store.append({"date": "01/04/2024", "time": "09:00", "sender": "Sender 9", "content": "new"})
+
+    assert chat_store.content(2) == "replaced"
+    assert chat_store.content(5) == "new"
+    assert len(chat_store) == 6
+
+def test_save_and_load_round_trip(tmp_path):
+    """
+    A saved store loads with the same messages, tables, and date order
+    """
+    chat_store = make_store(50)
+    chat_store.set_content(7, "é and emoji 🎉")
+    path = str(tmp_path / "chat.messages")
+    chat_store.save(path)
+
+    loaded = MessageStore.load(path)
+
+    assert list(loaded) == list(chat_store)
+    assert loaded.date_order == "dmy"
+    assert loaded.senders == chat_store.senders
+
+    # Interned tables still resolve after loading
+    loaded.append({"date": "01/03/2024", "time": "10:00", "sender": "Sender 1", "content": "again"})
+    assert loaded.sender_ids[-1] == chat_store.sender_ids[1]